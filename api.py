@@ -0,0 +1,91 @@
+import argparse
+import sys
+from pathlib import Path
+
+from src.Api.CatalogApi import create_api_server
+from src.Database.DBClass import DB
+from src.Logger.ColorClass import col
+from src.Logger.LoggerClass import Logger
+from src.Utils.TeeHandler import tee_handler
+from src.Utils.app_paths import get_appdata_db_path, get_log_path
+
+# Read-only HTTP API over the catalog, without the app (see CatalogApi):
+#
+#   python api.py --port 8502
+#   curl "http://127.0.0.1:8502/ef?ef_valid=1&format=csv"
+#
+# The app can also serve it next to the UI, with API.ENABLED.
+
+EXIT_SUCCESS = 0
+EXIT_FAILURE = 1  # The database is missing or the port is not available
+EXIT_USAGE = 2  # Invalid arguments (same as argparse)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Serves the DopplerManager catalog as a local read-only HTTP API.",
+    )
+    parser.add_argument(
+        "--host",
+        default=None,
+        help="The interface to listen on. Defaults to API.HOST (127.0.0.1, local only).",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="The port to listen on. Defaults to API.PORT.",
+    )
+    parser.add_argument(
+        "--db-path",
+        type=Path,
+        default=None,
+        help="The database file. Defaults to DB.DB_PATH or the AppData folder.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    try:
+        args = parse_args(argv)
+    except SystemExit as e:
+        return e.code  # 0 for --help, EXIT_USAGE otherwise
+
+    tee_handler.start(get_log_path())
+
+    db_path = args.db_path or get_appdata_db_path()
+    if not Path(db_path).is_file():
+        Logger.error(f"The database does not exist: {db_path}", "API")
+        return EXIT_FAILURE
+
+    # Only read through, never deleted or updated
+    db = DB(str(db_path), override=False)
+
+    try:
+        server = create_api_server(db, args.host, args.port)
+    except OSError as e:
+        Logger.error(f"The catalog API could not start: {e}", "API")
+        db.close()
+        return EXIT_FAILURE
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        Logger.info("Catalog API stopped", "API")
+    finally:
+        server.server_close()
+        db.close()
+
+    return EXIT_SUCCESS
+
+
+if __name__ == "__main__":
+    if sys.version_info < (3, 13):
+        print(
+            f"{col.BOLD}{col.RED}You are using a Python version before 3.13!{col.RES}"
+        )
+        print("This could result in failure to load")
+        print(f"Current version {sys.version}")
+        sys.exit(EXIT_FAILURE)
+
+    sys.exit(main())
@@ -1,68 +1,29 @@
-import os
-import datetime
-from pathlib import Path
 import streamlit as st
-import pandas as pd
 import multiprocessing
 
+from src.Api.CatalogApi import start_api_server
 from src.FileFinder.FileFinderClass import FileFinder
 from src.Database.DBClass import DB
+from src.Database.Catalog import (
+    CATALOG_COUNTS_QUERY,
+    CATALOG_TABLE,
+    catalog_counts_query,
+)
+from src.Database.CatalogShards import shards_query, sync_shards
 from src.Logger.ColorClass import col
 from src.Utils.ParamsLoader import ConfigManager
 from src.Utils.TeeHandler import tee_handler
+from src.Utils.app_paths import get_appdata_db_path, get_log_path
 
 from src.ui.sidebar import render_sidebar
 from src.ui.holo_view import render_holo_section
 from src.ui.hd_view import render_hd_section
 from src.ui.ef_view import render_ef_section
 from src.ui.export_view import render_export_section
-
-
-def get_appdata_db_path() -> Path:
-    """
-    Constructs the database path in the user's AppData/Roaming folder
-    and ensures the directory exists.
-    """
-
-    config_path = ConfigManager.get("DB.DB_PATH") or ""
-
-    if config_path != "":
-        return Path(config_path)
-
-    # Get AppData\Roaming folder
-    appdata_path = os.getenv("APPDATA")
-
-    # If not set, default to the local dir
-    if not appdata_path:
-        return Path("renders.db")
-
-    app_dir = Path(appdata_path) / "DopplerManager"
-    os.makedirs(app_dir, exist_ok=True)
-
-    return app_dir / "renders.db"
-
-
-def get_log_path() -> Path:
-    """
-    Constructs the log file path in the user's AppData/Roaming folder
-    and ensures the directory exists.
-    """
-
-    config_path = ConfigManager.get("LOG.LOG_PATH") or ""
-
-    if config_path != "":
-        return Path(config_path)
-
-    appdata_path = os.getenv("APPDATA")
-
-    # If not set, default to the local dir
-    if not appdata_path:
-        return Path("logs")
-
-    log_dir = Path(appdata_path) / "DopplerManager" / "logs"
-    os.makedirs(log_dir, exist_ok=True)
-
-    return log_dir / f"log_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+from src.ui.query_cache import load_data
+from src.ui.scan_history_view import render_scan_history_section
+from src.ui.search_view import render_search_section
+from src.ui.shard_view import render_shard_selector
 
 
 @st.cache_resource
@@ -70,28 +31,16 @@ def initialize_database(db_path):
     """
     Connects to the database, instantiates the FileFinder,
     and ensures tables are created. This runs only once.
+    Also starts the catalog API (see CatalogApi) if API.ENABLED.
     """
-    ff_instance = FileFinder(DB(db_path))
+    # The DB is shared with the headless scanner, never deleted at startup
+    ff_instance = FileFinder(DB(db_path, override=False))
     ff_instance.CreateDB()
+    if ConfigManager.get("API.ENABLED", False):
+        start_api_server(ff_instance.DB)
     return ff_instance
 
 
-@st.cache_data
-def load_data(query, _ff: FileFinder):
-    """
-    Loads data from the database using the provided SQL query.
-    Caches the result to avoid redundant database calls.
-    """
-    # try:
-    #     df = pd.read_sql_query(query, _conn)
-    #     return df
-    # except Exception as e:
-    #     st.error(f"Error while loading data: {e}")
-    #     return pd.DataFrame()
-
-    return pd.read_sql_query(query, _ff.DB.SQLconnect)
-
-
 def main():
     """
     Main function to run the Streamlit app.
@@ -126,44 +75,52 @@ def main():
 
         st.title("DopplerManager")
 
-        # --- Data Loading ---
-        query = """
-            SELECT
-                h_data.path AS holo_file,
-                h_data.tag AS measure_tag,
-                h_data.created_at AS holo_created_at,
-                hd.path AS hd_folder,
-                hd.render_number as hd_render_number,
-                hd.version AS hd_version,
-                hd.raw_h5_path AS hd_raw_h5_path,
-                ef.path AS ef_folder,
-                ef.render_number AS ef_render_number,
-                ef.version AS ef_version,
-                ef.report_path AS ef_report_path,
-                ef.h5_output AS ef_h5_output,
-                ef.error_log_path AS error_log_path
-            FROM
-                holo_data AS h_data
-            LEFT JOIN
-                hd_render AS hd ON h_data.id = hd.holo_id
-            LEFT JOIN
-                ef_render AS ef ON hd.id = ef.hd_id
-        """
-        combined_df = load_data(query, ff)
-
-        if combined_df.empty:
-            st.warning(
-                "The database is empty. Please start by adding a directory in the sidebar and start a scan."
+        catalog_tab, history_tab = st.tabs(["Catalog", "Scan history"])
+
+        with history_tab:
+            render_scan_history_section(ff)
+
+        with catalog_tab:
+            # --- Data Loading ---
+            # The catalog is refreshed at the end of each scan, with the
+            # validity and "latest render" flags already computed. It is
+            # filtered, counted and paged in SQL, never loaded whole.
+            # The shards may have been refreshed by another process
+            sync_shards(ff.DB)
+            generation = ff.DB.get_generation()
+
+            # The roots to load; the years follow the date filter (see
+            # render_holo_section), bounded by the whole catalog
+            shard_keys = render_shard_selector(ff)
+            source = CATALOG_TABLE
+            counts_query = CATALOG_COUNTS_QUERY
+            if shard_keys is not None:
+                source = shards_query(ff.DB, shard_keys)
+                counts_query = catalog_counts_query(source)
+            counts = load_data(counts_query, (), generation, ff).iloc[0]
+
+            if counts["holo_files"] == 0 and shard_keys is None:
+                st.warning(
+                    "The database is empty. Please start by adding a directory in the sidebar and start a scan."
+                )
+                return
+
+            render_search_section(ff)
+            st.markdown("---")
+
+            holo_clauses, source = render_holo_section(
+                ff,
+                generation,
+                int(counts["holo_files"]),
+                (counts["first_holo_created_at"], counts["last_holo_created_at"]),
+                source,
             )
-            return
-
-        filtered_by_holo = render_holo_section(combined_df)
-        st.markdown("---")
-        filtered_by_hd = render_hd_section(filtered_by_holo)
-        st.markdown("---")
-        filtered_by_ef = render_ef_section(filtered_by_hd)
-        st.markdown("---")
-        render_export_section(filtered_by_ef)
+            st.markdown("---")
+            hd_clauses = render_hd_section(ff, generation, holo_clauses, source)
+            st.markdown("---")
+            ef_clauses = render_ef_section(ff, generation, hd_clauses, source)
+            st.markdown("---")
+            render_export_section(ff, generation, ef_clauses, source)
 
     except Exception:
         tee_handler.log_and_reraise()
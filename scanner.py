@@ -0,0 +1,299 @@
+import argparse
+import datetime
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+from src.Database.CatalogExport import export_catalog_parquet
+from src.FileFinder.FileFinderClass import FileFinder
+from src.FileFinder.ScanDelta import archive_delta, get_pending_deltas, write_delta
+from src.FileFinder.ScanScheduler import ScanScheduler
+from src.Database.DBClass import DB
+from src.Logger.ColorClass import col
+from src.Logger.LoggerClass import Logger
+from src.Utils.ParamsLoader import ConfigManager
+from src.Utils.TeeHandler import tee_handler
+from src.Utils.app_paths import get_appdata_db_path, get_log_path
+
+# Headless entry point, to run the scans from a task scheduler instead of the
+# Streamlit sidebar:
+#
+#   python scanner.py "Y:\" --parallel
+#   python scanner.py "Y:\" --watch
+#   python scanner.py "D:\data" --agent-output "D:\deltas" --publish-root "Y:\"
+#   python scanner.py --import-deltas "Y:\deltas"
+#   python scanner.py "Y:\" --export-parquet "Y:\catalog_parquet"
+#
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_FAILURE = 1  # The scan failed and was rolled back (after the clear of --full)
+EXIT_USAGE = 2  # Invalid arguments (same as argparse)
+EXIT_SCAN_ERRORS = 3  # Completed, but some folders (or deltas) could not be read
+EXIT_EXPORT_FAILED = 4  # The scan is stored, but the Parquet export failed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Scans folders for .holo files and their HoloDoppler/EyeFlow renders, and stores them in the DopplerManager database.",
+    )
+    parser.add_argument(
+        "roots",
+        nargs="*",
+        help="The root folders to scan. Defaults to FINDER.DEFAULT_ROOT_DIR.",
+    )
+
+    parallelism = parser.add_mutually_exclusive_group()
+    parallelism.add_argument(
+        "--parallel",
+        dest="use_parallelism",
+        action="store_true",
+        default=None,
+        help="Scans the date folders in a process pool.",
+    )
+    parallelism.add_argument(
+        "--sequential",
+        dest="use_parallelism",
+        action="store_false",
+        help="Scans the date folders one by one.",
+    )
+
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--full",
+        dest="reset_db",
+        action="store_true",
+        default=False,
+        help="Clears the whole database before the scan, a failed scan leaves it empty.",
+    )
+    mode.add_argument(
+        "--incremental",
+        dest="reset_db",
+        action="store_false",
+        help="Only replaces the rows under the scanned roots (default).",
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keeps running and rescans each date folder when it is due (recent folders often, old ones rarely), see FINDER.SCHEDULER.",
+    )
+    parser.add_argument(
+        "--tick",
+        type=float,
+        default=None,
+        help="The seconds between two scheduled scans with --watch. Defaults to FINDER.SCHEDULER.TICK_SECONDS.",
+    )
+    parser.add_argument(
+        "--agent-output",
+        type=Path,
+        default=None,
+        help="Agent mode: scans the roots without any database and writes a scan delta to this folder, to be imported by the app with --import-deltas.",
+    )
+    parser.add_argument(
+        "--publish-root",
+        action="append",
+        default=None,
+        help="Agent mode: the path of a root as seen by the app (e.g. Y:\\ for D:\\data), once per root.",
+    )
+    parser.add_argument(
+        "--import-deltas",
+        type=Path,
+        default=None,
+        help="Imports the scan deltas waiting in this folder (moved to its 'imported' sub-folder once imported, the invalid ones are left in place).",
+    )
+    parser.add_argument(
+        "--export-parquet",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="FOLDER",
+        help="Exports the catalog as a Parquet dataset (by year and measure tag, with the EyeFlow metrics) after the scan or the import. Defaults to EXPORT.PARQUET_PATH or a folder next to the database.",
+    )
+    parser.add_argument(
+        "--report-path",
+        type=Path,
+        default=None,
+        help="The folder of the scan reports. Defaults to FINDER.REPORT_PATH.",
+    )
+    parser.add_argument(
+        "--db-path",
+        type=Path,
+        default=None,
+        help="The database file. Defaults to DB.DB_PATH or the AppData folder.",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.publish_root and len(args.publish_root) != len(args.roots):
+        parser.error("--publish-root must be given once per root")
+    if args.export_parquet is not None and (args.watch or args.agent_output):
+        parser.error("--export-parquet cannot be used with --watch or --agent-output")
+
+    if not args.roots:
+        args.roots = [ConfigManager.get("FINDER.DEFAULT_ROOT_DIR") or ""]
+    if args.use_parallelism is None:
+        args.use_parallelism = bool(ConfigManager.get("FINDER.USE_PARALLISM"))
+
+    return args
+
+
+def watch(ff: FileFinder, roots: list[str], tick: float | None) -> int:
+    scheduler = ScanScheduler(ff, roots)
+
+    try:
+        scheduler.run_forever(tick)
+    except KeyboardInterrupt:
+        Logger.info("Scheduled scans stopped", "FILESYSTEM")
+        return EXIT_SUCCESS
+    except Exception as e:
+        Logger.error(f"The scheduled scan failed: {e}", "FILESYSTEM")
+        return EXIT_FAILURE
+    finally:
+        ff.DB.close()
+
+
+def agent(args: argparse.Namespace) -> int:
+    ff = FileFinder(None)  # The agent never touches the database
+    publish_roots = args.publish_root or args.roots
+
+    scan_errors = 0
+    for root, publish_root in zip(args.roots, publish_roots):
+        start_scan_date = datetime.datetime.now()
+        results, unreachable = ff.ScanFolders(
+            ff.GetSearchFolders(root), None, args.use_parallelism
+        )
+        write_delta(
+            root, results, unreachable, start_scan_date, args.agent_output, publish_root
+        )
+        scan_errors += sum(result[4]["errors"] for result in results) + len(unreachable)
+
+    return EXIT_SCAN_ERRORS if scan_errors else EXIT_SUCCESS
+
+
+def export_parquet(ff: FileFinder, folder: str) -> bool:
+    try:
+        export_catalog_parquet(ff.DB, Path(folder) if folder else None)
+    except Exception as e:
+        Logger.error(f"The Parquet export failed: {e}", "DATABASE")
+        return False
+    return True
+
+
+def import_deltas(
+    ff: FileFinder,
+    delta_dir: Path,
+    parquet_folder: str | None,
+    report_path: Path | None,
+) -> int:
+    delta_paths = get_pending_deltas(delta_dir)
+    if not delta_paths:
+        Logger.info(f"No scan delta to import in {delta_dir}", "DATABASE")
+        return EXIT_SUCCESS
+
+    try:
+        reports, imported = ff.ImportDeltas(delta_paths, report_path)
+        exported = parquet_folder is None or export_parquet(ff, parquet_folder)
+    except Exception as e:
+        Logger.error(f"The import failed: {e}", "DATABASE")
+        return EXIT_FAILURE
+    finally:
+        ff.DB.close()
+
+    # The rejected deltas stay pending, e.g. to be imported by an updated app
+    for delta_path in imported:
+        archive_delta(delta_path)
+
+    if len(imported) != len(delta_paths) or any(
+        report["data"]["unreachable"] for report in reports
+    ):
+        return EXIT_SCAN_ERRORS
+    if not exported:
+        return EXIT_EXPORT_FAILED
+    return EXIT_SUCCESS
+
+
+def main(argv: list[str] | None = None) -> int:
+    try:
+        args = parse_args(argv)
+    except SystemExit as e:
+        return e.code  # 0 for --help, EXIT_USAGE otherwise
+
+    tee_handler.start(get_log_path())
+
+    # The roots are not scanned when importing deltas
+    missing_roots = [root for root in args.roots if not os.path.isdir(root)]
+    if missing_roots and not args.import_deltas:
+        for root in missing_roots:
+            Logger.error(f"The root folder does not exist: {root!r}", "FILESYSTEM")
+        return EXIT_USAGE
+
+    if args.agent_output:
+        return agent(args)
+
+    db_path = args.db_path or get_appdata_db_path()
+
+    # The catalog is updated in place, never deleted when the DB is opened
+    ff = FileFinder(DB(str(db_path), override=False))
+    ff.CreateDB()
+
+    if args.import_deltas:
+        return import_deltas(
+            ff, args.import_deltas, args.export_parquet, args.report_path
+        )
+    if args.watch:
+        return watch(ff, args.roots, args.tick)
+
+    Logger.info(
+        f"Scanning {args.roots} into {db_path} "
+        f"({'full' if args.reset_db else 'incremental'}, "
+        f"{'parallel' if args.use_parallelism else 'sequential'})",
+        "FILESYSTEM",
+    )
+
+    start = time.perf_counter()
+
+    try:
+        reports = ff.Findfiles(
+            args.roots,
+            reset_db=args.reset_db,
+            use_parallelism=args.use_parallelism,
+            report_path=args.report_path,
+        )
+        exported = args.export_parquet is None or export_parquet(ff, args.export_parquet)
+    except Exception as e:
+        Logger.error(f"The scan failed: {e}", "FILESYSTEM")
+        return EXIT_FAILURE
+    finally:
+        ff.DB.close()
+
+    # The folders abandoned after FINDER.FOLDER_TIMEOUT were not read either
+    scan_errors = sum(
+        report["data"]["errors"] + report["data"]["unreachable"] for report in reports
+    )
+    Logger.info(
+        f"Scan done in {time.perf_counter() - start:.3f}s ({scan_errors} errors)",
+        "TIME",
+    )
+
+    if scan_errors:
+        return EXIT_SCAN_ERRORS
+    if not exported:
+        return EXIT_EXPORT_FAILED
+    return EXIT_SUCCESS
+
+
+if __name__ == "__main__":
+    if sys.version_info < (3, 13):
+        print(
+            f"{col.BOLD}{col.RED}You are using a Python version before 3.13!{col.RES}"
+        )
+        print("This could result in failure to load")
+        print(f"Current version {sys.version}")
+        sys.exit(EXIT_FAILURE)
+
+    # For Windows compatibility in multiprocessing
+    multiprocessing.freeze_support()
+
+    sys.exit(main())
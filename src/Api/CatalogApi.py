@@ -0,0 +1,375 @@
+import csv
+import io
+import json
+import sqlite3
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from src.Database.Catalog import CATALOG_COLUMNS, FLAG_COLUMNS, catalog_page_query
+from src.Database.CatalogShards import sync_shards
+from src.Database.DBClass import DB
+from src.Logger.LoggerClass import Logger
+from src.Utils.ParamsLoader import ConfigManager
+
+# Local read-only HTTP API over the catalog, for the tools that need the
+# renders without the UI (batch launchers, QC scripts):
+#
+#   GET /                                   resources and generation
+#   GET /holo?measure_tag=ABC&limit=500     .holo files
+#   GET /hd?hd_version=v2.0&is_latest_hd=1  HD renders
+#   GET /ef?ef_valid=1&format=csv           EF renders
+#
+# Each column of a resource can be filtered on (repeated for several
+# values). The pages are keyset-paginated on the key column of the resource:
+# the next page starts `after` the key of the last row (also given as `next`
+# in JSON). The rows are streamed from the cursor, as JSON or CSV (`format`
+# or the Accept header).
+#
+# The ETag of a response is the data generation of the DB (see
+# DB.get_generation): a request with a matching If-None-Match gets a 304
+# without running any query, until the next scan changes the catalog.
+
+# name: (key column, columns)
+RESOURCES = {
+    "holo": (
+        "holo_file",
+        ["holo_id", "holo_file", "measure_tag", "holo_created_at"],
+    ),
+    "hd": (
+        "hd_folder",
+        [
+            "hd_id",
+            "holo_id",
+            "holo_file",
+            "measure_tag",
+            "holo_created_at",
+            "hd_folder",
+            "hd_render_number",
+            "hd_version",
+            "hd_raw_h5_path",
+            "hd_valid",
+            "is_latest_hd",
+        ],
+    ),
+    "ef": (
+        "ef_folder",
+        [
+            "ef_id",
+            "hd_id",
+            "holo_file",
+            "measure_tag",
+            "holo_created_at",
+            "hd_folder",
+            "hd_version",
+            "ef_folder",
+            "ef_render_number",
+            "ef_version",
+            "ef_report_path",
+            "ef_h5_output",
+            "error_log_path",
+            "ef_valid",
+            "is_latest_ef",
+        ],
+    ),
+}
+
+FORMATS = {"json": "application/json", "csv": "text/csv"}
+
+# The query parameters that are not column filters
+_PAGE_PARAMETERS = {"after", "limit", "format"}
+
+# Rows fetched (and sent as one chunk) at a time
+_FETCH_SIZE = 500
+
+
+class ApiError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_filters(columns: list[str], query: dict[str, list[str]]) -> dict:
+    """Returns the column filters of the query string, typed as their column"""
+    conditions = {}
+    for name, values in query.items():
+        if name in _PAGE_PARAMETERS:
+            continue
+        if name not in columns:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown filter: {name}")
+
+        if CATALOG_COLUMNS[name].startswith("INTEGER"):
+            try:
+                values = [int(value) for value in values]
+            except ValueError:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer")
+
+        conditions[name] = values if len(values) > 1 else values[0]
+    return conditions
+
+
+def _parse_limit(query: dict[str, list[str]]) -> int:
+    max_page_size = ConfigManager.get("API.MAX_PAGE_SIZE", 10000)
+    if "limit" not in query:
+        return min(ConfigManager.get("API.PAGE_SIZE", 100), max_page_size)
+
+    try:
+        limit = int(query["limit"][0])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "limit must be an integer")
+    if not 1 <= limit <= max_page_size:
+        raise ApiError(
+            HTTPStatus.BAD_REQUEST, f"limit must be between 1 and {max_page_size}"
+        )
+    return limit
+
+
+class CatalogRequestHandler(BaseHTTPRequestHandler):
+    """Answers the GET requests of the API, the DB being set on the server"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive and chunked responses
+    server_version = "DopplerManagerAPI"
+    # The headers and chunks are small writes, not to be delayed by the
+    # client's ACKs (~40 ms per response otherwise)
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self._streaming = False
+        try:
+            self._handle_get()
+        except ApiError as e:
+            self._send_error(e.status, str(e))
+        except sqlite3.Error as e:
+            Logger.error(f"API query failed ({self.path}): {e}", "API")
+            if self._streaming:
+                # Too late for an error status, the client sees a cut response
+                self.close_connection = True
+            else:
+                self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "Database error")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # The client left
+
+    def log_message(self, format: str, *args) -> None:
+        Logger.debug(format % args, "API")
+
+    @property
+    def DB(self) -> DB:
+        return self.server.DB
+
+    def _handle_get(self) -> None:
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        name = url.path.strip("/")
+
+        if name and name not in RESOURCES:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown resource: {name}")
+
+        response_format = self._get_format(query)
+
+        # The shards may have been refreshed by another process
+        sync_shards(self.DB)
+
+        connection = self.DB.reader
+        # The generation and the rows are read from the same snapshot (not
+        # on the writer of an in-memory DB, whose transactions are its own)
+        if connection is not self.DB.SQLconnect:
+            connection.execute("BEGIN")
+        try:
+            self._respond(name, query, response_format)
+        finally:
+            if connection is not self.DB.SQLconnect and connection.in_transaction:
+                connection.rollback()
+
+    def _respond(
+        self, name: str, query: dict[str, list[str]], response_format: str
+    ) -> None:
+        if name:
+            key_column, columns = RESOURCES[name]
+            sql, params = catalog_page_query(
+                columns,
+                key_column,
+                _parse_filters(columns, query),
+                query["after"][0] if "after" in query else None,
+                _parse_limit(query),
+            )
+
+        generation = self.DB.get_generation()
+
+        etag = f'"{generation}-{response_format}"'
+        if etag in self._if_none_match():
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_cache_headers(etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if not name:
+            self._send_index(generation, etag)
+            return
+
+        self._stream_rows(sql, params, key_column, response_format, generation, etag)
+
+    def _get_format(self, query: dict[str, list[str]]) -> str:
+        if "format" in query:
+            response_format = query["format"][0]
+            if response_format not in FORMATS:
+                raise ApiError(
+                    HTTPStatus.BAD_REQUEST, f"format must be one of {list(FORMATS)}"
+                )
+            return response_format
+
+        return "csv" if "text/csv" in self.headers.get("Accept", "") else "json"
+
+    def _if_none_match(self) -> list[str]:
+        header = self.headers.get("If-None-Match", "")
+        return [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+    def _send_cache_headers(self, etag: str) -> None:
+        self.send_header("ETag", etag)
+        # Cached by the clients, revalidated on each use
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept")
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        body = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", FORMATS["json"])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_index(self, generation: int, etag: str) -> None:
+        body = json.dumps(
+            {
+                "generation": generation,
+                "resources": {
+                    name: {"key": key_column, "columns": columns}
+                    for name, (key_column, columns) in RESOURCES.items()
+                },
+            }
+        ).encode("utf-8")
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", FORMATS["json"])
+        self.send_header("Content-Length", str(len(body)))
+        self._send_cache_headers(etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data: str) -> None:
+        if data:
+            encoded = data.encode("utf-8")
+            self.wfile.write(f"{len(encoded):X}\r\n".encode("ascii") + encoded + b"\r\n")
+
+    def _stream_rows(
+        self,
+        sql: str,
+        params: tuple,
+        key_column: str,
+        response_format: str,
+        generation: int,
+        etag: str,
+    ) -> None:
+        """Sends the rows of the query as a chunked response, a batch of rows
+        per chunk"""
+        cursor = self.DB.reader.execute(sql, params)
+        names = [description[0] for description in cursor.description]
+        flags = [name in FLAG_COLUMNS for name in names]
+        key_index = names.index(key_column)
+
+        self.send_response(HTTPStatus.OK)
+        content_type = FORMATS[response_format]
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self._send_cache_headers(etag)
+        self.end_headers()
+        self._streaming = True
+
+        if response_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerow(names)
+        else:
+            self._send_chunk(f'{{"generation": {generation}, "rows": [')
+
+        last_key = None
+        count = 0
+        while rows := cursor.fetchmany(_FETCH_SIZE):
+            last_key = rows[-1][key_index]
+            if response_format == "csv":
+                count += len(rows)
+                writer.writerows(rows)
+                self._send_chunk(buffer.getvalue())
+                buffer.seek(0)
+                buffer.truncate()
+                continue
+
+            records = []
+            for row in rows:
+                record = {
+                    name: bool(value) if flag else value
+                    for name, flag, value in zip(names, flags, row)
+                }
+                records.append(json.dumps(record))
+            self._send_chunk((", " if count else "") + ", ".join(records))
+            count += len(rows)
+
+        if response_format == "csv":
+            self._send_chunk(buffer.getvalue())  # Only the header if no row
+        else:
+            # Only a full page may be followed by more rows
+            next_key = last_key if count == params[-1] else None
+            self._send_chunk(f'], "next": {json.dumps(next_key)}}}')
+
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class CatalogApiServer(ThreadingHTTPServer):
+    """HTTP server of the API, one thread (and DB reader) per request"""
+
+    daemon_threads = True
+
+    def __init__(self, DB: DB, host: str, port: int):
+        super().__init__((host, port), CatalogRequestHandler)
+        self.DB = DB
+
+
+def create_api_server(
+    DB: DB, host: str | None = None, port: int | None = None
+) -> CatalogApiServer:
+    """Creates the API server of a DB, listening on API.HOST and API.PORT by
+    default (local only), on a free port chosen by the OS for port 0
+
+    Raises:
+        OSError: If the port is not available
+    """
+    if host is None:
+        host = ConfigManager.get("API.HOST", "127.0.0.1")
+    if port is None:
+        port = ConfigManager.get("API.PORT", 8502)
+
+    server = CatalogApiServer(DB, host, port)
+    # The port chosen by the OS for port 0
+    host, port = server.server_address[:2]
+    Logger.info(f"Catalog API listening on http://{host}:{port}/", "API")
+    return server
+
+
+def start_api_server(DB: DB) -> CatalogApiServer | None:
+    """Serves the API in a background thread, e.g. next to the Streamlit app.
+    A failure to listen is logged, not raised.
+
+    Returns:
+        CatalogApiServer | None: The running server, None if it could not start
+    """
+    try:
+        server = create_api_server(DB)
+    except OSError as e:
+        Logger.error(f"The catalog API could not start: {e}", "API")
+        return None
+
+    threading.Thread(
+        target=server.serve_forever, name="catalog-api", daemon=True
+    ).start()
+    return server
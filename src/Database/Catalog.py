@@ -0,0 +1,398 @@
+import time
+
+import pandas as pd
+
+from src.Database.DBClass import DB
+from src.Logger.LoggerClass import Logger
+from src.Utils.ParamsLoader import ConfigManager
+
+# The catalog is a denormalized copy of the holo_data / hd_render / ef_render
+# join (with the full paths of their `*_paths` views, see Directories),
+# refreshed at the end of each scan. The "latest render" and validity
+# flags are computed once here instead of on every rerun of the UI.
+
+CATALOG_TABLE = "catalog"
+
+CATALOG_COLUMNS = {
+    "holo_id": "INTEGER NOT NULL",
+    "hd_id": "INTEGER",
+    "ef_id": "INTEGER",
+    "holo_file": "VARCHAR(255) NOT NULL",
+    "measure_tag": "VARCHAR(255)",
+    "holo_created_at": "TIMESTAMP",
+    "hd_folder": "VARCHAR(255)",
+    "hd_render_number": "INTEGER",
+    "hd_version": "VARCHAR(255)",
+    "hd_raw_h5_path": "VARCHAR(255)",
+    "ef_folder": "VARCHAR(255)",
+    "ef_render_number": "INTEGER",
+    "ef_version": "VARCHAR(255)",
+    "ef_report_path": "VARCHAR(255)",
+    "ef_h5_output": "VARCHAR(255)",
+    "error_log_path": "VARCHAR(255)",
+    # HD render with a raw .h5 file and a version
+    "hd_valid": "INTEGER NOT NULL DEFAULT 0",
+    # EF render with a report, a .h5 output and no error log
+    "ef_valid": "INTEGER NOT NULL DEFAULT 0",
+    # Highest render number among the valid HD renders of the .holo file
+    "is_latest_hd": "INTEGER NOT NULL DEFAULT 0",
+    # Highest render number among the valid EF renders of the HD folder
+    "is_latest_ef": "INTEGER NOT NULL DEFAULT 0",
+}
+
+FLAG_COLUMNS = ["hd_valid", "ef_valid", "is_latest_hd", "is_latest_ef"]
+
+# Long repeated strings, stored as pandas categoricals
+CATEGORICAL_COLUMNS = [
+    "holo_file",
+    "measure_tag",
+    "holo_created_at",
+    "hd_folder",
+    "hd_version",
+    "hd_raw_h5_path",
+    "ef_folder",
+    "ef_version",
+    "ef_report_path",
+    "ef_h5_output",
+    "error_log_path",
+]
+
+INTEGER_COLUMNS = ["holo_id", "hd_id", "ef_id", "hd_render_number", "ef_render_number"]
+
+CATALOG_INDEXES = {
+    "idx_catalog_holo": ["holo_id"],
+    "idx_catalog_date_tag": ["holo_created_at", "measure_tag"],
+    "idx_catalog_hd": ["hd_valid", "is_latest_hd"],
+    "idx_catalog_ef": ["ef_valid", "is_latest_ef"],
+    # Keyset pagination of the API and of the UI tables (see CatalogApi,
+    # paged_table)
+    "idx_catalog_holo_file": ["holo_file"],
+    "idx_catalog_hd_folder": ["hd_folder"],
+    "idx_catalog_ef_folder": ["ef_folder"],
+    # Search hits (see SearchIndex)
+    "idx_catalog_hd_id": ["hd_id"],
+    "idx_catalog_ef_id": ["ef_id"],
+}
+
+
+def catalog_counts_query(source: str = CATALOG_TABLE) -> str:
+    """Returns the query of the totals of the catalog (or of a query of
+    catalog rows), computed by SQLite instead of nunique() on the full
+    DataFrame, and the range of the creation dates. The HD and EF sections
+    count their own selection."""
+    if source != CATALOG_TABLE:
+        source = f"({source})"
+
+    return f"""
+        SELECT
+            COUNT(DISTINCT holo_id) AS holo_files,
+            MIN(holo_created_at) AS first_holo_created_at,
+            MAX(holo_created_at) AS last_holo_created_at
+        FROM {source}
+    """
+
+
+# Totals of the whole catalog
+CATALOG_COUNTS_QUERY = catalog_counts_query()
+
+# The rows of the catalog, in the order of CATALOG_COLUMNS
+CATALOG_ROWS_QUERY = """
+    SELECT
+        joined.*,
+        joined.hd_valid AND joined.hd_render_number = MAX(
+            CASE WHEN joined.hd_valid THEN joined.hd_render_number END
+        ) OVER (PARTITION BY joined.holo_id) AS is_latest_hd,
+        joined.ef_valid AND ROW_NUMBER() OVER (
+            PARTITION BY joined.hd_id, joined.ef_valid
+            ORDER BY joined.ef_render_number DESC, joined.ef_id
+        ) = 1 AS is_latest_ef
+    FROM (
+        SELECT
+            h_data.id AS holo_id,
+            hd.id AS hd_id,
+            ef.id AS ef_id,
+            h_data.path AS holo_file,
+            h_data.tag AS measure_tag,
+            h_data.created_at AS holo_created_at,
+            hd.path AS hd_folder,
+            hd.render_number AS hd_render_number,
+            hd.version AS hd_version,
+            hd.raw_h5_path AS hd_raw_h5_path,
+            ef.path AS ef_folder,
+            ef.render_number AS ef_render_number,
+            ef.version AS ef_version,
+            ef.report_path AS ef_report_path,
+            ef.h5_output AS ef_h5_output,
+            ef.error_log_path AS error_log_path,
+            (
+                hd.path IS NOT NULL
+                AND hd.raw_h5_path IS NOT NULL
+                AND hd.version IS NOT NULL
+            ) AS hd_valid,
+            (
+                ef.path IS NOT NULL
+                AND ef.report_path IS NOT NULL
+                AND ef.h5_output IS NOT NULL
+                AND ef.error_log_path IS NULL
+            ) AS ef_valid
+        FROM
+            holo_data_paths AS h_data
+        LEFT JOIN
+            hd_render_paths AS hd ON h_data.id = hd.holo_id
+        LEFT JOIN
+            ef_render_paths AS ef ON hd.id = ef.hd_id
+    ) AS joined
+"""
+
+_REFRESH_QUERY = f"""
+    INSERT INTO {CATALOG_TABLE} ({", ".join(CATALOG_COLUMNS)})
+    {CATALOG_ROWS_QUERY}
+"""
+
+
+def create_catalog(DB: DB) -> None:
+    """Creates the catalog table and its indexes"""
+    DB.create_table(CATALOG_TABLE, CATALOG_COLUMNS)
+
+    for index_name, columns in CATALOG_INDEXES.items():
+        DB.create_index(index_name, CATALOG_TABLE, columns)
+
+
+def get_shard_mode() -> str | None:
+    """Returns how the catalog is split across files (DB.SHARD_BY: "year" or
+    "root", see CatalogShards), None if it is a single table"""
+    return ConfigManager.get("DB.SHARD_BY") or None
+
+
+def refresh_catalog(DB: DB) -> int:
+    """Rebuilds the catalog from the render tables in a single transaction
+    (only the changed shards if it is sharded)
+
+    Args:
+        DB (DB): The database holding the render tables
+
+    Returns:
+        int: The number of rows in the refreshed catalog
+    """
+    if get_shard_mode():
+        # Imported here, the shards are built on top of this module
+        from src.Database.CatalogShards import refresh_catalog_shards
+
+        return refresh_catalog_shards(DB)
+
+    start = time.perf_counter()
+
+    try:
+        DB.SQLconnect.execute(f"DELETE FROM {CATALOG_TABLE}")
+        cursor = DB.SQLconnect.execute(_REFRESH_QUERY)
+        DB.commit()
+    except Exception as e:
+        DB.SQLconnect.rollback()
+        Logger.fatal(f"Failed to refresh the catalog: {e}", "DATABASE")
+        return 0
+
+    Logger.info(
+        f"Catalog refreshed ({cursor.rowcount} rows) in {time.perf_counter() - start:.3f}s",
+        "DATABASE",
+    )
+    return cursor.rowcount
+
+
+# SQL expressions of the derived columns of `as_typed_catalog`, for the
+# filters of the UI
+HOLO_DATE_EXPRESSION = "date(holo_created_at)"
+HOLO_KEY_EXPRESSION = (
+    "substr(strftime('%Y%m%d', holo_created_at), 3) || '_' || measure_tag"
+)
+
+
+def _catalog_where(
+    names: list[str],
+    conditions: dict[str, object] | None,
+    clauses: list[tuple[str, tuple]] | None,
+) -> tuple[list[str], list]:
+    """Returns the WHERE terms and parameters of the equality `conditions`
+    (a list of values matching any of them) and of the raw `clauses`"""
+    conditions = conditions or {}
+
+    for name in [*names, *conditions]:
+        if name not in CATALOG_COLUMNS:
+            Logger.fatal(f"Unknown catalog column ({name})", "DATABASE")
+
+    where = []
+    params = []
+    for name, value in conditions.items():
+        if isinstance(value, (list, tuple)):
+            where.append(f"{name} IN ({', '.join('?' for _ in value)})")
+            params.extend(value)
+        else:
+            where.append(f"{name} = ?")
+            params.append(value)
+    for clause, clause_params in clauses or []:
+        where.append(f"({clause})")
+        params.extend(clause_params)
+
+    return where, params
+
+
+def _catalog_source(source: str) -> str:
+    return source if source == CATALOG_TABLE else f"({source}) AS selection"
+
+
+def catalog_page_query(
+    columns: list[str],
+    key_column: str,
+    conditions: dict[str, object] | None = None,
+    after: str | tuple | None = None,
+    limit: int = 100,
+    tie_column: str | None = None,
+    clauses: list[tuple[str, tuple]] | None = None,
+    source: str = CATALOG_TABLE,
+) -> tuple[str, tuple]:
+    """Returns the query of one page of distinct catalog rows, keyset-paginated
+    on `key_column`: the next page starts after the last key of this one.
+
+    Args:
+        columns (list[str]): The returned columns (must include `key_column`
+            and `tie_column`)
+        key_column (str): The column the pages are sorted on
+        conditions (dict[str, object] | None, optional): Equality filters, a
+            list of values matching any of them.
+        after (str | tuple | None, optional): The last key of the previous
+            page, a (key, tie) pair with a `tie_column`.
+        limit (int, optional): The page size. Defaults to 100.
+        tie_column (str | None, optional): The column ordering the rows which
+            share a key (e.g. an id), when `key_column` is not unique.
+        clauses (list[tuple[str, tuple]] | None, optional): Other filters, as
+            SQL terms and their parameters.
+        source (str, optional): The catalog table, or a query of catalog rows
+            (e.g. some shards, see `shards_query`).
+
+    Returns:
+        tuple[str, tuple]: The query and its parameters
+    """
+    order = [key_column, tie_column] if tie_column else [key_column]
+    where, params = _catalog_where([*order, *columns], conditions, clauses)
+    where.insert(0, f"{key_column} IS NOT NULL")
+
+    if after is not None:
+        if tie_column:
+            where.append(f"({key_column}, {tie_column}) > (?, ?)")
+            params.extend(after)
+        else:
+            where.append(f"{key_column} > ?")
+            params.append(after)
+
+    query = f"""
+        SELECT DISTINCT {", ".join(columns)} FROM {_catalog_source(source)}
+        WHERE {" AND ".join(where)}
+        ORDER BY {", ".join(order)}
+        LIMIT ?
+    """
+    return query, (*params, limit)
+
+
+def catalog_total_query(
+    columns: list[str],
+    key_column: str,
+    conditions: dict[str, object] | None = None,
+    clauses: list[tuple[str, tuple]] | None = None,
+    source: str = CATALOG_TABLE,
+) -> tuple[str, tuple]:
+    """Returns the query of the number of rows (`total`) that the pages of
+    `catalog_page_query` go through, with the same arguments"""
+    where, params = _catalog_where([key_column, *columns], conditions, clauses)
+    where.insert(0, f"{key_column} IS NOT NULL")
+
+    query = f"""
+        SELECT COUNT(*) AS total FROM (
+            SELECT DISTINCT {", ".join(columns)} FROM {_catalog_source(source)}
+            WHERE {" AND ".join(where)}
+        )
+    """
+    return query, tuple(params)
+
+
+def catalog_selection_query(
+    columns: list[str],
+    key_column: str,
+    conditions: dict[str, object] | None = None,
+    clauses: list[tuple[str, tuple]] | None = None,
+    source: str = CATALOG_TABLE,
+) -> tuple[str, tuple]:
+    """Returns the query of all the distinct rows that the pages of
+    `catalog_page_query` go through, sorted on `key_column`, with the same
+    arguments (e.g. the options of a filter or the paths to export)"""
+    where, params = _catalog_where([key_column, *columns], conditions, clauses)
+    where.insert(0, f"{key_column} IS NOT NULL")
+
+    query = f"""
+        SELECT DISTINCT {", ".join(columns)} FROM {_catalog_source(source)}
+        WHERE {" AND ".join(where)}
+        ORDER BY {key_column}
+    """
+    return query, tuple(params)
+
+
+def catalog_membership_clause(
+    column: str,
+    clauses: list[tuple[str, tuple]],
+    source: str = CATALOG_TABLE,
+    negate: bool = False,
+) -> tuple[str, tuple]:
+    """Returns the SQL term selecting the rows whose `column` is (or is not,
+    if `negate`) the `column` of a row matching `clauses`, e.g. the .holo
+    files with no render matching the HoloDoppler filters.
+
+    Args:
+        column (str): The compared column (e.g. an id)
+        clauses (list[tuple[str, tuple]]): The filters of the other
+            selection, as SQL terms and their parameters.
+        source (str, optional): The catalog table, or a query of catalog rows.
+        negate (bool, optional): Selects the rows missing from the other
+            selection instead.
+
+    Returns:
+        tuple[str, tuple]: The term and its parameters, a clause of the
+            other queries of this module
+    """
+    where, params = _catalog_where([column], None, clauses)
+    where.insert(0, f"{column} IS NOT NULL")
+
+    operator = "NOT IN" if negate else "IN"
+    term = f"""{column} {operator} (
+        SELECT {column} FROM {_catalog_source(source)}
+        WHERE {" AND ".join(where)}
+    )"""
+    return term, tuple(params)
+
+
+def as_typed_catalog(df: pd.DataFrame) -> pd.DataFrame:
+    """Converts the loaded catalog to its typed form, once per data generation:
+    categorical paths, tags and versions, nullable integers, boolean flags,
+    a native `holo_created_date` column (datetime64, midnight) and a
+    `holo_key` column ("YYMMDD_TAG", as in the imported group files).
+
+    Args:
+        df (pd.DataFrame): The catalog, as read from SQL or from a snapshot
+
+    Returns:
+        pd.DataFrame: The typed catalog
+    """
+    df = df.astype(
+        {
+            **{column: "category" for column in CATEGORICAL_COLUMNS},
+            **{column: "Int64" for column in INTEGER_COLUMNS},
+            **{column: bool for column in FLAG_COLUMNS},
+        }
+    )
+    df["holo_created_date"] = pd.to_datetime(
+        df["holo_created_at"], errors="coerce"
+    ).dt.normalize()
+    df["holo_key"] = (
+        df["holo_created_date"].dt.strftime("%y%m%d")
+        + "_"
+        + df["measure_tag"].astype("string")
+    ).astype("category")
+
+    return df
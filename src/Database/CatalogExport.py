@@ -0,0 +1,301 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from src.Database.Catalog import CATALOG_COLUMNS, CATALOG_TABLE, as_typed_catalog
+from src.Database.CatalogSnapshot import read_snapshot
+from src.Database.DBClass import DB
+from src.Logger.LoggerClass import Logger
+from src.Utils.ParamsLoader import ConfigManager
+
+# The catalog is exported as a Parquet dataset for the notebooks, partitioned
+# by the year of the .holo files and their measure tag (hive layout, e.g.
+# `year=2024/measure_tag=ABC/part-0.parquet`). The EyeFlow output metrics
+# (the `json/*output*.json` of each EF render) are flattened into
+# `metric.<key>` columns, as in the CSV of the export section.
+#
+# Readers (pyarrow.dataset, pandas, polars, DuckDB) only open the partitions
+# matching their filters, and only read the columns they select.
+#
+# Reading the metrics opens a file per EF render, which takes minutes on a
+# large catalog: the app runs the export in a background thread (see
+# `start_parquet_export`) and polls its progress.
+
+PARTITION_COLUMNS = ["year", "measure_tag"]
+
+METRIC_PREFIX = "metric."
+
+# Written in each export, the only folders an export replaces (with the
+# empty ones)
+EXPORT_MARKER = ".dopplermanager_parquet"
+
+
+def get_parquet_folder(DB: DB) -> Path:
+    """Returns the folder of the Parquet export: EXPORT.PARQUET_PATH, or a
+    folder next to the DB"""
+    config_path = ConfigManager.get("EXPORT.PARQUET_PATH") or ""
+    if config_path != "":
+        return Path(config_path)
+
+    db_path = Path(DB.DB_PATH)
+    return db_path.parent / f"{db_path.stem}_parquet"
+
+
+def _check_replaceable(folder: Path) -> None:
+    """Raises a FileExistsError if `folder` holds anything but a previous
+    export, so an export never deletes other files"""
+    if not folder.exists():
+        return
+    if not folder.is_dir():
+        raise FileExistsError(f"Not a folder: {folder}")
+    if (folder / EXPORT_MARKER).is_file() or not any(folder.iterdir()):
+        return
+
+    raise FileExistsError(
+        f"{folder} is not empty and does not hold a previous Parquet export, "
+        f"choose another folder"
+    )
+
+
+def find_ef_output_json(ef_folder: Path) -> Path | None:
+    """Returns the output JSON file of an EF render (the first
+    `json/*output*.json`), None if there is none"""
+    json_dir = ef_folder / "json"
+    if not json_dir.is_dir():
+        return None
+
+    matching_files = sorted(json_dir.glob("*output*.json"))
+    return matching_files[0] if matching_files else None
+
+
+def _read_ef_metrics(
+    ef_folders: list[str], progress=None
+) -> tuple[pd.DataFrame, int]:
+    """Reads and flattens the output metrics of the EF renders
+
+    Args:
+        progress (optional): Called with the number of folders read so far
+                             and the total, after each folder
+
+    Returns:
+        tuple[pd.DataFrame, int]: The metrics (one row per EF folder, in an
+                                  `ef_folder` column) and the number of
+                                  folders without a readable output file
+    """
+    rows = []
+    skipped = 0
+
+    for i, ef_folder in enumerate(ef_folders):
+        if progress is not None:
+            progress(i, len(ef_folders))
+
+        json_path = find_ef_output_json(Path(ef_folder))
+        if json_path is None:
+            skipped += 1
+            continue
+
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            Logger.warn(f"Could not read the EF metrics {json_path}: {e}", "DATABASE")
+            skipped += 1
+            continue
+
+        if not isinstance(data, dict):
+            skipped += 1
+            continue
+
+        rows.append({"ef_folder": ef_folder, "metrics": data})
+
+    if progress is not None:
+        progress(len(ef_folders), len(ef_folders))
+
+    if not rows:
+        return pd.DataFrame({"ef_folder": pd.Series(dtype="string")}), skipped
+
+    metrics = pd.json_normalize([row["metrics"] for row in rows]).add_prefix(
+        METRIC_PREFIX
+    )
+    metrics.insert(0, "ef_folder", [row["ef_folder"] for row in rows])
+    return metrics, skipped
+
+
+def _metric_array(values: pd.Series) -> pa.Array:
+    """Converts a metric column to Arrow. A column whose values do not share
+    a type (e.g. a number in some files and a list in others) is stored as
+    JSON text."""
+    try:
+        return pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        return pa.array(
+            [None if _is_missing(value) else json.dumps(value) for value in values],
+            type=pa.string(),
+        )
+
+
+def _is_missing(value) -> bool:
+    return not isinstance(value, (list, dict)) and pd.isna(value)
+
+
+def _catalog_table(DB: DB, progress=None) -> tuple[pa.Table, int, int]:
+    """Returns the catalog with its EF metrics and partition columns, the
+    number of metric columns and of EF folders without metrics (see
+    `_read_ef_metrics` for `progress`)"""
+    df = read_snapshot(DB, DB.get_generation())
+    if df is None:
+        df = pd.read_sql_query(f"SELECT * FROM {CATALOG_TABLE}", DB.reader)
+    df = as_typed_catalog(df)
+
+    ef_folders = df["ef_folder"].dropna().astype(str).unique().tolist()
+    metrics, skipped = _read_ef_metrics(ef_folders, progress)
+
+    columns = list(CATALOG_COLUMNS) + ["holo_created_date"]
+    catalog = df[columns].copy()
+    catalog["year"] = catalog["holo_created_date"].dt.year.astype("Int64")
+
+    # Plain strings: the width of the dictionary indexes would differ from
+    # one file to another (Parquet encodes the repeated values anyway)
+    table = pa.Table.from_pandas(catalog, preserve_index=False)
+    table = pa.table(
+        [
+            column.cast(column.type.value_type)
+            if pa.types.is_dictionary(column.type)
+            else column
+            for column in table.columns
+        ],
+        names=table.column_names,
+    )
+
+    # One row of metrics per catalog row, in the catalog order
+    row_metrics = (
+        df[["ef_folder"]]
+        .astype({"ef_folder": "string"})
+        .merge(metrics.astype({"ef_folder": "string"}), on="ef_folder", how="left")
+    )
+    metric_columns = [column for column in metrics.columns if column != "ef_folder"]
+    for column in metric_columns:
+        table = table.append_column(column, _metric_array(row_metrics[column]))
+
+    return table, len(metric_columns), skipped
+
+
+def export_catalog_parquet(
+    DB: DB, folder: Path | None = None, progress=None
+) -> dict[str, object]:
+    """Writes the catalog and the flattened EF metrics as a Parquet dataset
+    partitioned by year and measure tag, replacing the previous export
+
+    Args:
+        folder (Path | None, optional): The folder of the dataset, new, empty
+            or holding a previous export. Defaults to `get_parquet_folder`.
+        progress (optional): Called with the number of EF folders whose
+            metrics were read so far and the total.
+
+    Raises:
+        FileExistsError: If the folder holds other files
+
+    Returns:
+        dict[str, object]: The folder, and the numbers of rows, files,
+                           metric columns and EF folders without metrics
+    """
+    start = time.perf_counter()
+    folder = Path(folder) if folder else get_parquet_folder(DB)
+    _check_replaceable(folder)
+
+    table, metric_count, skipped = _catalog_table(DB, progress)
+
+    # Written aside, so the readers never see a partial dataset
+    os.makedirs(folder.parent, exist_ok=True)
+    tmp_folder = Path(tempfile.mkdtemp(prefix=f".{folder.name}.", dir=folder.parent))
+
+    written = []
+    try:
+        ds.write_dataset(
+            table,
+            tmp_folder,
+            format="parquet",
+            partitioning=ds.partitioning(
+                pa.schema([table.schema.field(column) for column in PARTITION_COLUMNS]),
+                flavor="hive",
+            ),
+            basename_template="part-{i}.parquet",
+            max_partitions=max(table.num_rows, 1),
+            existing_data_behavior="overwrite_or_ignore",  # The new empty folder
+            file_visitor=lambda file: written.append(file.path),
+        )
+        (tmp_folder / EXPORT_MARKER).touch()
+
+        # Checked again, in case the folder was filled meanwhile
+        _check_replaceable(folder)
+        if folder.exists():
+            shutil.rmtree(folder)
+        os.replace(tmp_folder, folder)
+    except BaseException:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        raise
+
+    Logger.info(
+        f"Catalog exported to Parquet in {time.perf_counter() - start:.3f}s: "
+        f"{table.num_rows} rows, {len(written)} files, {metric_count} metric columns "
+        f"({skipped} EF folders without metrics) in {folder}",
+        "DATABASE",
+    )
+
+    return {
+        "folder": folder,
+        "rows": table.num_rows,
+        "files": len(written),
+        "metric_columns": metric_count,
+        "skipped": skipped,
+    }
+
+
+class ParquetExport:
+    """A Parquet export running in a background thread (see
+    `start_parquet_export`). The attributes are updated by the thread."""
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+        self.read = 0  # EF folders whose metrics were read
+        self.total = 0
+        self.report = None  # See `export_catalog_parquet`, once done
+        self.error = None  # The exception, if it failed
+        self.thread = None
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def _progress(self, read: int, total: int) -> None:
+        self.read, self.total = read, total
+
+    def _run(self, DB: DB) -> None:
+        try:
+            self.report = export_catalog_parquet(DB, self.folder, self._progress)
+        except Exception as e:
+            Logger.error(f"The Parquet export failed: {e}", "DATABASE")
+            self.error = e
+
+
+def start_parquet_export(DB: DB, folder: Path | None = None) -> ParquetExport:
+    """Starts `export_catalog_parquet` in a background thread, so the app
+    stays responsive while the EF metrics are read
+
+    Returns:
+        ParquetExport: The running export, to poll
+    """
+    export = ParquetExport(Path(folder) if folder else get_parquet_folder(DB))
+    export.thread = threading.Thread(
+        target=export._run, args=(DB,), name="parquet-export", daemon=True
+    )
+    export.thread.start()
+    return export
@@ -0,0 +1,391 @@
+import datetime
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+from src.Database.Catalog import (
+    CATALOG_COLUMNS,
+    CATALOG_INDEXES,
+    CATALOG_ROWS_QUERY,
+    CATALOG_TABLE,
+    get_shard_mode,
+)
+from src.Database.DBClass import DB
+from src.Database.Directories import DIRECTORIES_TABLE, DIRECTORY_PATHS_VIEW
+from src.Database.ScanState import SCAN_STATE_TABLE
+from src.Logger.LoggerClass import Logger
+
+# Sharded catalog (DB.SHARD_BY): the catalog rows are split into one SQLite
+# file per acquisition year ("year", from the date folder name) or per
+# scanned root ("root"), next to the DB. The render tables stay in the DB,
+# so the ids, the search index and the parameter filters are unchanged.
+#
+# A connection attaches at most _MAX_SHARDS shards: the years before the
+# _RECENT_YEARS most recent ones share a single shard, and the roots beyond
+# the limit are refused before they are scanned (see `check_shard_roots`).
+#
+# A refresh computes the catalog rows once, and only rewrites the shards
+# whose rows changed: a rescan of one root (or one year) leaves the files of
+# the others untouched.
+#
+# The readers of the DB attach the shards and see them through a temporary
+# `catalog` view (a UNION ALL of the shards, see DB.federate), which hides
+# the empty `catalog` table of the DB. `shards_query` reads some shards only.
+
+SHARDS_TABLE = "catalog_shards"
+
+SHARDS_COLUMNS = {
+    "key": "VARCHAR(255) PRIMARY KEY",  # The year or the root
+    "alias": "VARCHAR(64) NOT NULL UNIQUE",  # Its name once attached
+    "file_name": "VARCHAR(255) NOT NULL",
+    "rows": "INTEGER NOT NULL DEFAULT 0",
+    "refreshed_at": "TIMESTAMP",
+}
+
+# The shard of the folders without a date (year mode) or a scan state
+UNDATED_SHARD = "undated"
+# The shard of the years before the recent ones (year mode)
+OLDER_SHARD = "older"
+
+# Temporary table of the refreshed rows, and alias of the shard being written
+_REFRESH_TABLE = "catalog_refresh"
+_REFRESH_ALIAS = "shard_refresh"
+
+_SHARD_FILE_PATTERN = "catalog_*.db"
+
+# The writer also attaches the shard being refreshed
+with closing(sqlite3.connect(":memory:")) as _connection:
+    _MAX_SHARDS = _connection.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) - 1
+
+# The years with their own shard, next to the older and the undated shards
+_RECENT_YEARS = _MAX_SHARDS - 2
+
+
+def year_shard_key(year: int, today: datetime.date | None = None) -> str:
+    """Returns the key of the shard holding a year (year mode): the year
+    itself for the recent ones, OLDER_SHARD before them. A year after the
+    current one (a wrong date) is in the shard of the current year."""
+    current_year = (today or datetime.date.today()).year
+    if year < current_year - _RECENT_YEARS + 1:
+        return OLDER_SHARD
+    return str(min(year, current_year))
+
+
+def _shard_key_expression(mode: str) -> str:
+    """Returns the SQL expression of the shard key of a scanned date folder,
+    the same as `year_shard_key` in year mode"""
+    if mode == "root":
+        return "state.root"
+
+    current_year = datetime.date.today().year
+    year = "CAST(strftime('%Y', state.folder_date) AS INTEGER)"
+    return f"""CASE
+        WHEN state.folder_date IS NULL THEN '{UNDATED_SHARD}'
+        WHEN {year} < {current_year - _RECENT_YEARS + 1} THEN '{OLDER_SHARD}'
+        ELSE CAST(MIN({year}, {current_year}) AS TEXT)
+    END"""
+
+
+def check_shard_roots(DB: DB, roots: list[str] | None = None) -> None:
+    """Refuses to shard the catalog per root (DB.SHARD_BY) with more roots
+    than shards can be attached: the ones already scanned and `roots`,
+    before they are scanned
+
+    Raises:
+        Exception: If there are too many roots
+    """
+    if get_shard_mode() != "root":
+        return
+
+    known = {
+        root
+        for (root,) in DB.reader.execute(
+            f"SELECT DISTINCT root FROM {SCAN_STATE_TABLE}"
+        ).fetchall()
+    }
+    # One more shard for the rows without a scan state
+    all_roots = known | {str(root) for root in roots or []}
+    if len(all_roots) > _MAX_SHARDS - 1:
+        Logger.fatal(
+            f"DB.SHARD_BY is \"root\" but {len(all_roots)} roots would need more catalog "
+            f"shards than can be attached ({_MAX_SHARDS - 1} roots at most), "
+            f"use \"year\" or no sharding",
+            "DATABASE",
+        )
+
+
+def get_shards_folder(DB: DB) -> Path:
+    db_path = Path(DB.DB_PATH)
+    return db_path.parent / f"{db_path.stem}_shards"
+
+
+def _shard_names(key: str) -> tuple[str, str]:
+    """Returns the alias and the file name of a shard"""
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+    readable = re.sub(r"[^A-Za-z0-9]+", "_", key).strip("_")[-40:]
+    return f"shard_{digest}", f"catalog_{readable}_{digest}.db"
+
+
+def _refresh_rows_query(mode: str) -> str:
+    """Returns the query of the catalog rows with the key of their shard:
+    the key of the scanned date folder holding the .holo file"""
+    return f"""
+        WITH RECURSIVE shard_dirs (dir_id, shard_key) AS (
+            SELECT d.id, {_shard_key_expression(mode)}
+            FROM {SCAN_STATE_TABLE} AS state
+            JOIN {DIRECTORY_PATHS_VIEW} AS d ON d.path = state.path
+            UNION ALL
+            SELECT child.id, shard_dirs.shard_key
+            FROM {DIRECTORIES_TABLE} AS child
+            JOIN shard_dirs ON child.parent_id = shard_dirs.dir_id
+        )
+        SELECT rows.*, COALESCE(keys.shard_key, '{UNDATED_SHARD}') AS shard_key
+        FROM ({CATALOG_ROWS_QUERY}) AS rows
+        JOIN holo_data AS h ON h.id = rows.holo_id
+        LEFT JOIN (
+            SELECT dir_id, MAX(shard_key) AS shard_key FROM shard_dirs GROUP BY dir_id
+        ) AS keys ON keys.dir_id = h.dir_id
+    """
+
+
+def create_shards(DB: DB) -> bool:
+    """Creates the shards table, and removes the shards if the catalog is no
+    longer sharded
+
+    Returns:
+        bool: True if DB.SHARD_BY changed, the catalog must be refreshed
+    """
+    DB.create_table(SHARDS_TABLE, SHARDS_COLUMNS)
+    has_shards = DB.count(SHARDS_TABLE) > 0
+
+    mode = get_shard_mode()
+    if mode:
+        check_shard_roots(DB)
+        # Filled by a refresh before DB.SHARD_BY was set, or split by other
+        # keys (a year became an older one)
+        changed = (not has_shards and DB.count(CATALOG_TABLE) > 0) or (
+            mode == "year"
+            and any(
+                shard["key"] not in (UNDATED_SHARD, OLDER_SHARD)
+                and year_shard_key(int(shard["key"])) != shard["key"]
+                for shard in get_shards(DB)
+            )
+        )
+    else:
+        changed = has_shards
+        if has_shards:
+            _remove_shards(DB, [shard["key"] for shard in get_shards(DB)])
+            DB.commit()
+
+    sync_shards(DB)
+    return changed
+
+
+def get_shards(DB: DB) -> list[dict]:
+    """Returns the shards (key, alias, file_name, rows, refreshed_at), the
+    most recent years first"""
+    cursor = DB.reader.execute(f"SELECT * FROM {SHARDS_TABLE} ORDER BY key DESC")
+    names = [description[0] for description in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def shards_query(DB: DB, keys: list[str]) -> str:
+    """Returns the query of the catalog rows of some shards only, e.g. the
+    years of a date range (the other files are not read)"""
+    aliases = [shard["alias"] for shard in get_shards(DB) if shard["key"] in keys]
+    if not aliases:
+        return f"SELECT * FROM {CATALOG_TABLE} WHERE 0"
+
+    return " UNION ALL ".join(
+        f"SELECT {', '.join(CATALOG_COLUMNS)} FROM {alias}.{CATALOG_TABLE}"
+        for alias in aliases
+    )
+
+
+def sync_shards(DB: DB) -> None:
+    """Attaches the current shards to the readers of the DB, and sets their
+    `catalog` view (see DB.federate). Cheap when nothing changed, so it can
+    run on every rerun of the app to see the refreshes of other processes."""
+    shards = get_shards(DB) if get_shard_mode() else []
+
+    folder = get_shards_folder(DB)
+    attached = {shard["alias"]: str(folder / shard["file_name"]) for shard in shards}
+    views = {}
+    if shards:
+        views[CATALOG_TABLE] = shards_query(DB, [shard["key"] for shard in shards])
+
+    DB.federate(attached, views)
+
+
+def _write_shard(DB: DB, key: str, file_name: str) -> int | None:
+    """Rewrites a shard from the refreshed rows if they changed
+
+    Returns:
+        int | None: The number of rows, None if the shard was unchanged
+    """
+    columns = ", ".join(CATALOG_COLUMNS)
+    path = get_shards_folder(DB) / file_name
+
+    connection = DB.SQLconnect
+    connection.execute(f"ATTACH DATABASE ? AS {_REFRESH_ALIAS}", (str(path),))
+    try:
+        connection.execute(f"PRAGMA {_REFRESH_ALIAS}.journal_mode = WAL")
+
+        existing = [
+            column[1]
+            for column in connection.execute(
+                f"PRAGMA {_REFRESH_ALIAS}.table_info({CATALOG_TABLE})"
+            )
+        ]
+        if existing and existing != list(CATALOG_COLUMNS):
+            connection.execute(f"DROP TABLE {_REFRESH_ALIAS}.{CATALOG_TABLE}")
+            existing = []
+        if not existing:
+            connection.execute(
+                f"""
+                CREATE TABLE {_REFRESH_ALIAS}.{CATALOG_TABLE} (
+                    {", ".join(f"{name} {sql_type}" for name, sql_type in CATALOG_COLUMNS.items())}
+                )
+                """
+            )
+            for index_name, index_columns in CATALOG_INDEXES.items():
+                connection.execute(
+                    f"CREATE INDEX {_REFRESH_ALIAS}.{index_name} "
+                    f"ON {CATALOG_TABLE} ({', '.join(index_columns)})"
+                )
+
+        new_rows = f"SELECT {columns} FROM temp.{_REFRESH_TABLE} WHERE shard_key = ?"
+        old_rows = f"SELECT {columns} FROM {_REFRESH_ALIAS}.{CATALOG_TABLE}"
+        (row_count,) = connection.execute(
+            f"SELECT COUNT(*) FROM temp.{_REFRESH_TABLE} WHERE shard_key = ?", (key,)
+        ).fetchone()
+        (old_count,) = connection.execute(f"SELECT COUNT(*) FROM ({old_rows})").fetchone()
+        (differ,) = connection.execute(
+            f"SELECT EXISTS ({new_rows} EXCEPT {old_rows})", (key,)
+        ).fetchone()
+
+        if row_count == old_count and not differ:
+            connection.commit()
+            return None
+
+        connection.execute(f"DELETE FROM {_REFRESH_ALIAS}.{CATALOG_TABLE}")
+        connection.execute(
+            f"INSERT INTO {_REFRESH_ALIAS}.{CATALOG_TABLE} ({columns}) {new_rows}", (key,)
+        )
+        connection.commit()
+        return row_count
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.execute(f"DETACH DATABASE {_REFRESH_ALIAS}")
+
+
+def _remove_shards(DB: DB, keys: list[str]) -> None:
+    """Removes shards from the shards table (without committing) and deletes
+    their files"""
+    folder = get_shards_folder(DB)
+    for key in keys:
+        DB.SQLconnect.execute(f"DELETE FROM {SHARDS_TABLE} WHERE key = ?", (key,))
+        _delete_shard_file(folder / _shard_names(key)[1])
+
+
+def _delete_shard_file(path: Path) -> None:
+    for file_path in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+        try:
+            file_path.unlink(missing_ok=True)
+        except OSError as e:
+            # Still attached by a reader (Windows), removed next time
+            Logger.warn(f"Failed to delete the catalog shard {file_path}: {e}", "DATABASE")
+
+
+def refresh_catalog_shards(DB: DB) -> int:
+    """Rebuilds the sharded catalog from the render tables: only the shards
+    whose rows changed are rewritten, the empty ones are removed
+
+    Returns:
+        int: The number of rows in the refreshed catalog
+    """
+    start = time.perf_counter()
+    mode = get_shard_mode()
+    os.makedirs(get_shards_folder(DB), exist_ok=True)
+
+    with DB.writing():
+        try:
+            DB.commit()  # ATTACH cannot run in a transaction
+            DB.SQLconnect.execute(f"DROP TABLE IF EXISTS temp.{_REFRESH_TABLE}")
+            DB.SQLconnect.execute(
+                f"CREATE TEMP TABLE {_REFRESH_TABLE} AS {_refresh_rows_query(mode)}"
+            )
+            DB.SQLconnect.execute(
+                f"CREATE INDEX temp.idx_{_REFRESH_TABLE}_key ON {_REFRESH_TABLE} (shard_key)"
+            )
+            DB.SQLconnect.commit()
+
+            counts = dict(
+                DB.SQLconnect.execute(
+                    f"SELECT shard_key, COUNT(*) FROM temp.{_REFRESH_TABLE} GROUP BY shard_key"
+                ).fetchall()
+            )
+            row_count = sum(counts.values())
+            registered = {shard["key"] for shard in get_shards(DB)}
+
+            # Bounded by the keys and `check_shard_roots`
+            if len(counts) > _MAX_SHARDS:
+                raise ValueError(
+                    f"{len(counts)} shards but only {_MAX_SHARDS} can be attached"
+                )
+
+            rewritten = {}
+            for key in counts:
+                alias, file_name = _shard_names(key)
+                rows = _write_shard(DB, key, file_name)
+                if rows is not None or key not in registered:
+                    rewritten[key] = (alias, file_name)
+
+            now = datetime.datetime.now()
+            for key, (alias, file_name) in rewritten.items():
+                DB.SQLconnect.execute(
+                    f"""
+                    INSERT OR REPLACE INTO {SHARDS_TABLE}
+                    (key, alias, file_name, rows, refreshed_at) VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (key, alias, file_name, counts[key], now),
+                )
+
+            removed = sorted(registered - set(counts))
+            _remove_shards(DB, removed)
+
+            # The catalog table of the DB stays empty, hidden by the view
+            if DB.SQLconnect.execute(
+                f"SELECT EXISTS (SELECT 1 FROM main.{CATALOG_TABLE})"
+            ).fetchone()[0]:
+                DB.SQLconnect.execute(f"DELETE FROM main.{CATALOG_TABLE}")
+
+            # Only bumps the generation if a shard changed
+            DB.commit()
+        except Exception as e:
+            DB.SQLconnect.rollback()
+            Logger.fatal(f"Failed to refresh the catalog shards: {e}", "DATABASE")
+            return 0
+        finally:
+            DB.SQLconnect.execute(f"DROP TABLE IF EXISTS temp.{_REFRESH_TABLE}")
+
+        # The files of shards unknown to the DB, e.g. after a clear
+        known = {shard["file_name"] for shard in get_shards(DB)}
+        for path in get_shards_folder(DB).glob(_SHARD_FILE_PATTERN):
+            if path.name not in known:
+                _delete_shard_file(path)
+
+        sync_shards(DB)
+
+    Logger.info(
+        f"Catalog shards refreshed ({row_count} rows) in {time.perf_counter() - start:.3f}s: "
+        f"{len(rewritten)} rewritten, {len(counts) - len(rewritten)} unchanged, {len(removed)} removed",
+        "DATABASE",
+    )
+    return row_count
@@ -0,0 +1,137 @@
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from src.Database.DBClass import DB
+from src.Database.Catalog import CATALOG_TABLE, CATALOG_COLUMNS, FLAG_COLUMNS
+from src.Logger.LoggerClass import Logger
+
+# The catalog is written as an uncompressed Arrow IPC (Feather v2) file at the
+# end of each scan. The Parquet export (see CatalogExport) memory-maps it
+# instead of materializing the catalog row by row through `pd.read_sql_query`;
+# the app filters and pages the catalog in SQL and never loads it whole.
+#
+# Snapshots are named after the DB generation they were taken at, so a snapshot
+# is only used while the DB has not changed, and a new one never has to replace
+# a file that is still memory-mapped (not possible on Windows).
+
+
+def get_snapshot_folder(DB: DB) -> Path:
+    db_path = Path(DB.DB_PATH)
+    return db_path.parent / f"{db_path.stem}_snapshots"
+
+
+def get_snapshot_path(DB: DB, generation: int) -> Path:
+    return get_snapshot_folder(DB) / f"catalog_{generation}.arrow"
+
+
+def _arrow_type(column: str, sql_type: str) -> pa.DataType:
+    if column in FLAG_COLUMNS:
+        return pa.bool_()
+    if sql_type.startswith("INTEGER"):
+        return pa.int64()
+    return pa.string()
+
+
+def _remove_old_snapshots(DB: DB, keep: Path) -> None:
+    for snapshot in get_snapshot_folder(DB).glob("catalog_*.arrow"):
+        if snapshot == keep:
+            continue
+        try:
+            os.remove(snapshot)
+        except OSError:
+            # Still memory-mapped by a running export, will be removed next time
+            pass
+
+
+def write_snapshot(DB: DB) -> Path | None:
+    """Writes the catalog to an Arrow snapshot for the current generation.
+    Path, tag and version columns are dictionary encoded (categorical once
+    loaded in pandas).
+
+    Args:
+        DB (DB): The database holding the catalog
+
+    Returns:
+        Path | None: The path of the snapshot, None if the DB changed while
+                     it was being written
+    """
+    start = time.perf_counter()
+    generation = DB.get_generation()
+
+    cursor = DB.reader.execute(f"SELECT * FROM {CATALOG_TABLE}")
+    names = [description[0] for description in cursor.description]
+    columns = list(zip(*cursor.fetchall())) or [()] * len(names)
+
+    if DB.get_generation() != generation:
+        Logger.warn("The DB changed while writing the snapshot, skipping", "DATABASE")
+        return None
+
+    arrays = []
+    for name, values in zip(names, columns):
+        arrow_type = _arrow_type(name, CATALOG_COLUMNS.get(name, ""))
+        if arrow_type == pa.bool_():
+            values = [bool(v) for v in values]
+
+        array = pa.array(values, type=arrow_type)
+        if arrow_type == pa.string():
+            array = array.dictionary_encode()
+        arrays.append(array)
+
+    snapshot_path = get_snapshot_path(DB, generation)
+    os.makedirs(snapshot_path.parent, exist_ok=True)
+
+    tmp_path = snapshot_path.with_suffix(".tmp")
+    feather.write_feather(
+        pa.Table.from_arrays(arrays, names=names),
+        str(tmp_path),
+        compression="uncompressed",  # Needed to be memory-mapped as is
+    )
+    os.replace(tmp_path, snapshot_path)
+
+    _remove_old_snapshots(DB, snapshot_path)
+
+    Logger.info(
+        f"Catalog snapshot written in {time.perf_counter() - start:.3f}s: {snapshot_path}",
+        "DATABASE",
+    )
+    return snapshot_path
+
+
+def read_snapshot(DB: DB, generation: int) -> pd.DataFrame | None:
+    """Memory-maps the catalog snapshot of `generation`
+
+    Args:
+        DB (DB): The database the snapshot was taken from
+        generation (int): The generation of the wanted snapshot
+
+    Returns:
+        pd.DataFrame | None: The catalog, None if there is no snapshot for
+                             this generation
+    """
+    snapshot_path = get_snapshot_path(DB, generation)
+    if not snapshot_path.is_file():
+        return None
+
+    start = time.perf_counter()
+
+    try:
+        table = feather.read_table(str(snapshot_path), memory_map=True)
+    except (OSError, pa.ArrowInvalid) as e:
+        Logger.error(f"Failed to read catalog snapshot {snapshot_path}: {e}")
+        return None
+
+    df = table.to_pandas(
+        split_blocks=True,
+        types_mapper={pa.int64(): pd.Int64Dtype()}.get,
+    )
+
+    Logger.info(
+        f"Catalog snapshot loaded in {(time.perf_counter() - start) * 1000:.1f}ms",
+        "DATABASE",
+    )
+    return df
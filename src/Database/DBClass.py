@@ -1,42 +1,558 @@
+import atexit
 import sqlite3
 import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
 from src.Logger.LoggerClass import Logger
 from src.Utils.ParamsLoader import ConfigManager
 
 
 class DB:
-    # TODO: Implem in_memory DB option
+    """A SQLite database with a single writer connection (`SQLconnect`) and a
+    read-only connection per reading thread (`reader`).
+
+    The writer is shared by every thread of the process: the threads writing
+    to it hold `writing()` for their whole transaction. The readers only see
+    committed data (WAL mode), so the app sessions keep querying while a scan
+    writes.
+
+    In memory mode (DB.TEMP_DB), the DB is loaded from `DB_PATH` into memory
+    and the file is only its durable copy, written with the backup API at the
+    end of each `writing()` block and every DB.TEMP_DB_SAVE_SECONDS (see
+    `sync`). The queries never touch the disk. The readers open a read copy
+    of the memory DB (see `_refresh_read_copy`), taken each time a write is
+    finished, so they never see a write in progress.
+    """
+
     def __init__(
         self,
         DB_PATH: str,
         SQLconnect: sqlite3.Connection | None = None,
         check_same_thread: bool = False,
+        override: bool | None = None,
+        in_memory: bool | None = None,
     ):
+        """Opens the DB at `DB_PATH`
+
+        Args:
+            override (bool | None, optional): Deletes an existing DB file first.
+                                              Defaults to DB.OVERRIDE_DB.
+            in_memory (bool | None, optional): Works on an in-memory copy of
+                                               the DB file. Defaults to DB.TEMP_DB.
+        """
         self.DB_PATH = DB_PATH
         self.check_same_thread = check_same_thread
+        # The indexes dropped by `bulk_load`, recreated on commit
+        self._bulk_indexes = None
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        # The read-only connection of each thread (see `reader`), with the
+        # versions of the federation and of the read copy it was set up with
+        self._readers: dict[
+            threading.Thread, tuple[sqlite3.Connection, tuple[int, int]]
+        ] = {}
+        self._readers_lock = threading.Lock()
+        # The attached DB files and temporary views of the readers (see `federate`)
+        self._federation: tuple[dict[str, str], dict[str, str]] = ({}, {})
+        self._federation_version = 0
+        self._writer_federation_version = 0
+        # The thread holding `writing()`
+        self._write_owner = None
+        # The read copy of the memory DB (see `_refresh_read_copy`): its URI,
+        # the connection keeping it alive and its version, and the state of
+        # the writer it was taken at
+        self._read_copy: tuple[str, sqlite3.Connection, int] | None = None
+        self._read_copy_version = 0
+        self._copied_state = None
+
+        if in_memory is None:
+            in_memory = ConfigManager.get("DB.TEMP_DB", False)
+        self.in_memory = bool(in_memory) and not SQLconnect and str(DB_PATH) != ":memory:"
+        # The writer state (see `_writer_state`) and the generation of the
+        # file when it was last loaded or saved (memory mode)
+        self._saved_changes = None
+        self._disk_generation = None
+        self._closed = threading.Event()
+
+        # An external or in-memory connection cannot be opened again
+        self._single_connection = (
+            SQLconnect is not None or str(DB_PATH) == ":memory:" or self.in_memory
+        )
 
         if SQLconnect:
             self.SQLconnect = SQLconnect
         else:
-            if not ConfigManager.get("DB.OVERRIDE_DB") and os.path.exists(str(DB_PATH)):
+            if override is None:
+                override = ConfigManager.get("DB.OVERRIDE_DB")
+            elif not override and ConfigManager.get("DB.OVERRIDE_DB"):
                 Logger.warn(
-                    f"Database file already exists at {DB_PATH}. To override it, set DB.OVERRIDE_DB to true in settings.json",
+                    f"DB.OVERRIDE_DB is ignored, the existing database at {DB_PATH} is kept",
                     "DATABASE",
                 )
-            else:
-                if os.path.exists(str(DB_PATH)):
-                    Logger.info(
-                        f"Overriding existing database at {DB_PATH}", "DATABASE"
-                    )
-                    os.remove(str(DB_PATH))
 
-            self.SQLconnect = sqlite3.connect(
-                DB_PATH, check_same_thread=check_same_thread
+            if override and os.path.exists(str(DB_PATH)):
+                Logger.info(f"Overriding existing database at {DB_PATH}", "DATABASE")
+                os.remove(str(DB_PATH))
+
+            self.SQLconnect = self._connect()
+
+        self._setup_connection()
+
+        if self.in_memory:
+            self._mark_saved()
+            save_seconds = ConfigManager.get("DB.TEMP_DB_SAVE_SECONDS", 300)
+            if save_seconds > 0:
+                threading.Thread(
+                    target=self._autosave, args=(save_seconds,), daemon=True
+                ).start()
+            atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens the writer, loading the DB file into memory in memory mode"""
+        if not self.in_memory:
+            return sqlite3.connect(self.DB_PATH, check_same_thread=self.check_same_thread)
+
+        connection = sqlite3.connect(":memory:", check_same_thread=self.check_same_thread)
+        if os.path.exists(self.DB_PATH):
+            start = time.perf_counter()
+            disk = self._open_disk()
+            try:
+                disk.backup(connection)
+            finally:
+                disk.close()
+            Logger.info(
+                f"Loaded {self.DB_PATH} in memory in {time.perf_counter() - start:.3f}s",
+                "DATABASE",
             )
 
+        return connection
+
+    def _setup_connection(self, generation: int = 0) -> None:
+        """Applies the connection settings and creates the `db_meta` table
+        holding the data generation (starting at `generation` if new)"""
+
         # Forces the foreign Keys (duh)
         self.SQLconnect.execute("PRAGMA foreign_keys = ON;")
         self.SQLconnect.execute("PRAGMA journal_mode = WAL;")
+        self._setup_pragmas(self.SQLconnect)
+
+        self.SQLconnect.execute(
+            "CREATE TABLE IF NOT EXISTS db_meta (key VARCHAR(255) PRIMARY KEY, value INTEGER)"
+        )
+        self.SQLconnect.execute(
+            "INSERT OR IGNORE INTO db_meta (key, value) VALUES ('generation', ?)",
+            (generation,),
+        )
+        self.SQLconnect.commit()
+
+    def _setup_pragmas(self, connection: sqlite3.Connection) -> None:
+        """Applies the settings shared by the writer and the readers"""
+        # Waits for the lock of another connection (e.g. a checkpoint, or the
+        # scanner process writing) instead of failing with "database is locked"
+        busy_timeout = ConfigManager.get("DB.BUSY_TIMEOUT_MS", 5000)
+        connection.execute(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+
+        # Reads through a memory map shared by all the connections, instead
+        # of copying the pages in the cache of each one
+        mmap_size_mb = ConfigManager.get("DB.MMAP_SIZE_MB", 256)
+        connection.execute(f"PRAGMA mmap_size = {int(mmap_size_mb) * 1024 * 1024}")
+
+    @property
+    def reader(self) -> sqlite3.Connection:
+        """The read-only connection of the current thread, opened on first use.
+        It only sees committed data, whatever the writer is doing.
+
+        In memory mode, it reads the copy taken when the last write finished,
+        except in the thread holding `writing()`, which reads the writer (and
+        its own writes). Falls back to the writer for an in-memory or
+        external connection.
+        """
+        if self._single_connection and (
+            not self.in_memory or self._write_owner is threading.current_thread()
+        ):
+            self._setup_writer_federation()
+            return self.SQLconnect
+
+        # Not while another thread writes, the copy is taken when it is done
+        if self.in_memory and self._write_lock.acquire(blocking=False):
+            try:
+                self._refresh_read_copy()
+            finally:
+                self._write_lock.release()
+
+        thread = threading.current_thread()
+        with self._readers_lock:
+            connection, version = self._readers.get(thread, (None, None))
+            # A reader of an old read copy moves to the new one
+            if connection is not None and version[1] != self._read_copy_version:
+                self._readers.pop(thread)[0].close()
+                connection = None
+
+            if connection is None:
+                # Streamlit runs each rerun in a new thread
+                self._close_readers(only_dead=True)
+
+                if self.in_memory:
+                    connection = sqlite3.connect(
+                        self._read_copy[0],
+                        uri=True,
+                        check_same_thread=False,  # Closed by other threads
+                    )
+                    connection.execute("PRAGMA query_only = ON")
+                else:
+                    connection = sqlite3.connect(
+                        Path(self.DB_PATH).absolute().as_uri() + "?mode=ro",
+                        uri=True,
+                        check_same_thread=False,  # Closed by other threads
+                    )
+                self._setup_pragmas(connection)
+
+            if version != (self._federation_version, self._read_copy_version):
+                self._setup_federation(connection, read_only=True)
+                self._readers[thread] = (
+                    connection,
+                    (self._federation_version, self._read_copy_version),
+                )
+
+        return connection
+
+    def _setup_writer_federation(self) -> None:
+        """Sets up the federation on the writer when it is read from (single
+        connection), only by a thread that can hold it and out of a
+        transaction, since ATTACH would fail"""
+        if self._writer_federation_version == self._federation_version:
+            return
+        if not self._write_lock.acquire(blocking=False):
+            return  # Set up by the next reader, once the writer is free
+
+        try:
+            if not self.SQLconnect.in_transaction:
+                self._setup_federation(self.SQLconnect, read_only=False)
+                self._writer_federation_version = self._federation_version
+        finally:
+            self._write_lock.release()
+
+    def _refresh_read_copy(self) -> None:
+        """Copies the memory DB to a new read copy if it changed since the
+        last one (memory mode), with the writer held: when a `writing()` block
+        ends, or when a reader is opened while no thread writes. Not while a
+        transaction is open, the readers only see committed data.
+
+        Each copy is a new shared-cache memory DB: the readers move to it on
+        their next use, the previous one is freed when its last reader closes.
+        """
+        if self.SQLconnect.in_transaction:
+            return
+
+        state = self._writer_state()
+        if self._read_copy is not None and state == self._copied_state:
+            return
+
+        start = time.perf_counter()
+        version = self._read_copy_version + 1
+        uri = f"file:dopplermanager-{id(self)}-{version}?mode=memory&cache=shared"
+        holder = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self.SQLconnect.backup(holder)
+
+        with self._readers_lock:
+            previous = self._read_copy
+            self._read_copy = (uri, holder, version)
+            self._read_copy_version = version
+        if previous is not None:
+            previous[1].close()  # The readers still on it keep it alive
+        self._copied_state = state
+
+        Logger.debug(
+            f"Read copy {version} of the in-memory DB taken in {time.perf_counter() - start:.3f}s",
+            "DATABASE",
+        )
+
+    def _writer_state(self) -> tuple[int, int]:
+        """The rows changed by the writer and the schema version, which
+        changes with the tables and indexes (not counted in `total_changes`)"""
+        return (
+            self.SQLconnect.total_changes,
+            self.SQLconnect.execute("PRAGMA schema_version").fetchone()[0],
+        )
+
+    def _close_readers(self, only_dead: bool = False) -> None:
+        """Closes the readers (of the finished threads only if `only_dead`),
+        with `_readers_lock` held"""
+        for thread in list(self._readers):
+            if not only_dead or not thread.is_alive():
+                self._readers.pop(thread)[0].close()
+
+    def federate(self, attached: dict[str, str], views: dict[str, str]) -> None:
+        """Sets the DB files attached to the readers and the temporary views
+        created on them, e.g. a view over tables split across several files.
+        A temporary view hides the table of the same name in this DB.
+
+        The readers are set up again on their next use.
+
+        Args:
+            attached (dict[str, str]): The path of each attached DB, by alias
+                                       (read-only)
+            views (dict[str, str]): The query of each temporary view, by name
+        """
+        with self._readers_lock:
+            if (attached, views) == self._federation:
+                return
+
+            self._federation = (dict(attached), dict(views))
+            self._federation_version += 1
+
+    def _setup_federation(self, connection: sqlite3.Connection, read_only: bool) -> None:
+        """Replaces the attached DBs and temporary views of a connection by
+        the current federation"""
+        attached, views = self._federation
+
+        for (view,) in connection.execute(
+            "SELECT name FROM sqlite_temp_master WHERE type = 'view'"
+        ).fetchall():
+            connection.execute(f"DROP VIEW temp.{view}")
+        for _, alias, _ in connection.execute("PRAGMA database_list").fetchall():
+            if alias not in ("main", "temp"):
+                connection.execute(f"DETACH DATABASE {alias}")
+
+        for alias, path in attached.items():
+            if read_only:
+                path = Path(path).absolute().as_uri() + "?mode=ro"
+            connection.execute(f"ATTACH DATABASE ? AS {alias}", (str(path),))
+        for view, query in views.items():
+            connection.execute(f"CREATE TEMP VIEW {view} AS {query}")
+
+    @contextmanager
+    def writing(self):
+        """Holds the writer for a whole write transaction (or several), so the
+        writes of other threads are not mixed into it. Re-entrant.
+
+        In memory mode, the readers see the writes and the DB file is saved
+        when the outermost block ends.
+        """
+        with self._write_lock:
+            self._write_depth += 1
+            self._write_owner = threading.current_thread()
+            try:
+                yield
+            finally:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self._write_owner = None
+                    if self.in_memory:
+                        self._refresh_read_copy()
+                        self._save()
+
+    def _open_disk(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.DB_PATH)
+        self._setup_pragmas(connection)
+        return connection
+
+    def _read_disk_generation(self, disk: sqlite3.Connection) -> int | None:
+        try:
+            res = disk.execute(
+                "SELECT value FROM db_meta WHERE key = 'generation'"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None  # A new file
+
+        return res[0] if res else None
+
+    def _mark_saved(self) -> None:
+        self._saved_changes = self._writer_state()
+        self._disk_generation = self.get_generation()
+
+    def _has_unsaved_changes(self) -> bool:
+        return self._writer_state() != self._saved_changes
+
+    def _save(self) -> bool:
+        """Copies the in-memory DB to the DB file if it changed, with the
+        writer held and no transaction open
+
+        Returns:
+            bool: True if the file was written
+        """
+        if self.SQLconnect.in_transaction or not self._has_unsaved_changes():
+            return False
+
+        start = time.perf_counter()
+        disk = self._open_disk()
+        try:
+            disk_generation = self._read_disk_generation(disk)
+            if disk_generation not in (None, self._disk_generation):
+                Logger.warn(
+                    f"{self.DB_PATH} was changed by another process since it was loaded, overwriting it",
+                    "DATABASE",
+                )
+
+            self.SQLconnect.backup(disk)
+            # The copy carries the journal mode of the memory DB
+            disk.execute("PRAGMA journal_mode = WAL")
+        finally:
+            disk.close()
+
+        self._mark_saved()
+        Logger.info(
+            f"In-memory DB saved to {self.DB_PATH} in {time.perf_counter() - start:.3f}s",
+            "DATABASE",
+        )
+        return True
+
+    def save(self) -> bool:
+        """Copies the in-memory DB to the DB file if it changed since it was
+        loaded or last saved (memory mode only)
+
+        Returns:
+            bool: True if the file was written
+        """
+        if not self.in_memory:
+            return False
+
+        with self._write_lock:
+            return self._save()
+
+    def sync(self) -> None:
+        """Saves the in-memory DB if it changed, or loads the DB file again if
+        another process (e.g. the scanner) wrote to it in the meantime"""
+        if not self.in_memory:
+            return
+
+        with self._write_lock:
+            if self._has_unsaved_changes():
+                self._save()
+                return
+
+            disk = self._open_disk()
+            try:
+                disk_generation = self._read_disk_generation(disk)
+                if disk_generation in (None, self._disk_generation):
+                    return
+
+                disk.backup(self.SQLconnect)
+            finally:
+                disk.close()
+
+            self._copied_state = None  # Copied again by the next reader
+            self._mark_saved()
+            Logger.info(
+                f"Loaded {self.DB_PATH} in memory again (generation {disk_generation})",
+                "DATABASE",
+            )
+
+    def _autosave(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            try:
+                self.sync()
+            except sqlite3.Error as e:
+                Logger.error(f"Failed to sync the in-memory DB: {e}", "DATABASE")
+
+    def get_generation(self) -> int:
+        """Returns the data generation of the DB. It is increased on every
+        commit that changed data, by this process or any other one, so it can
+        be used as a cache key.
+
+        Returns:
+            int: The current (committed) generation
+        """
+        res = self.reader.execute(
+            "SELECT value FROM db_meta WHERE key = 'generation'"
+        ).fetchone()
+
+        return res[0] if res else 0
+
+    def commit(self) -> None:
+        """Commits the current transaction, increasing the data generation if
+        anything was written. In a bulk load, the dropped indexes are
+        recreated and the foreign keys checked first."""
+        if self._bulk_indexes is not None and self.SQLconnect.in_transaction:
+            self._finish_bulk_load()
+
+        if self.SQLconnect.in_transaction:
+            self.SQLconnect.execute(
+                "UPDATE db_meta SET value = value + 1 WHERE key = 'generation'"
+            )
+
+        self.SQLconnect.commit()
+
+    @contextmanager
+    def bulk_load(self, tables: list[str]):
+        """Fast mode for loading a whole DB: everything until the next `commit`
+        runs in a single transaction with the indexes of `tables` dropped and
+        the foreign keys not enforced, without syncing to disk and with a
+        large cache (DB.BULK_CACHE_SIZE_MB).
+
+        The commit recreates the indexes and checks the foreign keys at once,
+        so readers never see the data without them. A rollback restores the
+        indexes. The usual settings are restored when leaving the block.
+
+        Args:
+            tables (list[str]): The tables being loaded
+        """
+        self.commit()  # The pragmas below cannot change inside a transaction
+
+        settings = {
+            pragma: self.SQLconnect.execute(f"PRAGMA {pragma}").fetchone()[0]
+            for pragma in ("synchronous", "cache_size", "temp_store")
+        }
+        cache_size_mb = ConfigManager.get("DB.BULK_CACHE_SIZE_MB", 256)
+
+        self.SQLconnect.execute("PRAGMA foreign_keys = OFF")
+        self.SQLconnect.execute("PRAGMA synchronous = OFF")
+        self.SQLconnect.execute(f"PRAGMA cache_size = {-cache_size_mb * 1024}")  # KiB
+        self.SQLconnect.execute("PRAGMA temp_store = MEMORY")
+
+        try:
+            self.SQLconnect.execute("BEGIN")
+
+            # Only the explicit indexes, not the ones of the constraints
+            self._bulk_indexes = self.SQLconnect.execute(
+                f"""
+                SELECT name, sql FROM sqlite_master
+                WHERE type = 'index' AND sql IS NOT NULL
+                AND tbl_name IN ({", ".join("?" for _ in tables)})
+                """,
+                tables,
+            ).fetchall()
+            for name, _ in self._bulk_indexes:
+                self.SQLconnect.execute(f"DROP INDEX {name}")
+
+            yield
+        finally:
+            if self.SQLconnect.in_transaction:
+                # Not committed (or the check failed), the indexes come back
+                self.SQLconnect.rollback()
+            self._bulk_indexes = None
+
+            self.SQLconnect.execute("PRAGMA foreign_keys = ON")
+            for pragma, value in settings.items():
+                self.SQLconnect.execute(f"PRAGMA {pragma} = {value}")
+
+    def _finish_bulk_load(self) -> None:
+        """Recreates the indexes dropped by `bulk_load` and checks the foreign
+        keys of the loaded rows, in the bulk transaction
+
+        Raises:
+            sqlite3.IntegrityError: If rows reference missing parents
+        """
+        start = time.perf_counter()
+        for _, sql in self._bulk_indexes:
+            self.SQLconnect.execute(sql)
+        index_count = len(self._bulk_indexes)
+        self._bulk_indexes = None
+
+        violations = self.SQLconnect.execute("PRAGMA foreign_key_check").fetchall()
+        if violations:
+            tables = sorted({violation[0] for violation in violations})
+            raise sqlite3.IntegrityError(
+                f"{len(violations)} rows reference missing rows ({', '.join(tables)})"
+            )
+
+        Logger.info(
+            f"Bulk load: {index_count} indexes rebuilt and foreign keys checked in {time.perf_counter() - start:.3f}s",
+            "DATABASE",
+        )
 
     def check_table_existance(self, table_name: str) -> bool:
         """Will check if the table exists inside the DB
@@ -81,7 +597,7 @@ class DB:
             return
 
         if self.check_table_existance(table_name):
-            Logger.warn(f"{table_name} already exists", "DATABASE")
+            Logger.debug(f"{table_name} already exists", "DATABASE")
             return
 
         for name, _ in columns.items():  # Is not checking for SQLInjection in type
@@ -97,6 +613,41 @@ class DB:
         self.SQLconnect.execute(SQL_COMMAND)
         self.SQLconnect.commit()
 
+    def create_index(
+        self, index_name: str, table_name: str, columns: list[str]
+    ) -> None:
+        """Create an index on `table_name` if it does not exist yet
+
+        Args:
+            index_name (str): The name of the index
+            table_name (str): The name of the indexed table
+            columns (list[str]): The indexed columns, in order
+        """
+
+        for name in [index_name, table_name, *columns]:
+            if not name.isidentifier():
+                Logger.fatal(f"Not a valid identifier for index ({name})", "DATABASE")
+                return
+
+        self.SQLconnect.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(columns)})"
+        )
+        self.SQLconnect.commit()
+
+    def create_view(self, view_name: str, query: str) -> None:
+        """Create a view if it does not exist yet
+
+        Args:
+            view_name (str): The name of the view
+            query (str): The SELECT statement of the view
+        """
+        if not view_name.isidentifier():
+            Logger.fatal(f"Not a valid identifier for view ({view_name})", "DATABASE")
+            return
+
+        self.SQLconnect.execute(f"CREATE VIEW IF NOT EXISTS {view_name} AS {query}")
+        self.SQLconnect.commit()
+
     def insert(
         self, table_name: str, data: dict[str, object], do_commit: bool = True
     ) -> int | None:
@@ -123,7 +674,7 @@ class DB:
         cursor = self.SQLconnect.execute(SQL_COMMAND, tuple(data.values()))
 
         if do_commit:
-            self.SQLconnect.commit()
+            self.commit()
 
         return cursor.lastrowid
 
@@ -152,27 +703,47 @@ class DB:
             sql = f"SELECT * FROM {table_name}"
             cursor = self.SQLconnect.execute(sql)
 
-        return [dict(row) for row in cursor.fetchall()]
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
-    # def close(self):
-    #     self.SQLconnect.close()
+    def close(self) -> None:
+        """Closes the writer and all the readers, saving the in-memory DB first"""
+        if self._closed.is_set():
+            return
 
-    def clear_db(self) -> None:
+        self._closed.set()  # Stops the autosave
+        if self.in_memory:
+            self.save()
+        self._close_connections()
+
+    def _close_connections(self) -> None:
+        with self._readers_lock:
+            self._close_readers()
+            if self._read_copy is not None:
+                self._read_copy[1].close()
+                self._read_copy = None
         self.SQLconnect.close()
 
+    def clear_db(self) -> None:
+        # The generation carries on, so caches of the old data are not reused
+        generation = self.get_generation() + 1
+        self._close_connections()  # The readers too, so they reopen the new file
+
         try:
             if os.path.exists(self.DB_PATH):
                 os.remove(self.DB_PATH)
-            else:
+            elif not self.in_memory:  # Not saved yet in memory mode
                 Logger.error(f"Error removing database file {self.DB_PATH}", "DATABASE")
         except OSError as e:
             Logger.error(
                 f"Error removing database file {self.DB_PATH}: {e}", "DATABASE"
             )
 
-        self.SQLconnect = sqlite3.connect(
-            self.DB_PATH, check_same_thread=self.check_same_thread
-        )
+        self.SQLconnect = self._connect()
+        self._setup_connection(generation)
+        self._saved_changes = None  # The empty DB is saved like any change
+        self._writer_federation_version = 0  # Set up again on the new writer
+        self._copied_state = None
 
         Logger.info(f"Successfully cleared DB: {self.DB_PATH}", "DATABASE")
 
@@ -198,7 +769,7 @@ class DB:
         )
 
         cursor = self.SQLconnect.execute(SQL_COMMAND, tuple(data.values()))
-        self.SQLconnect.commit()
+        self.commit()
 
         return cursor.lastrowid
 
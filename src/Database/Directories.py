@@ -0,0 +1,189 @@
+from pathlib import Path
+
+from src.Database.DBClass import DB
+
+# Path dictionary: every directory holding .holo files (and its parents) is
+# stored once, as a link to its parent directory and its name. The .holo
+# files, previews and HD folders only hold the id of their directory and
+# their own name, and the paths inside a render folder (EF folders, .h5
+# files, reports) are stored relative to it.
+#
+# A name is the exact text appended to the path of the parent, separator
+# included ("Y:\" + "240101" + "\240101_ABC.holo"), so the paths are rebuilt
+# by a plain concatenation, whatever the OS that scanned them. The roots
+# (drives, "/") have no parent.
+#
+# The full paths are rebuilt by the `directory_paths` view, and the
+# `*_paths` views of each render table (see FileFinder.CreateDB). The
+# directories no row references anymore (deleted folders) are removed after
+# each write of the scan results (see `remove_unused_directories`).
+
+DIRECTORIES_TABLE = "directories"
+
+DIRECTORIES_COLUMNS = {
+    "id": "INTEGER PRIMARY KEY",
+    "parent_id": "INTEGER",
+    "name": "VARCHAR(255) NOT NULL",
+    # Also the index of the lookups of the children of a directory
+    "UNIQUE (parent_id, name)": "",
+    "FOREIGN KEY (parent_id)": f"REFERENCES {DIRECTORIES_TABLE} (id)",
+}
+
+DIRECTORY_PATHS_VIEW = "directory_paths"
+
+# The tables holding a directory id
+DIRECTORY_REFERENCES = {
+    "holo_data": "dir_id",
+    "preview_doppler_video": "dir_id",
+    "hd_render": "dir_id",
+}
+
+_DIRECTORY_PATHS_QUERY = f"""
+    WITH RECURSIVE paths (id, path) AS (
+        SELECT id, name FROM {DIRECTORIES_TABLE} WHERE parent_id IS NULL
+        UNION ALL
+        SELECT child.id, paths.path || child.name
+        FROM {DIRECTORIES_TABLE} AS child
+        JOIN paths ON child.parent_id = paths.id
+    )
+    SELECT id, path FROM paths
+"""
+
+# The ids of a directory and all its sub-directories
+SUBTREE_QUERY = f"""
+    WITH RECURSIVE subtree (id) AS (
+        SELECT ?
+        UNION ALL
+        SELECT child.id
+        FROM {DIRECTORIES_TABLE} AS child
+        JOIN subtree ON child.parent_id = subtree.id
+    )
+    SELECT id FROM subtree
+"""
+
+
+def create_directories(DB: DB) -> None:
+    """Creates the directories table and the `directory_paths` view"""
+    DB.create_table(DIRECTORIES_TABLE, DIRECTORIES_COLUMNS)
+    DB.create_view(DIRECTORY_PATHS_VIEW, _DIRECTORY_PATHS_QUERY)
+
+
+def remove_unused_directories(DB: DB) -> int:
+    """Removes the directories no row references anymore, and no stored
+    directory is under, without committing. The used directories keep
+    their ids.
+
+    Returns:
+        int: The number of removed directories
+    """
+    used = " UNION ".join(
+        f"SELECT {column} FROM {table}" for table, column in DIRECTORY_REFERENCES.items()
+    )
+
+    # The referenced directories and their parents, up to the roots: all the
+    # others are the unused leaves and the parents left with unused leaves only
+    cursor = DB.SQLconnect.execute(
+        f"""
+        WITH RECURSIVE used (id) AS (
+            {used}
+            UNION
+            SELECT parent.parent_id
+            FROM {DIRECTORIES_TABLE} AS parent
+            JOIN used ON parent.id = used.id
+            WHERE parent.parent_id IS NOT NULL
+        )
+        DELETE FROM {DIRECTORIES_TABLE} WHERE id NOT IN (SELECT id FROM used)
+        """
+    )
+    return cursor.rowcount
+
+
+def split_path(path: str | Path) -> tuple[str | None, str]:
+    """Splits a path into its parent and the text appended to it
+
+    Returns:
+        tuple[str | None, str]: The parent (None for a root) and the name
+    """
+    path = Path(path)
+    full_path = str(path)
+    parent = str(path.parent)
+
+    if path.parent == path or not full_path.startswith(parent):
+        return None, full_path  # A root, or the first part of a relative path
+
+    return parent, full_path[len(parent) :]
+
+
+def relative_name(path: str | Path | None, folder: str | Path) -> str | None:
+    """Returns the text appended to `folder` to get `path`, None for no path
+
+    Raises:
+        ValueError: If `path` is not inside `folder`
+    """
+    if not path:
+        return None
+
+    path, folder = str(path), str(folder)
+    name = path[len(folder) :]
+    if not path.startswith(folder) or name[:1] not in ("/", "\\"):
+        raise ValueError(f"{path} is not inside {folder}")
+
+    return name
+
+
+class DirectoryDictionary:
+    """Maps the directories to their id in the `directories` table, adding
+    the missing ones.
+
+    The ids are cached, so use one dictionary per transaction: the ids added
+    by a rolled back transaction do not exist anymore.
+    """
+
+    def __init__(self, DB: DB):
+        self.DB = DB
+        self._ids = {}
+
+    def get_id(self, directory: str | Path, create: bool = True) -> int | None:
+        """Returns the id of a directory, None if it is not stored and
+        `create` is False"""
+        directory = str(directory)
+        if directory in self._ids:
+            return self._ids[directory]
+
+        parent, name = split_path(directory)
+        parent_id = None
+        if parent is not None:
+            parent_id = self.get_id(parent, create)
+            if parent_id is None:
+                return None
+
+        row = self.DB.SQLconnect.execute(
+            f"SELECT id FROM {DIRECTORIES_TABLE} WHERE parent_id IS ? AND name = ?",
+            (parent_id, name),
+        ).fetchone()
+
+        if row is not None:
+            dir_id = row[0]
+        elif create:
+            dir_id = self.DB.SQLconnect.execute(
+                f"INSERT INTO {DIRECTORIES_TABLE} (parent_id, name) VALUES (?, ?)",
+                (parent_id, name),
+            ).lastrowid
+        else:
+            return None
+
+        self._ids[directory] = dir_id
+        return dir_id
+
+    def split(self, path: str | Path | None) -> tuple[int | None, str | None]:
+        """Returns the directory id and the name to store for a path
+        (a file or a folder), (None, None) for no path"""
+        if not path:
+            return None, None
+
+        parent, name = split_path(path)
+        if parent is None:
+            # A root itself is stored as the empty name under it
+            return self.get_id(name), ""
+
+        return self.get_id(parent), name
@@ -0,0 +1,188 @@
+import datetime
+import os
+import sqlite3
+import time
+
+from src.Database.DBClass import DB
+from src.Logger.LoggerClass import Logger
+from src.Utils.ParamsLoader import ConfigManager
+
+# Maintenance of the DB file as the catalog ages: each scan rewrites the
+# catalog and replaces the rows of the scanned roots, which leaves free pages
+# in the file, stale planner statistics, and a WAL file that only shrinks on
+# a checkpoint no reader is blocking.
+#
+# `maintain_if_due` runs `run_maintenance` after large scans, and in idle
+# ticks of the scan scheduler, when one of the DB.MAINTENANCE thresholds is
+# reached. The sidebar also has a manual trigger.
+
+# db_meta key of the last maintenance (unix time)
+LAST_MAINTENANCE_KEY = "last_maintenance"
+
+
+def get_db_stats(DB: DB) -> dict[str, object]:
+    """Returns the page and freelist statistics of the DB, and its file sizes
+
+    Returns:
+        dict[str, object]: page_size, page_count, freelist_count, free_ratio,
+                           size_bytes, wal_bytes and last_maintenance (a
+                           datetime, None if never run)
+    """
+    connection = DB.reader
+    page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+    page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+    freelist_count = connection.execute("PRAGMA freelist_count").fetchone()[0]
+
+    wal_path = f"{DB.DB_PATH}-wal"
+    wal_bytes = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+
+    res = connection.execute(
+        "SELECT value FROM db_meta WHERE key = ?", (LAST_MAINTENANCE_KEY,)
+    ).fetchone()
+
+    return {
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+        "free_ratio": freelist_count / page_count if page_count else 0.0,
+        "size_bytes": page_size * page_count,
+        "wal_bytes": wal_bytes,
+        "last_maintenance": datetime.datetime.fromtimestamp(res[0]) if res else None,
+    }
+
+
+def run_maintenance(
+    DB: DB, vacuum: bool | None = None, full_check: bool | None = None
+) -> dict[str, object]:
+    """Checks the integrity of the DB, updates the planner statistics
+    (ANALYZE), rebuilds the file if it is fragmented (VACUUM) and truncates
+    the WAL file (checkpoint). Holds the writer the whole time.
+
+    Args:
+        vacuum (bool | None, optional): Forces (or skips) the VACUUM. Defaults
+            to vacuuming when the free pages reach DB.MAINTENANCE.VACUUM_FREE_RATIO.
+        full_check (bool | None, optional): Runs `integrity_check` instead of
+            the faster `quick_check` (no index content check). Defaults to
+            DB.MAINTENANCE.FULL_INTEGRITY_CHECK.
+
+    Returns:
+        dict[str, object]: The stats before and after (see `get_db_stats`),
+                           the integrity problems (empty if none) and the
+                           seconds spent in each step
+    """
+    if full_check is None:
+        full_check = ConfigManager.get("DB.MAINTENANCE.FULL_INTEGRITY_CHECK", False)
+
+    durations = {}
+
+    def timed(step: str, sql: str) -> list[tuple]:
+        start = time.perf_counter()
+        rows = DB.SQLconnect.execute(sql).fetchall()
+        durations[step] = time.perf_counter() - start
+        return rows
+
+    with DB.writing():
+        if DB.SQLconnect.in_transaction:
+            DB.commit()  # VACUUM cannot run in a transaction
+
+        before = get_db_stats(DB)
+
+        rows = timed("integrity", f"PRAGMA {'integrity' if full_check else 'quick'}_check")
+        problems = [row[0] for row in rows if row[0] != "ok"]
+        if problems:
+            # The file is not rewritten on top of a corruption
+            Logger.error(
+                f"Integrity check of {DB.DB_PATH} failed: {'; '.join(problems[:10])}",
+                "DATABASE",
+            )
+            vacuum = False
+
+        # Samples each index, to keep it fast on large tables
+        DB.SQLconnect.execute("PRAGMA analysis_limit = 1000")
+        timed("analyze", "ANALYZE")
+
+        if vacuum is None:
+            vacuum = before["free_ratio"] >= ConfigManager.get(
+                "DB.MAINTENANCE.VACUUM_FREE_RATIO", 0.2
+            )
+        if vacuum:
+            timed("vacuum", "VACUUM")
+
+        # Not a data change: the generation (and the app caches) are kept
+        DB.SQLconnect.execute(
+            "INSERT OR REPLACE INTO db_meta (key, value) VALUES (?, ?)",
+            (LAST_MAINTENANCE_KEY, int(time.time())),
+        )
+        DB.SQLconnect.commit()
+
+        if not DB.in_memory:
+            # Only fully done (and truncated) when no reader is on an old snapshot
+            busy, _, _ = timed("checkpoint", "PRAGMA wal_checkpoint(TRUNCATE)")[0]
+            if busy:
+                Logger.warn("The WAL checkpoint was blocked by a reader", "DATABASE")
+
+        after = get_db_stats(DB)
+
+    Logger.info(
+        f"Maintenance done in {sum(durations.values()):.3f}s: "
+        f"{before['size_bytes'] / 1e6:.1f} MB -> {after['size_bytes'] / 1e6:.1f} MB, "
+        f"{before['freelist_count']} -> {after['freelist_count']} free pages, "
+        f"WAL {before['wal_bytes'] / 1e6:.1f} MB -> {after['wal_bytes'] / 1e6:.1f} MB, "
+        f"integrity {'ok' if not problems else 'FAILED'}",
+        "DATABASE",
+    )
+
+    return {
+        "before": before,
+        "after": after,
+        "problems": problems,
+        "durations": durations,
+    }
+
+
+def maintenance_reason(DB: DB, changed_rows: int = 0) -> str | None:
+    """Returns why the maintenance is due, None if it is not (or disabled)
+
+    Args:
+        changed_rows (int, optional): The rows written by the last scan
+    """
+    if not ConfigManager.get("DB.MAINTENANCE.ENABLED", True):
+        return None
+
+    stats = get_db_stats(DB)
+
+    if changed_rows >= ConfigManager.get("DB.MAINTENANCE.LARGE_SCAN_ROWS", 10000):
+        return f"large scan ({changed_rows} rows)"
+    if stats["free_ratio"] >= ConfigManager.get("DB.MAINTENANCE.VACUUM_FREE_RATIO", 0.2):
+        return f"{stats['free_ratio']:.0%} free pages"
+    if stats["wal_bytes"] >= ConfigManager.get("DB.MAINTENANCE.WAL_CHECKPOINT_MB", 64) * 1e6:
+        return f"WAL file of {stats['wal_bytes'] / 1e6:.0f} MB"
+
+    interval = datetime.timedelta(
+        hours=ConfigManager.get("DB.MAINTENANCE.INTERVAL_HOURS", 24)
+    )
+    last = stats["last_maintenance"]
+    if last is None or datetime.datetime.now() - last >= interval:
+        return "never run" if last is None else f"last run on {last:%Y-%m-%d %H:%M}"
+
+    return None
+
+
+def maintain_if_due(DB: DB, changed_rows: int = 0) -> dict[str, object] | None:
+    """Runs the maintenance if one of its thresholds is reached (see
+    `maintenance_reason`). A failure is logged, not raised.
+
+    Returns:
+        dict[str, object] | None: The maintenance report, None if not due
+    """
+    reason = maintenance_reason(DB, changed_rows)
+    if reason is None:
+        return None
+
+    Logger.info(f"Running the DB maintenance: {reason}", "DATABASE")
+    try:
+        return run_maintenance(DB)
+    except sqlite3.Error as e:
+        # The scan is already stored, the maintenance is retried next time
+        Logger.error(f"The DB maintenance failed: {e}", "DATABASE")
+        return None
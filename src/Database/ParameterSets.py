@@ -0,0 +1,261 @@
+import hashlib
+import json
+import re
+
+from src.Database.DBClass import DB
+from src.Logger.LoggerClass import Logger
+from src.Utils.ParamsLoader import ConfigManager
+
+# The rendering parameters (HD) and input parameters (EF) are stored once per
+# distinct content: the render rows only hold the hash of their canonical
+# JSON (sorted keys, no whitespace), most renders of a batch sharing the same
+# parameters.
+#
+# The `*_paths` views of the render tables (see FileFinder.CreateDB) join the
+# content back as `rendering_parameters` / `input_parameters`.
+#
+# The keys listed in DB.PARAMETER_COLUMNS ({"HD": {name: JSON path}, "EF":
+# ...}) are exposed as indexed generated columns `<kind>_<name>` (e.g.
+# `hd_batch_size` for "$.batch_size"), so the renders can be filtered on
+# them in SQL (see `parameter_filter_query`).
+
+PARAMETER_SETS_TABLE = "parameter_sets"
+
+PARAMETER_SETS_COLUMNS = {
+    "hash": "VARCHAR(40) PRIMARY KEY",
+    "content": "TEXT NOT NULL",
+}
+
+# The render columns holding a parameter set hash
+PARAMETER_SET_REFERENCES = {
+    "hd_render": "rendering_parameters_hash",
+    "ef_render": "input_parameters_hash",
+}
+
+# The render table of each kind of parameters
+PARAMETER_KINDS = {"HD": "hd_render", "EF": "ef_render"}
+
+DEFAULT_PARAMETER_COLUMNS = {
+    "HD": {
+        "batch_size": "$.batch_size",
+        "f1": "$.time_transform.f1",
+        "f2": "$.time_transform.f2",
+    },
+    "EF": {},
+}
+
+# Only plain keys and array indexes, the paths are written in the SQL
+_JSON_PATH_PATTERN = re.compile(r"^\$(\.[A-Za-z_][A-Za-z0-9_]*|\[[0-9]+\])+$")
+
+# A generated column in the CREATE TABLE statement, with its JSON path
+_GENERATED_COLUMN_PATTERN = re.compile(
+    r"\b(\w+)\s+GENERATED\s+ALWAYS\s+AS\s*\(\s*json_extract\(\s*content\s*,"
+    r"\s*'([^']*)'\s*\)\s*\)",
+    re.IGNORECASE,
+)
+
+
+def _configured_parameter_columns(kind: str) -> dict[str, str]:
+    """Returns the columns of a kind of parameters set in the settings, valid
+    or not"""
+    columns = ConfigManager.get("DB.PARAMETER_COLUMNS", DEFAULT_PARAMETER_COLUMNS)
+    return {
+        f"{kind.lower()}_{name}": path
+        for name, path in (columns.get(kind) or {}).items()
+    }
+
+
+def _is_valid_parameter_column(column: str, path) -> bool:
+    return (
+        column.isidentifier()
+        and isinstance(path, str)
+        and _JSON_PATH_PATTERN.match(path) is not None
+    )
+
+
+def get_parameter_columns(kind: str) -> dict[str, str]:
+    """Returns the generated columns of a kind of parameters ("HD" or "EF"),
+    with their JSON path. The invalid entries of the settings are left out
+    (they have no column, see `_sync_parameter_columns`)."""
+    return {
+        column: path
+        for column, path in _configured_parameter_columns(kind).items()
+        if _is_valid_parameter_column(column, path)
+    }
+
+
+def _column_definition(column: str, path: str) -> str:
+    # Virtual: computed on read, only the index stores the values
+    return f"{column} GENERATED ALWAYS AS (json_extract(content, '{path}')) VIRTUAL"
+
+
+def _sync_parameter_columns(DB: DB) -> None:
+    """Adds the generated columns (and their index) of the configured keys,
+    and drops the ones removed from the settings or whose path changed"""
+    existing = {
+        column[1]
+        for column in DB.SQLconnect.execute(
+            f"PRAGMA table_xinfo({PARAMETER_SETS_TABLE})"
+        )
+    } - set(PARAMETER_SETS_COLUMNS)
+    # The added columns are appended to the CREATE TABLE statement
+    (table_sql,) = DB.SQLconnect.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (PARAMETER_SETS_TABLE,),
+    ).fetchone()
+
+    # The JSON path of each existing column, None if not parsed
+    existing_paths = dict(_GENERATED_COLUMN_PATTERN.findall(table_sql))
+
+    wanted = {}
+    for kind in PARAMETER_KINDS:
+        for column, path in _configured_parameter_columns(kind).items():
+            if not _is_valid_parameter_column(column, path):
+                Logger.error(
+                    f"Invalid parameter column in DB.PARAMETER_COLUMNS ({column}: {path})",
+                    "DATABASE",
+                )
+                continue
+            wanted[column] = path
+
+    for column in list(existing):
+        if column not in wanted or existing_paths.get(column) != wanted[column]:
+            DB.SQLconnect.execute(
+                f"DROP INDEX IF EXISTS idx_{PARAMETER_SETS_TABLE}_{column}"
+            )
+            DB.SQLconnect.execute(
+                f"ALTER TABLE {PARAMETER_SETS_TABLE} DROP COLUMN {column}"
+            )
+            existing.discard(column)
+
+    for column, path in wanted.items():
+        if column not in existing:
+            DB.SQLconnect.execute(
+                f"ALTER TABLE {PARAMETER_SETS_TABLE} ADD COLUMN "
+                f"{_column_definition(column, path)}"
+            )
+        DB.create_index(
+            f"idx_{PARAMETER_SETS_TABLE}_{column}", PARAMETER_SETS_TABLE, [column]
+        )
+
+    DB.SQLconnect.commit()
+
+
+def create_parameter_sets(DB: DB) -> None:
+    """Creates the parameter sets table and its generated columns"""
+    DB.create_table(PARAMETER_SETS_TABLE, PARAMETER_SETS_COLUMNS)
+    _sync_parameter_columns(DB)
+
+
+def canonical_json(content: str) -> str:
+    """Returns the canonical form of a JSON text, the same for any key order
+    or spacing"""
+    return json.dumps(
+        json.loads(content), sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+
+
+def store_parameter_set(DB: DB, content: str | None) -> str | None:
+    """Stores a parameter set if it is new, without committing
+
+    Args:
+        DB (DB): The database holding the parameter sets
+        content (str | None): The JSON text of the parameters
+
+    Returns:
+        str | None: The hash of the set, None for no parameters
+    """
+    if not content:
+        return None
+
+    content = canonical_json(content)
+    content_hash = hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    DB.SQLconnect.execute(
+        f"INSERT OR IGNORE INTO {PARAMETER_SETS_TABLE} (hash, content) VALUES (?, ?)",
+        (content_hash, content),
+    )
+    return content_hash
+
+
+def remove_unused_parameter_sets(DB: DB) -> int:
+    """Removes the parameter sets no render references anymore, without
+    committing
+
+    Returns:
+        int: The number of removed sets
+    """
+    # NOT IN reads each render table once, even without an index on the hash
+    # (dropped during a bulk load)
+    unused = " AND ".join(
+        f"hash NOT IN (SELECT {column} FROM {table} WHERE {column} IS NOT NULL)"
+        for table, column in PARAMETER_SET_REFERENCES.items()
+    )
+
+    cursor = DB.SQLconnect.execute(f"DELETE FROM {PARAMETER_SETS_TABLE} WHERE {unused}")
+    return cursor.rowcount
+
+
+def get_parameter_text(DB: DB, kind: str, content_hash: str | None) -> str | None:
+    """Returns the generated columns of a parameter set as "name=value"
+    words (e.g. "batch_size=64 f1=6"), None for no set or no column"""
+    columns = get_parameter_columns(kind)
+    if content_hash is None or not columns:
+        return None
+
+    row = DB.SQLconnect.execute(
+        f"SELECT {', '.join(columns)} FROM {PARAMETER_SETS_TABLE} WHERE hash = ?",
+        (content_hash,),
+    ).fetchone()
+    if row is None:
+        return None
+
+    prefix = f"{kind.lower()}_"
+    return " ".join(
+        f"{column.removeprefix(prefix)}={value}"
+        for column, value in zip(columns, row)
+        if value is not None
+    )
+
+
+def parameter_values_query(column: str) -> str:
+    """Returns the query of the distinct values of a generated column, read
+    from its index"""
+    return f"""
+        SELECT DISTINCT {column} AS value FROM {PARAMETER_SETS_TABLE}
+        WHERE {column} IS NOT NULL
+        ORDER BY {column}
+    """
+
+
+def parameter_filter_query(
+    kind: str, filters: dict[str, list]
+) -> tuple[str, tuple]:
+    """Returns the query of the ids of the renders whose parameters match all
+    the filters
+
+    Args:
+        kind (str): "HD" or "EF"
+        filters (dict[str, list]): The accepted values of generated columns
+
+    Returns:
+        tuple[str, tuple]: The query and its parameters
+    """
+    table = PARAMETER_KINDS[kind]
+    columns = get_parameter_columns(kind)
+
+    where = []
+    params = []
+    for column, values in filters.items():
+        if column not in columns:
+            Logger.fatal(f"Unknown parameter column ({column})", "DATABASE")
+        where.append(f"params.{column} IN ({', '.join('?' for _ in values)})")
+        params.extend(values)
+
+    query = f"""
+        SELECT render.id FROM {PARAMETER_SETS_TABLE} AS params
+        JOIN {table} AS render
+            ON render.{PARAMETER_SET_REFERENCES[table]} = params.hash
+        WHERE {" AND ".join(where) or "1"}
+    """
+    return query, tuple(params)
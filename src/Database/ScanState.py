@@ -0,0 +1,210 @@
+import datetime
+from pathlib import Path
+
+from src.Database.DBClass import DB
+from src.FileFinder.utils.path_parser import parse_folder_date
+from src.Utils.ParamsLoader import ConfigManager
+
+# Scan state of each date folder, used to rescan the recent ("hot") folders
+# often and the old ("cold") ones rarely.
+#
+# The rescan interval of a folder starts from the tier of its age
+# (FINDER.SCHEDULER.TIERS, a list of [max_age_days, interval_seconds], older
+# folders use COLD_INTERVAL), and doubles every time a rescan finds no change,
+# up to MAX_BACKOFF times the tier interval. A change resets it to the tier.
+
+SCAN_STATE_TABLE = "folder_scan_state"
+
+SCAN_STATE_COLUMNS = {
+    "path": "VARCHAR(255) PRIMARY KEY",
+    "root": "VARCHAR(255) NOT NULL",
+    "folder_date": "DATE",
+    # Hash of what the last scan found (see FinderUtils._folder_fingerprint)
+    "fingerprint": "VARCHAR(64)",
+    "last_scan_at": "TIMESTAMP",
+    "last_change_at": "TIMESTAMP",
+    "next_scan_at": "TIMESTAMP",
+    "interval": "REAL",  # Seconds
+    "scans": "INTEGER NOT NULL DEFAULT 0",
+    "changes": "INTEGER NOT NULL DEFAULT 0",
+    "last_duration": "REAL",
+    "last_io_ops": "INTEGER",
+}
+
+# The counters of io_stats that make up the I/O cost of a folder scan
+IO_OPS_COUNTERS = ["scandir", "stat", "file_read"]
+
+DEFAULT_TIERS = [[2, 300], [14, 3600], [90, 86400]]
+DEFAULT_COLD_INTERVAL = 604800  # 1 week
+
+
+def create_scan_state(DB: DB) -> None:
+    """Creates the folder scan state table"""
+    DB.create_table(SCAN_STATE_TABLE, SCAN_STATE_COLUMNS)
+    DB.create_index("idx_folder_scan_state_due", SCAN_STATE_TABLE, ["next_scan_at"])
+
+
+def get_tier_interval(folder_date: datetime.date | None, today: datetime.date) -> float:
+    """Returns the rescan interval (seconds) of the age tier of a folder"""
+    if folder_date is None:
+        return ConfigManager.get("FINDER.SCHEDULER.COLD_INTERVAL", DEFAULT_COLD_INTERVAL)
+
+    age_days = (today - folder_date).days
+
+    for max_age_days, interval in ConfigManager.get(
+        "FINDER.SCHEDULER.TIERS", DEFAULT_TIERS
+    ):
+        if age_days <= max_age_days:
+            return interval
+
+    return ConfigManager.get("FINDER.SCHEDULER.COLD_INTERVAL", DEFAULT_COLD_INTERVAL)
+
+
+def get_scan_interval(
+    folder_date: datetime.date | None,
+    now: datetime.datetime,
+    previous_interval: float | None,
+    changed: bool,
+) -> float:
+    """Returns the interval before the next scan of a folder, from its age
+    tier and whether its last scan found a change"""
+    tier_interval = get_tier_interval(folder_date, now.date())
+
+    if changed or not previous_interval:
+        return tier_interval
+
+    max_backoff = ConfigManager.get("FINDER.SCHEDULER.MAX_BACKOFF", 4)
+    return max(
+        tier_interval, min(previous_interval * 2, tier_interval * max_backoff)
+    )
+
+
+def get_io_ops(folder_stats: dict) -> int:
+    counters = folder_stats.get("counters", {})
+    return sum(counters.get(counter, 0) for counter in IO_OPS_COUNTERS)
+
+
+def get_folder_states(DB: DB, root: str | None = None) -> dict[str, dict]:
+    """Returns the scan state of the folders (of `root` if given), by path"""
+    condition = {"root": root} if root is not None else None
+    return {state["path"]: state for state in DB.select(SCAN_STATE_TABLE, condition)}
+
+
+def record_folder_scan(
+    DB: DB,
+    root: str,
+    folder_stats: dict,
+    now: datetime.datetime,
+    state: dict | None = None,
+) -> bool:
+    """Updates the state of a scanned folder, without committing
+
+    Args:
+        DB (DB): The database holding the scan state
+        root (str): The scanned root the folder belongs to
+        folder_stats (dict): The statistics of the folder scan (see FinderUtils)
+        now (datetime.datetime): The time of the scan
+        state (dict | None, optional): The previous state of the folder
+
+    Returns:
+        bool: True if the folder changed since its previous scan
+    """
+    path = folder_stats["folder"]
+
+    if state is None or state["scans"] == 0:
+        folder_date = parse_folder_date(Path(path))
+        changed = True
+    else:
+        folder_date = state["folder_date"]
+        if isinstance(folder_date, str):
+            folder_date = datetime.date.fromisoformat(folder_date)
+        changed = state["fingerprint"] != folder_stats["fingerprint"]
+
+    interval = get_scan_interval(
+        folder_date, now, state and state["interval"], changed
+    )
+
+    DB.SQLconnect.execute(
+        f"""
+        INSERT OR REPLACE INTO {SCAN_STATE_TABLE} ({", ".join(SCAN_STATE_COLUMNS)})
+        VALUES ({", ".join("?" for _ in SCAN_STATE_COLUMNS)})
+        """,
+        (
+            path,
+            root,
+            folder_date,
+            folder_stats["fingerprint"],
+            now,
+            now if changed else state["last_change_at"],
+            now + datetime.timedelta(seconds=interval),
+            interval,
+            (state["scans"] if state else 0) + 1,
+            (state["changes"] if state else 0) + changed,
+            folder_stats["duration"],
+            get_io_ops(folder_stats),
+        ),
+    )
+
+    return changed
+
+
+def record_unreachable_folder(
+    DB: DB, root: str, path: str, now: datetime.datetime
+) -> None:
+    """Schedules the retry of a folder abandoned after its timeout
+    (FINDER.SCHEDULER.RETRY_INTERVAL seconds later), keeping its last
+    successful scan, without committing"""
+    retry_at = now + datetime.timedelta(
+        seconds=ConfigManager.get("FINDER.SCHEDULER.RETRY_INTERVAL", 900)
+    )
+
+    DB.SQLconnect.execute(
+        f"""
+        INSERT INTO {SCAN_STATE_TABLE} (path, root, next_scan_at) VALUES (?, ?, ?)
+        ON CONFLICT (path) DO UPDATE SET
+            root = excluded.root, next_scan_at = excluded.next_scan_at
+        """,
+        (path, root, retry_at),
+    )
+
+
+def add_new_folders(
+    DB: DB, root: str, folders: list[Path], now: datetime.datetime
+) -> int:
+    """Adds the folders without a scan state, due immediately (no commit)
+
+    Returns:
+        int: The number of added folders
+    """
+    cursor = DB.SQLconnect.executemany(
+        f"""
+        INSERT OR IGNORE INTO {SCAN_STATE_TABLE} (path, root, next_scan_at)
+        VALUES (?, ?, ?)
+        """,
+        [(str(folder), root, now) for folder in folders],
+    )
+    return cursor.rowcount
+
+
+def remove_folder_states(DB: DB, paths: list[str]) -> None:
+    """Removes the scan state of the given folders, without committing"""
+    DB.SQLconnect.executemany(
+        f"DELETE FROM {SCAN_STATE_TABLE} WHERE path = ?",
+        [(path,) for path in paths],
+    )
+
+
+def get_due_folders(DB: DB, roots: list[str], now: datetime.datetime) -> list[dict]:
+    """Returns the states of the folders of `roots` due for a scan, the most
+    overdue first"""
+    cursor = DB.SQLconnect.execute(
+        f"""
+        SELECT * FROM {SCAN_STATE_TABLE}
+        WHERE next_scan_at <= ? AND root IN ({", ".join("?" for _ in roots)})
+        ORDER BY next_scan_at
+        """,
+        (now, *roots),
+    )
+
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
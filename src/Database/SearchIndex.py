@@ -0,0 +1,177 @@
+from src.Database.Catalog import CATALOG_TABLE
+from src.Database.DBClass import DB
+from src.Database.ParameterSets import get_parameter_text
+
+# Full-text index (FTS5) of the .holo files (path, measure tag), and of the HD
+# and EF renders (folder name, version, parameters of DB.PARAMETER_COLUMNS as
+# "name=value"). The rows are added with the renders (see FileFinder.Insert*)
+# and removed by triggers, which also run on the cascade deletes.
+#
+# The rowid of an entry is `entity_id * 3 + <code of its kind>`, so the
+# triggers delete it without a scan.
+
+SEARCH_TABLE = "search_index"
+
+SEARCH_KINDS = {"holo": 0, "hd": 1, "ef": 2}
+
+# The table of each kind, for the delete triggers
+_KIND_TABLES = {"holo": "holo_data", "hd": "hd_render", "ef": "ef_render"}
+
+# The catalog column holding the id of each kind
+_KIND_COLUMNS = {"holo": "holo_id", "hd": "hd_id", "ef": "ef_id"}
+
+
+def _rowid(kind: str, entity_id: int) -> int:
+    return entity_id * len(SEARCH_KINDS) + SEARCH_KINDS[kind]
+
+
+def create_search_index(DB: DB) -> bool:
+    """Creates the search index and its delete triggers
+
+    Returns:
+        bool: True if the index was created (and is empty)
+    """
+    created = not DB.check_table_existance(SEARCH_TABLE)
+
+    # "_" separates the tokens, so "240101_ABC" matches "240101" and "ABC"
+    DB.SQLconnect.execute(
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+            kind UNINDEXED, path, tag, version, parameters
+        )
+        """
+    )
+
+    for kind, table in _KIND_TABLES.items():
+        DB.SQLconnect.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_search_delete
+            AFTER DELETE ON {table} BEGIN
+                DELETE FROM {SEARCH_TABLE}
+                WHERE rowid = OLD.id * {len(SEARCH_KINDS)} + {SEARCH_KINDS[kind]};
+            END
+            """
+        )
+
+    DB.SQLconnect.commit()
+    return created
+
+
+def index_entity(
+    DB: DB,
+    kind: str,
+    entity_id: int | None,
+    path: str | None,
+    tag: str | None = None,
+    version: str | None = None,
+    parameters_hash: str | None = None,
+) -> None:
+    """Adds a .holo file ("holo") or a render ("hd", "ef") to the search
+    index, without committing"""
+    if entity_id is None:
+        return
+
+    DB.SQLconnect.execute(
+        f"""
+        INSERT INTO {SEARCH_TABLE} (rowid, kind, path, tag, version, parameters)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (
+            _rowid(kind, entity_id),
+            kind,
+            path,
+            tag,
+            version,
+            get_parameter_text(DB, kind.upper(), parameters_hash),
+        ),
+    )
+
+
+def rebuild_search_index(DB: DB) -> int:
+    """Indexes all the stored .holo files and renders again, e.g. for a DB
+    created before the search index (commits)
+
+    Returns:
+        int: The number of indexed entries
+    """
+    DB.SQLconnect.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    holo_rows = DB.SQLconnect.execute(
+        "SELECT id, path, tag FROM holo_data_paths"
+    ).fetchall()
+    for holo_id, path, tag in holo_rows:
+        index_entity(DB, "holo", holo_id, path, tag=tag)
+
+    hd_rows = DB.SQLconnect.execute(
+        "SELECT id, name, version, rendering_parameters_hash FROM hd_render"
+    ).fetchall()
+    for hd_id, name, version, parameters_hash in hd_rows:
+        index_entity(DB, "hd", hd_id, name, version=version, parameters_hash=parameters_hash)
+
+    ef_rows = DB.SQLconnect.execute(
+        "SELECT id, name, version, input_parameters_hash FROM ef_render"
+    ).fetchall()
+    for ef_id, name, version, parameters_hash in ef_rows:
+        index_entity(DB, "ef", ef_id, name, version=version, parameters_hash=parameters_hash)
+
+    DB.commit()
+    return len(holo_rows) + len(hd_rows) + len(ef_rows)
+
+
+def to_match_expression(text: str) -> str | None:
+    """Turns the text typed by the user into an FTS5 query: every word must
+    match, as a prefix ("24010" matches "240101"). None for an empty text."""
+    words = text.split()
+    if not words:
+        return None
+
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+
+
+def search_catalog_query(text: str, limit: int) -> tuple[str, tuple] | None:
+    """Returns the query of the catalog rows matching a search, the best
+    matches first
+
+    Args:
+        text (str): The searched words
+        limit (int): The maximum number of index entries matched
+
+    Returns:
+        tuple[str, tuple] | None: The query and its parameters, None for an
+                                  empty search
+    """
+    expression = to_match_expression(text)
+    if expression is None:
+        return None
+
+    # The catalog may be a view (see CatalogShards), the rows are told apart
+    # by their ids rather than their rowid
+    hits = " UNION ALL ".join(
+        f"""
+        SELECT
+            catalog.holo_id, catalog.hd_id, catalog.ef_id,
+            catalog.holo_file, catalog.measure_tag,
+            catalog.hd_folder, catalog.hd_version,
+            catalog.ef_folder, catalog.ef_version,
+            hits.rank
+        FROM hits JOIN {CATALOG_TABLE} AS catalog ON catalog.{column} = hits.entity_id
+        WHERE hits.kind = '{kind}'
+        """
+        for kind, column in _KIND_COLUMNS.items()
+    )
+
+    query = f"""
+        WITH hits AS (
+            SELECT kind, rowid / {len(SEARCH_KINDS)} AS entity_id, rank
+            FROM {SEARCH_TABLE}
+            WHERE {SEARCH_TABLE} MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        )
+        SELECT
+            holo_file, measure_tag, hd_folder, hd_version, ef_folder, ef_version
+        FROM ({hits})
+        GROUP BY holo_id, hd_id, ef_id
+        ORDER BY MIN(rank), holo_file, hd_folder, ef_folder
+    """
+    return query, (expression, limit)
@@ -1,66 +1,307 @@
 import datetime
+import json
 import multiprocessing
+import os
+import queue
+import time
 from pathlib import Path
 
 import src.FileFinder.FinderUtils as FinderUtils
 from src.Logger.LoggerClass import Logger
+from src.Utils.ParamsLoader import ConfigManager
 from src.Database.DBClass import DB
-from src.FileFinder.ReportGen import generate_report
+from src.Database.Catalog import CATALOG_TABLE, create_catalog, refresh_catalog
+from src.Database.CatalogShards import check_shard_roots, create_shards
+from src.Database.CatalogSnapshot import write_snapshot
+from src.Database.Maintenance import maintain_if_due
+from src.Database.Directories import (
+    DIRECTORIES_TABLE,
+    DIRECTORY_PATHS_VIEW,
+    DIRECTORY_REFERENCES,
+    SUBTREE_QUERY,
+    DirectoryDictionary,
+    create_directories,
+    relative_name,
+    remove_unused_directories,
+)
+from src.Database.ParameterSets import (
+    PARAMETER_SET_REFERENCES,
+    PARAMETER_SETS_TABLE,
+    create_parameter_sets,
+    remove_unused_parameter_sets,
+    store_parameter_set,
+)
+from src.Database.SearchIndex import (
+    SEARCH_TABLE,
+    create_search_index,
+    index_entity,
+    rebuild_search_index,
+)
+from src.Database.ScanState import (
+    SCAN_STATE_TABLE,
+    create_scan_state,
+    get_folder_states,
+    record_folder_scan,
+    record_unreachable_folder,
+    remove_folder_states,
+)
+from src.FileFinder.ReportGen import generate_report, get_app_version
+from src.FileFinder.ScanDelta import read_delta
 
-from src.Utils.fs_utils import parse_path, get_all_files_by_extension, safe_iterdir
+from src.Utils import io_governor, io_stats
+from src.Utils.fs_utils import (
+    counted_io,
+    get_all_files_by_extension,
+    parse_path,
+    safe_iterdir,
+)
 
 
 class FileFinder:
-    def __init__(self, DB: DB):
+    # DB is None for the scan agent, which only scans (see ScanFolders)
+    def __init__(self, DB: DB | None):
         self.searchFolder = ""
         self.DB = DB
+        self.directories = DirectoryDictionary(DB) if DB else None
 
     def CreateDB(self) -> None:
         tables = {
             "holo_data": {
                 "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
-                "path": "VARCHAR(255) NOT NULL",
+                # The paths are stored as a directory id and a name (see Directories)
+                "dir_id": "INTEGER NOT NULL",
+                "name": "VARCHAR(255) NOT NULL",
                 "tag": "VARCHAR(255)",
                 "created_at": "TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+                "FOREIGN KEY (dir_id)": "REFERENCES directories (id)",
             },
             "preview_doppler_video": {
                 "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
                 "holo_id": "INTEGER NOT NULL",
-                "path": "VARCHAR(255) NOT NULL",
+                "dir_id": "INTEGER NOT NULL",
+                "name": "VARCHAR(255) NOT NULL",
                 "FOREIGN KEY (holo_id)": "REFERENCES holo_data (id) ON DELETE CASCADE",
+                "FOREIGN KEY (dir_id)": "REFERENCES directories (id)",
             },
             "hd_render": {
                 "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
                 "holo_id": "INTEGER NOT NULL",
-                "path": "VARCHAR(255) NOT NULL",
+                "dir_id": "INTEGER NOT NULL",
+                "name": "VARCHAR(255) NOT NULL",
                 "render_number": "INTEGER NOT NULL",
-                "rendering_parameters": "TEXT",
-                "raw_h5_path": "VARCHAR(255)",
+                # See ParameterSets
+                "rendering_parameters_hash": "VARCHAR(40)",
+                # The paths inside a render folder are relative to it
+                "raw_h5_name": "VARCHAR(255)",
                 "version": "VARCHAR(255)",
                 "updated_at": "TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
                 "FOREIGN KEY (holo_id)": "REFERENCES holo_data (id) ON DELETE CASCADE",
+                "FOREIGN KEY (dir_id)": "REFERENCES directories (id)",
+                "FOREIGN KEY (rendering_parameters_hash)": "REFERENCES parameter_sets (hash)",
             },
             "ef_render": {
                 "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
                 "hd_id": "INTEGER NOT NULL",
                 "render_number": "INTEGER NOT NULL",
-                "path": "VARCHAR(255) NOT NULL",
-                "input_parameters": "TEXT",
+                "name": "VARCHAR(255) NOT NULL",  # Relative to the HD folder
+                "input_parameters_hash": "VARCHAR(40)",
                 "version": "VARCHAR(255)",
-                "report_path": "VARCHAR(255)",
-                "error_log_path": "VARCHAR(255)",
-                "h5_output": "VARCHAR(255)",
+                "report_name": "VARCHAR(255)",
+                "error_log_name": "VARCHAR(255)",
+                "h5_output_name": "VARCHAR(255)",
                 "updated_at": "TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
                 "FOREIGN KEY (hd_id)": "REFERENCES hd_render (id) ON DELETE CASCADE",
+                "FOREIGN KEY (input_parameters_hash)": "REFERENCES parameter_sets (hash)",
+            },
+            # History of the scans, kept when the DB is cleared
+            "scan_runs": {
+                "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+                "roots": "TEXT NOT NULL",
+                "status": "VARCHAR(255) NOT NULL",
+                "started_at": "TIMESTAMP",
+                "ended_at": "TIMESTAMP",
+                "scan_duration": "REAL",
+                "insert_duration": "REAL",
+                "total_duration": "REAL",
+                "phases": "TEXT",
+                "found_holo": "INTEGER",
+                "found_hd": "INTEGER",
+                "found_ef": "INTEGER",
+                "found_preview": "INTEGER",
+                "errors": "INTEGER",
+                "app_version": "VARCHAR(255)",
+                "report_path": "VARCHAR(255)",
             },
         }
 
+        # The render tables with their full paths (see Directories) and
+        # parameters (see ParameterSets)
+        views = {
+            "holo_data_paths": f"""
+                SELECT h.id, d.path || h.name AS path, h.tag, h.created_at
+                FROM holo_data AS h
+                JOIN {DIRECTORY_PATHS_VIEW} AS d ON d.id = h.dir_id
+            """,
+            "preview_doppler_video_paths": f"""
+                SELECT p.id, p.holo_id, d.path || p.name AS path
+                FROM preview_doppler_video AS p
+                JOIN {DIRECTORY_PATHS_VIEW} AS d ON d.id = p.dir_id
+            """,
+            "hd_render_paths": f"""
+                SELECT
+                    hd.id, hd.holo_id, d.path || hd.name AS path,
+                    hd.render_number, params.content AS rendering_parameters,
+                    d.path || hd.name || hd.raw_h5_name AS raw_h5_path,
+                    hd.version, hd.updated_at
+                FROM hd_render AS hd
+                JOIN {DIRECTORY_PATHS_VIEW} AS d ON d.id = hd.dir_id
+                LEFT JOIN {PARAMETER_SETS_TABLE} AS params ON params.hash = hd.rendering_parameters_hash
+            """,
+            "ef_render_paths": f"""
+                SELECT
+                    ef.id, ef.hd_id, ef.render_number,
+                    d.path || hd.name || ef.name AS path,
+                    params.content AS input_parameters, ef.version,
+                    d.path || hd.name || ef.name || ef.report_name AS report_path,
+                    d.path || hd.name || ef.name || ef.error_log_name AS error_log_path,
+                    d.path || hd.name || ef.name || ef.h5_output_name AS h5_output,
+                    ef.updated_at
+                FROM ef_render AS ef
+                JOIN hd_render AS hd ON hd.id = ef.hd_id
+                JOIN {DIRECTORY_PATHS_VIEW} AS d ON d.id = hd.dir_id
+                LEFT JOIN {PARAMETER_SETS_TABLE} AS params ON params.hash = ef.input_parameters_hash
+            """,
+        }
+
+        if self._HasLegacyLayout():
+            self._DropLegacyTables()
+
+        create_directories(self.DB)
+        create_parameter_sets(self.DB)
         for key, val in tables.items():
             self.DB.create_table(key, val)
 
+        for key, val in views.items():
+            self.DB.create_view(key, val)
+
+        # Incremental scans replace the rows under a directory (see DeleteRootData)
+        self.DB.create_index("idx_holo_data_dir", "holo_data", ["dir_id"])
+        # The deletes cascade through the parent ids
+        self.DB.create_index("idx_preview_holo", "preview_doppler_video", ["holo_id"])
+        self.DB.create_index("idx_hd_render_holo", "hd_render", ["holo_id"])
+        self.DB.create_index("idx_ef_render_hd", "ef_render", ["hd_id"])
+        # The renders made with a parameter set
+        for table, column in PARAMETER_SET_REFERENCES.items():
+            self.DB.create_index(f"idx_{table}_parameters", table, [column])
+
+        create_catalog(self.DB)
+        create_scan_state(self.DB)
+        if create_shards(self.DB):
+            refresh_catalog(self.DB)  # Into or out of the shards
+
+        # Filled with the renders, except for the data stored before it
+        if create_search_index(self.DB) and self.DB.count("holo_data"):
+            rebuild_search_index(self.DB)
+
     def ClearDB(self) -> None:
-        self.DB.clear_db()  # Is fully empty
-        self.CreateDB()  # Adds the tables
+        with self.DB.writing():
+            scan_runs = self.DB.select("scan_runs")
+
+            self.DB.clear_db()  # Is fully empty
+            self.CreateDB()  # Adds the tables
+
+            # The scan history survives the clear
+            for scan_run in scan_runs:
+                self.DB.insert("scan_runs", scan_run, do_commit=False)
+            self.DB.commit()
+
+    def _HasLegacyLayout(self) -> bool:
+        """True if the DB stores full paths (before the directories table) or
+        parameters (before the parameter sets) in the render tables, or has
+        directory ids without their foreign key"""
+
+        def columns(table: str) -> list[str]:
+            cursor = self.DB.SQLconnect.execute(f"PRAGMA table_info({table})")
+            return [column[1] for column in cursor]
+
+        def references_directories(table: str) -> bool:
+            cursor = self.DB.SQLconnect.execute(f"PRAGMA foreign_key_list({table})")
+            return any(key[2] == DIRECTORIES_TABLE for key in cursor)
+
+        if "path" in columns("holo_data") or "rendering_parameters" in columns(
+            "hd_render"
+        ):
+            return True
+
+        return any(
+            column in columns(table) and not references_directories(table)
+            for table, column in DIRECTORY_REFERENCES.items()
+        )
+
+    def _DropLegacyTables(self) -> None:
+        """Drops the tables (and views) of an old layout, refilled by the next
+        scan. The scan state is dropped too, so the scheduler rescans every
+        folder."""
+        Logger.warn(
+            "The database uses an old layout, its data is dropped. Please run a full scan.",
+            "DATABASE",
+        )
+        for table in (
+            CATALOG_TABLE,
+            SCAN_STATE_TABLE,
+            SEARCH_TABLE,
+            "ef_render",
+            "hd_render",
+            "preview_doppler_video",
+            "holo_data",
+        ):
+            self.DB.SQLconnect.execute(f"DROP TABLE IF EXISTS {table}")
+
+        views = self.DB.SQLconnect.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'view'"
+        ).fetchall()
+        for (view,) in views:
+            self.DB.SQLconnect.execute(f"DROP VIEW IF EXISTS {view}")
+        self.DB.commit()
+
+    def DeleteRootData(
+        self, root_dir: str | Path, keep: list[str] | None = None
+    ) -> int:
+        """Deletes the .holo files found under `root_dir` (and their renders
+        and previews, by cascade), without committing.
+
+        Args:
+            keep (list[str] | None, optional): Sub-folders whose rows are kept
+                                               (e.g. unreachable during the scan)
+
+        Returns:
+            int: The number of deleted .holo files
+        """
+        # Not the cached ids of the inserts, which may have been rolled back
+        directories = DirectoryDictionary(self.DB)
+
+        root_id = directories.get_id(Path(root_dir), create=False)
+        if root_id is None:
+            return 0  # Nothing was ever stored under it
+
+        # The directories of the subtree, found from the (parent_id, name) index
+        conditions = [f"dir_id IN ({SUBTREE_QUERY})"]
+        params = [root_id]
+        for folder in keep or []:
+            keep_id = directories.get_id(Path(folder), create=False)
+            if keep_id is not None:
+                conditions.append(f"dir_id NOT IN ({SUBTREE_QUERY})")
+                params.append(keep_id)
+
+        cursor = self.DB.SQLconnect.execute(
+            f"DELETE FROM holo_data WHERE {' AND '.join(conditions)}", params
+        )
+        return cursor.rowcount
+
+    def _SplitPath(self, path: Path) -> dict[str, object]:
+        """Returns the `dir_id` and `name` columns of a path"""
+        dir_id, name = self.directories.split(parse_path(path))
+        return {"dir_id": dir_id, "name": name}
 
     def InsertHDRender(
         self,
@@ -72,32 +313,45 @@ class FileFinder:
         version: str | None,
         updated_at: datetime.datetime | None,
     ) -> int | None:
-        return self.DB.insert(
-            "hd_render",
-            {
-                "holo_id": holo_id,
-                "path": parse_path(path),
-                "render_number": render_number,
-                "rendering_parameters": rendering_parameters,
-                "raw_h5_path": parse_path(raw_h5_path),
-                "version": version,
-                "updated_at": updated_at,
-            },
-            do_commit=False,
+        data = {
+            "holo_id": holo_id,
+            **self._SplitPath(path),
+            "render_number": render_number,
+            "rendering_parameters_hash": store_parameter_set(
+                self.DB, rendering_parameters
+            ),
+            "raw_h5_name": relative_name(raw_h5_path, path),
+            "version": version,
+            "updated_at": updated_at,
+        }
+        hd_id = self.DB.insert("hd_render", data, do_commit=False)
+
+        index_entity(
+            self.DB,
+            "hd",
+            hd_id,
+            data["name"],
+            version=version,
+            parameters_hash=data["rendering_parameters_hash"],
         )
+        return hd_id
 
     def InsertHoloFile(
         self, path: Path, tag: str | None, created_at: datetime.date | None
     ) -> int | None:
-        return self.DB.insert(
+        holo_id = self.DB.insert(
             "holo_data",
-            {"path": str(path), "tag": tag, "created_at": created_at},
+            {**self._SplitPath(path), "tag": tag, "created_at": created_at},
             do_commit=False,
         )
 
+        index_entity(self.DB, "holo", holo_id, parse_path(path), tag=tag)
+        return holo_id
+
     def InsertEFRender(
         self,
         hd_id: int,
+        hd_path: Path,
         render_number: int | None,
         path: Path,
         input_parameters: str | None,
@@ -107,184 +361,551 @@ class FileFinder:
         h5_output: Path | None,
         updated_at: datetime.datetime | None,
     ) -> int | None:
-        return self.DB.insert(
-            "ef_render",
-            {
-                "hd_id": hd_id,
-                "render_number": render_number,
-                "path": parse_path(path),
-                "input_parameters": input_parameters,
-                "version": version,
-                "report_path": parse_path(report_path),
-                "error_log_path": parse_path(error_log_path),
-                "h5_output": parse_path(h5_output),
-                "updated_at": updated_at,
-            },
-            do_commit=False,
+        data = {
+            "hd_id": hd_id,
+            "render_number": render_number,
+            "name": relative_name(path, hd_path),
+            "input_parameters_hash": store_parameter_set(self.DB, input_parameters),
+            "version": version,
+            "report_name": relative_name(report_path, path),
+            "error_log_name": relative_name(error_log_path, path),
+            "h5_output_name": relative_name(h5_output, path),
+            "updated_at": updated_at,
+        }
+        ef_id = self.DB.insert("ef_render", data, do_commit=False)
+
+        index_entity(
+            self.DB,
+            "ef",
+            ef_id,
+            data["name"],
+            version=version,
+            parameters_hash=data["input_parameters_hash"],
         )
+        return ef_id
 
     def InsertPreviewVideo(self, holo_id: int, path: Path) -> int | None:
         return self.DB.insert(
             "preview_doppler_video",
             {
                 "holo_id": holo_id,
-                "path": parse_path(path),
+                **self._SplitPath(path),
             },
             do_commit=False,
         )
 
+    def InsertScanRun(
+        self,
+        roots: list[str],
+        status: str,
+        started_at: datetime.datetime,
+        reports: list[dict],
+        report_path: Path | None,
+    ) -> int | None:
+        """Stores a `Findfiles` run in the `scan_runs` history table"""
+
+        def seconds(start_key: str, end_key: str) -> float:
+            return sum(
+                (r["headers"][end_key] - r["headers"][start_key]).total_seconds()
+                for r in reports
+            )
+
+        def total(key: str) -> int:
+            return sum(r["data"].get(key, 0) for r in reports)
+
+        phases = {}
+        for r in reports:
+            for phase, duration in r.get("phases", {}).items():
+                phases[phase] = phases.get(phase, 0.0) + duration
+
+        ended_at = datetime.datetime.now()
+
+        return self.DB.insert(
+            "scan_runs",
+            {
+                "roots": json.dumps(roots),
+                "status": status,
+                "started_at": started_at,
+                "ended_at": ended_at,
+                "scan_duration": seconds("scan_date", "insert_date"),
+                "insert_duration": seconds("insert_date", "end_date"),
+                "total_duration": (ended_at - started_at).total_seconds(),
+                "phases": json.dumps(phases),
+                "found_holo": total("found_holo"),
+                "found_hd": total("found_hd"),
+                "found_ef": total("found_ef"),
+                "found_preview": total("found_preview"),
+                "errors": total("errors"),
+                "app_version": get_app_version(),
+                "report_path": parse_path(report_path),
+            },
+        )
+
     def Findfiles(
         self,
         root_dir: str | list[str],
         reset_db: bool = False,
         callback_bar=None,
         use_parallelism=False,
-    ):
-        reports = []
+        report_path: Path | None = None,
+    ) -> list[dict]:
+        """Scans the roots and stores their files in the DB.
+
+        Args:
+            root_dir (str | list[str]): The root folder(s) to scan
+            reset_db (bool, optional): Clears the whole DB before the scan.
+                Otherwise only the rows under the scanned roots are replaced.
+            callback_bar (optional): A progress bar (`.progress(value, text=)`)
+            use_parallelism (bool, optional): Scans the date folders in a pool
+            report_path (Path | None, optional): The report folder.
+                                                 Defaults to FINDER.REPORT_PATH.
+
+        Returns:
+            list[dict]: The report of each root (see ReportGen)
+        """
+        # The writes of other threads (e.g. another app session) wait for the scan
+        with self.DB.writing():
+            reports = []
+            roots = root_dir if isinstance(root_dir, list) else [root_dir]
+            check_shard_roots(self.DB, roots)  # Before the scan
+            started_at = datetime.datetime.now()
 
-        if isinstance(root_dir, list):
-            for single_root in root_dir:
-                reports.append(
-                    self._run_search(
-                        single_root, reset_db, callback_bar, use_parallelism
+            try:
+                for single_root in roots:
+                    reports.append(
+                        self._run_search(
+                            single_root, reset_db, callback_bar, use_parallelism
+                        )
                     )
-                )
-                reset_db = False  # Only reset on the first run
-        else:
-            reports.append(
-                self._run_search(root_dir, reset_db, callback_bar, use_parallelism)
-            )
+                    reset_db = False  # Only reset on the first run
+            except Exception:
+                refresh_catalog(self.DB)
+                self.InsertScanRun(roots, "failed", started_at, reports, None)
+                raise
 
-        generate_report(reports, self.DB)
+            refresh_catalog(self.DB)
+            json_report_path = generate_report(reports, self.DB, report_path)
+            self.InsertScanRun(roots, "success", started_at, reports, json_report_path)
 
-    def _run_search(
-        self, root_dir: str, reset_db: bool, callback_bar, use_parallelism: bool
-    ):
-        if reset_db:
-            self.ClearDB()
-            Logger.info("Database cleared before new scan.", "DATABASE")
+            # Last, so the snapshot matches the final generation of the DB
+            write_snapshot(self.DB)
+            self.MaintainAfterScan(reports)
+
+            return reports
+
+    def GetSearchFolders(self, root_dir: str, strict: bool = False) -> list[Path]:
+        """Returns the date folders of a root (the root itself if it directly
+        holds .holo files)
+
+        Args:
+            strict (bool, optional): Raises an OSError if the root cannot be
+                listed (offline share, access denied), instead of returning no
+                folder. Defaults to False.
+        """
+        if strict and not os.path.isdir(root_dir):
+            raise NotADirectoryError(f"Not a reachable directory: {root_dir}")
 
         if get_all_files_by_extension(Path(root_dir), "holo"):
-            search_folders = [Path(root_dir)]
-        else:
-            search_folders = list(safe_iterdir(root_dir))
+            return [Path(root_dir)]
 
-        total_folders = len(search_folders)
+        if strict:
+            with counted_io("listing", "scandir"):
+                return list(Path(root_dir).iterdir())
+        return list(safe_iterdir(root_dir))
 
-        results = []
+    def InsertResults(self, results: list[tuple]) -> dict[str, dict]:
+        """Inserts the results of `FinderUtils.process_date_folder`, and
+        removes the parameter sets and directories no row uses anymore,
+        without committing
 
-        start_scan_date = datetime.datetime.now()
+        Returns:
+            dict[str, dict]: The inserted rows and cumulated insert time per table
+        """
+        holo_id_map = {}  # To map temporary string IDs to final database integer IDs
+        # The cached directory ids are only valid in the current transaction
+        self.directories = DirectoryDictionary(self.DB)
+        # total_results_to_insert = len(results)
 
-        if use_parallelism:
-            # Use as many processes as there are CPU cores
-            with multiprocessing.Pool() as pool:
-                for i, result in enumerate(
-                    pool.imap_unordered(FinderUtils.process_date_folder, search_folders)
-                ):
-                    if callback_bar:
-                        progress_text = f"Scanning ({i + 1}/{total_folders})"
-                        callback_bar.progress(
-                            ((i + 1) / total_folders), text=progress_text
-                        )
-                    results.append(result)
-        else:
-            Logger.info("Running scan in sequential mode.", "FILESYSTEM")
-            for i, date_folder in enumerate(search_folders):
-                if callback_bar:
-                    progress_text = (
-                        f"Scanning ({i + 1}/{total_folders}): {date_folder.name}"
+        # Rows and cumulated insert time per table
+        table_stats = {
+            table: {"rows": 0, "seconds": 0.0}
+            for table in (
+                "holo_data",
+                "preview_doppler_video",
+                "hd_render",
+                "ef_render",
+            )
+        }
+
+        def timed_insert(table: str, insert_func, **data) -> int | None:
+            start = time.perf_counter()
+            db_id = insert_func(**data)
+            table_stats[table]["seconds"] += time.perf_counter() - start
+            table_stats[table]["rows"] += 1
+            return db_id
+
+        for i, (holo_list, hd_list, ef_list, preview_list, _) in enumerate(results):
+            # if callback_bar:
+            #     progress_value = 0.5 + (((i + 1) / total_results_to_insert) * 0.5)
+            #     progress_text = (
+            #         f"Inserting data ({i + 1}/{total_results_to_insert})"
+            #     )
+            #     callback_bar.progress(progress_value, text=progress_text)
+
+            # Holo data
+            for temp_holo_id, holo_data in holo_list:
+                db_id = timed_insert("holo_data", self.InsertHoloFile, **holo_data)
+                if db_id:
+                    holo_id_map[temp_holo_id] = db_id
+
+            # Preview video data
+            for preview_data in preview_list:
+                temp_parent_holo_id = preview_data["holo_id"]
+                if temp_parent_holo_id in holo_id_map:
+                    preview_data["holo_id"] = holo_id_map[temp_parent_holo_id]
+                    timed_insert(
+                        "preview_doppler_video",
+                        self.InsertPreviewVideo,
+                        **preview_data,
+                    )
+                else:
+                    Logger.error(
+                        f".holo file ({temp_parent_holo_id}) is not found for preview_video: {preview_data['path']}"
                     )
-                    callback_bar.progress(((i + 1) / total_folders), text=progress_text)
 
-                result = FinderUtils.process_date_folder(date_folder)
-                results.append(result)
+            # HoloDoppler data
+            hd_id_map = {}
+            hd_path_map = {}  # The EF paths are stored relative to their HD folder
+            for temp_hd_id, hd_data in hd_list:
+                # Replace temporary parent ID with the real one
+                temp_parent_holo_id = hd_data["holo_id"]
+                if temp_parent_holo_id in holo_id_map:
+                    hd_data["holo_id"] = holo_id_map[temp_parent_holo_id]
+                    db_id = timed_insert("hd_render", self.InsertHDRender, **hd_data)
+                    if db_id:
+                        hd_id_map[temp_hd_id] = db_id
+                        hd_path_map[temp_hd_id] = hd_data["path"]
+                else:
+                    Logger.error(
+                        f".holo file ({temp_parent_holo_id}) is not found for HD_folder: {hd_data['path']}"
+                    )
 
-        # --- Data Insertion Phase ---
-        Logger.info(
-            "All folders scanned. Inserting data into the database...", "DATABASE"
+            # EyeFlow data
+            for ef_data in ef_list:
+                temp_parent_hd_id = ef_data["hd_id"]
+                if temp_parent_hd_id in hd_id_map:
+                    ef_data["hd_id"] = hd_id_map[temp_parent_hd_id]
+                    timed_insert(
+                        "ef_render",
+                        self.InsertEFRender,
+                        hd_path=hd_path_map[temp_parent_hd_id],
+                        **ef_data,
+                    )
+                else:
+                    Logger.error(
+                        f"HD folder ({temp_parent_hd_id}) is not found for EF_folder: {ef_data['path']}"
+                    )
+
+        # The sets and directories of the replaced renders, once the new
+        # ones reused theirs
+        remove_unused_parameter_sets(self.DB)
+        remove_unused_directories(self.DB)
+
+        return table_stats
+
+    def RecordFolderScans(
+        self,
+        root_dir: str,
+        results: list[tuple],
+        scan_date: datetime.datetime,
+        unreachable: list[str] | None = None,
+    ) -> int:
+        """Updates the scan state of the scanned folders of a root, so the
+        scheduler knows when to rescan them (soon for the unreachable ones),
+        without committing
+
+        Returns:
+            int: The number of folders that changed since their previous scan
+        """
+        states = get_folder_states(self.DB, str(root_dir))
+
+        changed = 0
+        for *_, folder_stats in results:
+            changed += record_folder_scan(
+                self.DB,
+                str(root_dir),
+                folder_stats,
+                scan_date,
+                states.pop(folder_stats["folder"], None),
+            )
+
+        for folder in unreachable or []:
+            states.pop(folder, None)
+            record_unreachable_folder(self.DB, str(root_dir), folder, scan_date)
+
+        # Folders which are not in the root anymore
+        remove_folder_states(self.DB, list(states))
+
+        return changed
+
+    def BuildReport(
+        self,
+        root_dir: str,
+        results: list[tuple],
+        start_scan_date: datetime.datetime,
+        start_insert_date: datetime.datetime,
+        table_stats: dict[str, dict],
+        commit_duration: float,
+        unreachable: list[str] | None = None,
+    ) -> dict:
+        """Builds the report of a scanned root (see ReportGen)"""
+        folders = [r[4] for r in results]
+        io_totals = {}
+        for folder_stats in folders:
+            io_stats.merge(io_totals, folder_stats)
+
+        return {
+            "headers": {
+                "scan_path": root_dir,
+                "scan_date": start_scan_date,
+                "insert_date": start_insert_date,
+                "end_date": datetime.datetime.now(),
+            },
+            "data": {
+                "found_holo": sum(len(r[0]) for r in results),
+                "found_hd": sum(len(r[1]) for r in results),
+                "found_ef": sum(len(r[2]) for r in results),
+                "found_preview": sum(len(r[3]) for r in results),
+                "errors": sum(f["errors"] for f in folders),
+                "unreachable": len(unreachable or []),
+            },
+            "counters": io_totals.get("counters", {}),
+            "phases": {
+                **io_totals.get("phases", {}),
+                "insert": sum(t["seconds"] for t in table_stats.values()),
+                "commit": commit_duration,
+            },
+            "tables": table_stats,
+            "folders": folders,
+            "unreachable": unreachable or [],
+        }
+
+    def _start_scan_worker(self, semaphore, processes: int) -> dict:
+        """Starts a scan worker process (see `FinderUtils.scan_worker`), with
+        its own queues, so it can be terminated alone"""
+        worker = {
+            "tasks": multiprocessing.Queue(),
+            "events": multiprocessing.Queue(),
+            "held_slots": multiprocessing.Value("i", 0),
+            "folder": None,  # The folder being scanned
+            "started": None,  # Its start time
+            "waited": 0.0,  # Its seconds spent waiting for a slot
+            "waiting": None,  # The start of its current wait for a slot
+        }
+        worker["process"] = multiprocessing.Process(
+            target=FinderUtils.scan_worker,
+            args=(
+                worker["tasks"],
+                worker["events"],
+                semaphore,
+                processes,
+                worker["held_slots"],
+            ),
+            daemon=True,
         )
+        worker["process"].start()
+        return worker
 
-        if callback_bar:
-            callback_bar.progress(0.5, text="Inserting data into database...")
+    def _stop_scan_worker(self, worker: dict, semaphore) -> None:
+        """Terminates a scan worker process, giving back its I/O slots"""
+        worker["process"].terminate()
+        worker["process"].join()
+        if semaphore is not None:
+            for _ in range(worker["held_slots"].value):
+                semaphore.release()
+        for worker_queue in (worker["tasks"], worker["events"]):
+            worker_queue.cancel_join_thread()
+            worker_queue.close()
 
-        start_insert_date = datetime.datetime.now()
+    def _scan_parallel(
+        self, search_folders: list[Path], callback_bar, timeout: float | None
+    ) -> tuple[list[tuple], list[str]]:
+        """Scans the folders in worker processes, abandoning the folders still
+        running after `timeout` seconds. The time a folder spends waiting for
+        a free I/O slot (see `io_governor`) is not counted.
 
-        holo_id_map = {}  # To map temporary string IDs to final database integer IDs
-        # total_results_to_insert = len(results)
+        A hung folder blocks its worker: only that worker is terminated (its
+        I/O slots given back) and replaced, the others keep scanning.
+
+        Returns:
+            tuple[list[tuple], list[str]]: The results of the scanned folders,
+                                           and the unreachable folders
+        """
+        results = []
+        unreachable = []
+        remaining = list(reversed(search_folders))
+        total_folders = len(search_folders)
+        processes = min(os.cpu_count() or 1, total_folders)
+        semaphore = io_governor.create_semaphore(multiprocessing)
 
+        workers = [
+            self._start_scan_worker(semaphore, processes) for _ in range(processes)
+        ]
         try:
-            for i, (holo_list, hd_list, ef_list, preview_list) in enumerate(results):
-                # if callback_bar:
-                #     progress_value = 0.5 + (((i + 1) / total_results_to_insert) * 0.5)
-                #     progress_text = (
-                #         f"Inserting data ({i + 1}/{total_results_to_insert})"
-                #     )
-                #     callback_bar.progress(progress_value, text=progress_text)
-
-                # Holo data
-                for temp_holo_id, holo_data in holo_list:
-                    db_id = self.InsertHoloFile(**holo_data)
-                    if db_id:
-                        holo_id_map[temp_holo_id] = db_id
-
-                # Preview video data
-                for preview_data in preview_list:
-                    temp_parent_holo_id = preview_data["holo_id"]
-                    if temp_parent_holo_id in holo_id_map:
-                        preview_data["holo_id"] = holo_id_map[temp_parent_holo_id]
-                        self.InsertPreviewVideo(**preview_data)
-                    else:
-                        Logger.error(
-                            f".holo file ({temp_parent_holo_id}) is not found for preview_video: {preview_data['path']}"
-                        )
+            while remaining or any(worker["folder"] for worker in workers):
+                for i, worker in enumerate(workers):
+                    if worker["folder"] is None and remaining:
+                        date_folder = remaining.pop()
+                        worker.update(folder=str(date_folder), started=None)
+                        worker["tasks"].put(date_folder)
 
-                # HoloDoppler data
-                hd_id_map = {}
-                for temp_hd_id, hd_data in hd_list:
-                    # Replace temporary parent ID with the real one
-                    temp_parent_holo_id = hd_data["holo_id"]
-                    if temp_parent_holo_id in holo_id_map:
-                        hd_data["holo_id"] = holo_id_map[temp_parent_holo_id]
-                        db_id = self.InsertHDRender(**hd_data)
-                        if db_id:
-                            hd_id_map[temp_hd_id] = db_id
-                    else:
+                    finished = None
+                    while True:
+                        try:
+                            folder, event, value = worker["events"].get_nowait()
+                        except queue.Empty:
+                            break
+                        if event == "started":
+                            worker.update(started=value, waited=0.0, waiting=None)
+                        elif event == "waiting":
+                            worker["waiting"] = value
+                        elif event == "resumed" and worker["waiting"] is not None:
+                            worker["waited"] += value - worker["waiting"]
+                            worker["waiting"] = None
+                        elif event == "failed":
+                            raise value
+                        elif event == "done":
+                            results.append(value)
+                            finished = folder
+
+                    if finished is not None:
+                        worker["folder"] = None
+                        if callback_bar:
+                            done = len(results) + len(unreachable)
+                            progress_text = f"Scanning ({done}/{total_folders})"
+                            callback_bar.progress(
+                                done / total_folders, text=progress_text
+                            )
+                        continue
+
+                    if worker["folder"] is None:
+                        continue
+
+                    # Hung past its deadline (not while waiting for a slot),
+                    # or the worker died with the folder
+                    hung = (
+                        timeout
+                        and worker["started"] is not None
+                        and worker["waiting"] is None
+                        and time.time() - worker["started"] - worker["waited"]
+                        > timeout
+                    )
+                    if not hung and worker["process"].is_alive():
+                        continue
+
+                    if hung:
                         Logger.error(
-                            f".holo file ({temp_parent_holo_id}) is not found for HD_folder: {hd_data['path']}"
+                            f"Folder unreachable, abandoned after {timeout}s: {worker['folder']}",
+                            "FILESYSTEM",
                         )
-
-                # EyeFlow data
-                for ef_data in ef_list:
-                    temp_parent_hd_id = ef_data["hd_id"]
-                    if temp_parent_hd_id in hd_id_map:
-                        ef_data["hd_id"] = hd_id_map[temp_parent_hd_id]
-                        self.InsertEFRender(**ef_data)
                     else:
                         Logger.error(
-                            f"HD folder ({temp_parent_hd_id}) is not found for EF_folder: {ef_data['path']}"
+                            f"Scan worker died while scanning {worker['folder']}",
+                            "FILESYSTEM",
                         )
+                    unreachable.append(worker["folder"])
+                    self._stop_scan_worker(worker, semaphore)
+                    workers[i] = self._start_scan_worker(semaphore, processes)
 
-            self.DB.SQLconnect.commit()  # Commit everything in one single transaction
-            Logger.info("Database insertion complete.", "DATABASE")
+                time.sleep(0.05)
+        finally:
+            for worker in workers:
+                self._stop_scan_worker(worker, semaphore)
+
+        return results, unreachable
+
+    def ScanFolders(
+        self, search_folders: list[Path], callback_bar, use_parallelism: bool
+    ) -> tuple[list[tuple], list[str]]:
+        """Runs `FinderUtils.process_date_folder` on each folder (does not
+        touch the DB)
+
+        Returns:
+            tuple[list[tuple], list[str]]: The results of the scanned folders,
+                                           and the unreachable folders
+        """
+        total_folders = len(search_folders)
+        timeout = ConfigManager.get("FINDER.FOLDER_TIMEOUT", 0)
+
+        if use_parallelism:
+            return self._scan_parallel(search_folders, callback_bar, timeout)
 
-            report = {
-                "headers": {
-                    "scan_path": root_dir,
-                    "scan_date": start_scan_date,
-                    "insert_date": start_insert_date,
-                    "end_date": datetime.datetime.now(),
-                },
-                "data": {
-                    "found_holo": sum(len(r[0]) for r in results),
-                    "found_hd": sum(len(r[1]) for r in results),
-                    "found_ef": sum(len(r[2]) for r in results),
-                    "found_preview": sum(len(r[3]) for r in results),
-                },
-            }
+        Logger.info("Running scan in sequential mode.", "FILESYSTEM")
+        # Also caps the operations of the folders abandoned in the background
+        io_governor.configure(io_governor.create_semaphore())
+
+        results = []
+        unreachable = []
+        for i, date_folder in enumerate(search_folders):
+            if callback_bar:
+                progress_text = f"Scanning ({i + 1}/{total_folders}): {date_folder.name}"
+                callback_bar.progress(((i + 1) / total_folders), text=progress_text)
+
+            result = FinderUtils.process_date_folder_with_timeout(date_folder, timeout)
+            if result is None:
+                unreachable.append(str(date_folder))
+            else:
+                results.append(result)
+
+        return results, unreachable
+
+    def StoreResults(
+        self,
+        root_dir: str,
+        results: list[tuple],
+        unreachable: list[str],
+        start_scan_date: datetime.datetime,
+        replace: bool = True,
+    ) -> dict:
+        """Stores the scan results of a root in one single transaction
+
+        Args:
+            replace (bool, optional): Replaces the rows already stored under
+                the root (except the unreachable folders). Defaults to True.
+
+        Returns:
+            dict: The report of the root (see ReportGen)
+        """
+        start_insert_date = datetime.datetime.now()
+
+        try:
+            if replace:
+                # Replaced in the same transaction as the insertion
+                replaced = self.DeleteRootData(root_dir, keep=unreachable)
+                Logger.info(
+                    f"Replacing {replaced} .holo files already stored under {root_dir}",
+                    "DATABASE",
+                )
+
+            table_stats = self.InsertResults(results)
+            self.RecordFolderScans(root_dir, results, start_scan_date, unreachable)
+
+            commit_start = time.perf_counter()
+            self.DB.commit()  # Commit everything in one single transaction
+            commit_duration = time.perf_counter() - commit_start
+            Logger.info("Database insertion complete.", "DATABASE")
 
             # generate_report(report, self.DB)
 
-            return report
+            return self.BuildReport(
+                root_dir,
+                results,
+                start_scan_date,
+                start_insert_date,
+                table_stats,
+                commit_duration,
+                unreachable,
+            )
 
         except Exception as e:
             self.DB.SQLconnect.rollback()
@@ -292,3 +913,113 @@ class FileFinder:
                 f"An error occurred during database insertion. Transaction rolled back. Error: {e}",
                 "DATABASE",
             )
+
+    def ImportDeltas(
+        self, delta_paths: list[Path], report_path: Path | None = None
+    ) -> tuple[list[dict], list[Path]]:
+        """Imports scan deltas written by the scan agent (see ScanDelta): each
+        one replaces the rows of its root, like an incremental scan. The
+        invalid deltas are skipped.
+
+        Args:
+            delta_paths (list[Path]): The delta files to import
+            report_path (Path | None, optional): The report folder.
+                                                 Defaults to FINDER.REPORT_PATH.
+
+        Returns:
+            tuple[list[dict], list[Path]]: The report of each imported delta
+                                           (see ReportGen) and its path
+        """
+        with self.DB.writing():
+            reports = []
+            roots = []
+            imported = []
+            started_at = datetime.datetime.now()
+
+            try:
+                for delta_path in delta_paths:
+                    delta = read_delta(delta_path)
+                    if delta is None:
+                        continue
+
+                    manifest, results = delta
+                    check_shard_roots(self.DB, [manifest["root"]])
+                    Logger.info(
+                        f"Importing the scan delta of {manifest['root']} from {manifest['host']}: {delta_path}",
+                        "DATABASE",
+                    )
+                    reports.append(
+                        self.StoreResults(
+                            manifest["root"],
+                            results,
+                            manifest["unreachable"],
+                            datetime.datetime.fromisoformat(manifest["scan_date"]),
+                        )
+                    )
+                    roots.append(manifest["root"])
+                    imported.append(delta_path)
+            except Exception:
+                refresh_catalog(self.DB)
+                self.InsertScanRun(roots, "failed", started_at, reports, None)
+                raise
+
+            if not reports:
+                return reports, imported
+
+            refresh_catalog(self.DB)
+            json_report_path = generate_report(reports, self.DB, report_path)
+            self.InsertScanRun(roots, "success", started_at, reports, json_report_path)
+            write_snapshot(self.DB)
+            self.MaintainAfterScan(reports)
+
+            return reports, imported
+
+    def MaintainAfterScan(self, reports: list[dict]) -> None:
+        """Runs the DB maintenance if the scan was large, or if it is due
+        anyway (see Maintenance)"""
+        changed_rows = sum(
+            report["data"][key]
+            for report in reports
+            for key in ("found_holo", "found_hd", "found_ef", "found_preview")
+        )
+        maintain_if_due(self.DB, changed_rows)
+
+    def _run_search(
+        self, root_dir: str, reset_db: bool, callback_bar, use_parallelism: bool
+    ):
+        if reset_db:
+            self.ClearDB()
+            Logger.info("Database cleared before new scan.", "DATABASE")
+
+        search_folders = self.GetSearchFolders(root_dir)
+
+        start_scan_date = datetime.datetime.now()
+
+        results, unreachable = self.ScanFolders(
+            search_folders, callback_bar, use_parallelism
+        )
+
+        # --- Data Insertion Phase ---
+        Logger.info(
+            "All folders scanned. Inserting data into the database...", "DATABASE"
+        )
+
+        if callback_bar:
+            callback_bar.progress(0.5, text="Inserting data into database...")
+
+        if not reset_db:
+            return self.StoreResults(root_dir, results, unreachable, start_scan_date)
+
+        # The DB was just emptied, it is loaded in bulk (indexes built once)
+        with self.DB.bulk_load(
+            [
+                "holo_data",
+                "preview_doppler_video",
+                "hd_render",
+                "ef_render",
+                PARAMETER_SETS_TABLE,
+            ]
+        ):
+            return self.StoreResults(
+                root_dir, results, unreachable, start_scan_date, replace=False
+            )
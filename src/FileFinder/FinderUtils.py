@@ -1,10 +1,16 @@
+import hashlib
 import re
+import threading
+import time
 
 from pathlib import Path
 from src.Logger.LoggerClass import Logger
 from src.Utils.ParamsLoader import ConfigManager
 
+from src.Utils import io_governor, io_stats
 from src.Utils.fs_utils import (
+    fs_exists,
+    fs_isfile,
     safe_isdir,
     safe_file_read,
     get_last_update,
@@ -55,7 +61,7 @@ def _find_version_in_log(file_path: Path) -> str | None:
 def _get_eyeflow_version(ef_folder: Path, hd_folder_name: str) -> str | None:
     ef_folder = Path(ef_folder)
     version_txt = ef_folder / f"{ef_folder.name}_version.txt"
-    if not version_txt.is_file():
+    if not fs_isfile(version_txt):
         Logger.warn(
             f"Eyeflow version file does not exist: {version_txt}", tags="FILESYSTEM"
         )
@@ -68,15 +74,82 @@ def _get_eyeflow_version(ef_folder: Path, hd_folder_name: str) -> str | None:
     return None
 
 
-def process_date_folder(date_folder: Path) -> tuple[list, list, list, list]:
+def _fingerprint_value(value, folder: str):
+    """Returns `value` with the paths under `folder` made relative to it
+    (with "/" separators), in the dicts, lists and tuples too"""
+    if isinstance(value, Path):
+        value = str(value)
+
+    if isinstance(value, str):
+        if value == folder:
+            return "."
+        if value.startswith(folder) and value[len(folder)] in "\\/":
+            return value[len(folder) + 1 :].replace("\\", "/")
+        return value
+
+    if isinstance(value, dict):
+        return {key: _fingerprint_value(item, folder) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint_value(item, folder) for item in value]
+
+    return value
+
+
+def _folder_fingerprint(date_folder: Path, found: tuple[list, ...]) -> str:
+    """
+    Hashes everything found in a folder (paths, versions, modification dates),
+    so a rescan can tell whether the folder changed without touching the DB.
+
+    The paths are hashed relative to the folder: the scan agent and the app
+    see the same folder under different roots (see ScanDelta).
+    """
+    folder = str(date_folder).rstrip("\\/")
+    entries = sorted(
+        repr(_fingerprint_value(entry, folder))
+        for found_list in found
+        for entry in found_list
+    )
+    return hashlib.sha1("\n".join(entries).encode("utf-8")).hexdigest()
+
+
+def _folder_stats(
+    date_folder: Path, start: float, errors_before: int, found: tuple[list, ...]
+) -> dict:
+    """
+    Builds the statistics of a scanned folder (duration, IO counters, errors),
+    shipped back to the main process for the scan report.
+    """
+    return {
+        "folder": str(date_folder),
+        "fingerprint": _folder_fingerprint(date_folder, found),
+        "duration": time.perf_counter() - start,
+        "errors": Logger.thread_error_count() - errors_before,
+        "found_holo": len(found[0]),
+        "found_hd": len(found[1]),
+        "found_ef": len(found[2]),
+        "found_preview": len(found[3]),
+        **io_stats.snapshot(),
+    }
+
+
+def process_date_folder(date_folder: Path) -> tuple[list, list, list, list, dict]:
     """
     Scans a single date folder and gathers data for .holo, HD, and EF files.
     This function is designed to be run in a separate process.
     It does NOT interact with the database.
+
+    The last element of the returned tuple holds the statistics of the folder
+    (see `_folder_stats`).
     """
+    io_stats.reset()
+    start = time.perf_counter()
+    errors_before = Logger.thread_error_count()
+
     if not safe_isdir(date_folder):  # or not check_folder_name_format(date_folder)
         Logger.info(f"Skipping: {date_folder}", "SKIP")
-        return ([], [], [], [])
+        found = ([], [], [], [])
+        return (*found, _folder_stats(date_folder, start, errors_before, found))
 
     Logger.info(f"Processing folder: {date_folder.name}", "WORKER")
 
@@ -130,7 +203,7 @@ def process_date_folder(date_folder: Path) -> tuple[list, list, list, list]:
             hd_data_to_insert.append((temp_hd_id, hd_entry))
 
             eyeflow_folder = hd_folder_path / "eyeflow"
-            if eyeflow_folder.exists():
+            if fs_exists(eyeflow_folder):
                 ef_renders = gather_ef_folders_data(eyeflow_folder, get_input_params)
                 for ef in ef_renders:
                     ef_entry = {
@@ -150,9 +223,128 @@ def process_date_folder(date_folder: Path) -> tuple[list, list, list, list]:
                     }
                     ef_data_to_insert.append(ef_entry)
 
-    return (
+    found = (
         holo_data_to_insert,
         hd_data_to_insert,
         ef_data_to_insert,
         preview_data_to_insert,
     )
+
+    return (*found, _folder_stats(date_folder, start, errors_before, found))
+
+
+# ┌───────────────────────────────────┐
+# │          FOLDER DEADLINES         │
+# └───────────────────────────────────┘
+# A folder on a hung mount (stale SMB handle, offline server) blocks its scan
+# forever. Each folder gets FINDER.FOLDER_TIMEOUT seconds, after which it is
+# abandoned and reported as unreachable: the scan worker process running it
+# is terminated and replaced, or in sequential mode its thread is abandoned
+# (see `io_governor.abandon`). The time a folder spends waiting for a free
+# I/O slot does not count: the slot may be held by a folder hung on another
+# share.
+
+_events = None
+_current_folder = None
+
+
+def _report_slot_wait(waiting: bool) -> None:
+    """`io_governor` slot listener of the scan worker processes"""
+    if _events is not None and _current_folder is not None:
+        _events.put((_current_folder, "waiting" if waiting else "resumed", time.time()))
+
+
+def scan_worker(tasks, events, semaphore, processes: int, held_slots) -> None:
+    """
+    Body of a scan worker process: scans the date folders received on
+    `tasks` until None, one at a time, and tells the main process about each
+    one on `events`, so it can enforce its deadline.
+
+    The events are `(folder, event, value)` tuples, with `event` one of
+    "started" and "waiting" / "resumed" (around a wait for a free I/O slot)
+    with the time as value, "done" with the result of `process_date_folder`,
+    or "failed" with its exception.
+
+    Args:
+        tasks: The queue of the folders to scan (this worker only)
+        events: The queue of the events (this worker only)
+        semaphore: The I/O slots shared by the workers (see `io_governor`)
+        processes (int): The number of workers
+        held_slots: The number of slots held by this worker (shared integer)
+    """
+    global _events, _current_folder
+
+    io_governor.configure(semaphore, processes, _report_slot_wait, held_slots)
+    _events = events
+
+    while (date_folder := tasks.get()) is not None:
+        _current_folder = str(date_folder)
+        events.put((_current_folder, "started", time.time()))
+        try:
+            events.put((_current_folder, "done", process_date_folder(date_folder)))
+        except Exception as e:
+            events.put((_current_folder, "failed", e))
+        finally:
+            _current_folder = None
+
+
+class DeadlineExceeded(Exception):
+    """Raised by `run_with_deadline` when the call did not return in time"""
+
+
+def run_with_deadline(func, timeout: float | None, *args):
+    """
+    Runs `func(*args)` in a daemon thread for at most `timeout` seconds (no
+    limit if 0 or None), and returns its result or raises its exception.
+
+    Raises:
+        DeadlineExceeded: If it did not return in time. The thread is left
+                          blocked in the background, abandoned: it gives
+                          back its I/O slots and stops at its next governed
+                          operation (see `io_governor.abandon`).
+    """
+    if not timeout:
+        return func(*args)
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = func(*args)
+        except io_governor.Abandoned:
+            pass  # Nobody waits for it anymore
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+
+    if thread.is_alive():
+        io_governor.abandon(thread)
+        raise DeadlineExceeded(f"no answer after {timeout}s")
+
+    if "error" in outcome:
+        raise outcome["error"]
+
+    return outcome["result"]
+
+
+def process_date_folder_with_timeout(
+    date_folder: Path, timeout: float | None
+) -> tuple[list, list, list, list, dict] | None:
+    """
+    Runs `process_date_folder` for at most `timeout` seconds.
+
+    Returns:
+        The result of `process_date_folder`, None if the folder was abandoned
+        (see `run_with_deadline`).
+    """
+    try:
+        return run_with_deadline(process_date_folder, timeout, date_folder)
+    except DeadlineExceeded:
+        Logger.error(
+            f"Folder unreachable, abandoned after {timeout}s: {date_folder}",
+            "FILESYSTEM",
+        )
+        return None
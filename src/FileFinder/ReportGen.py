@@ -1,4 +1,5 @@
 import datetime
+import json
 import os
 from pathlib import Path
 
@@ -19,7 +20,40 @@ from src.Utils.ParamsLoader import ConfigManager
 #           "found_hd"      : str,
 #           "found_ef"      : str,
 #           "found_preview" : str,
-#       }
+#           "errors"        : int,
+#           "unreachable"   : int,
+#       },
+#       "counters": {           # IO operations, see src/Utils/io_stats.py
+#           "scandir"       : int,
+#           "dirs_visited"  : int,  # listed by the .holo discovery
+#           "dirs_pruned"   : int,  # skipped by the .holo discovery
+#           "stat"          : int,
+#           "file_read"     : int,
+#           "bytes_read"    : int,
+#       },
+#       "phases": {             # Seconds, summed over all the scanned folders
+#           "listing"       : float,
+#           "stat"          : float,
+#           "json_parsing"  : float,
+#           "file_reading"  : float,
+#           "throttling"    : float,
+#           "insert"        : float,
+#           "commit"        : float,
+#       },
+#       "tables": {
+#           "<table_name>"  : {"rows": int, "seconds": float},
+#       },
+#       "folders": [            # One entry per scanned date folder
+#           {
+#               "folder"    : str,
+#               "duration"  : float,
+#               "errors"    : int,
+#               "found_*"   : int,
+#               "counters"  : dict,
+#               "phases"    : dict,
+#           },
+#       ],
+#       "unreachable": [str],   # Folders abandoned after FINDER.FOLDER_TIMEOUT
 # }
 
 # ┌───────────────────────────────────┐
@@ -70,9 +104,33 @@ def __resolve_path(path) -> str:
     return str(path.resolve())
 
 
-def __get_version() -> str:
-    with open("version.txt", "r") as version_file:
-        return version_file.read().strip()
+def __format_seconds(seconds) -> str:
+    if not isinstance(seconds, (int, float)):
+        return "N/A"
+
+    return f"{seconds:.3f}s"
+
+
+def __format_bytes(size) -> str:
+    if not isinstance(size, (int, float)):
+        return "N/A"
+
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+    return f"{size:.1f} TB"
+
+
+def __rows_per_second(table: dict) -> str:
+    rows = table.get("rows", 0)
+    seconds = table.get("seconds", 0.0)
+
+    if not seconds:
+        return "N/A"
+
+    return f"{rows / seconds:.0f} rows/s"
 
 
 def __get_global_headers(
@@ -94,7 +152,7 @@ def __get_global_headers(
 {"DopplerManager Scan Report":^{width}}
 {separator}
 
-App Version     : {__get_version()}
+App Version     : {get_app_version()}
 DB Path         : {__resolve_path(DB.DB_PATH)}
 
 Report Date     : {__format_date(now)}
@@ -116,7 +174,72 @@ Total Preview   : {DB.count("preview_doppler_video")}
 """
 
 
-def __parse_data(data: list[dict], DB: DB, sep: str = "=", width: int = 40) -> str:
+def __get_performance(d: dict, top_n: int, width: int = 40) -> str:
+    phases = __s_get_dict(d, "phases", {})
+    counters = __s_get_dict(d, "counters", {})
+    tables = __s_get_dict(d, "tables", {})
+    folders = __s_get_dict(d, "folders", [])
+
+    res = f"""\
+{"PHASES (summed over folders)":^{width}}
+
+Listing         : {__format_seconds(phases.get("listing"))}
+Stat            : {__format_seconds(phases.get("stat"))}
+JSON Parsing    : {__format_seconds(phases.get("json_parsing"))}
+File Reading    : {__format_seconds(phases.get("file_reading"))}
+Throttling      : {__format_seconds(phases.get("throttling"))}
+Insert          : {__format_seconds(phases.get("insert"))}
+Commit          : {__format_seconds(phases.get("commit"))}
+
+{"IO COUNTERS":^{width}}
+
+Scandir         : {counters.get("scandir", 0)}
+Dirs Visited    : {counters.get("dirs_visited", 0)}
+Dirs Pruned     : {counters.get("dirs_pruned", 0)}
+Stat            : {counters.get("stat", 0)}
+File Reads      : {counters.get("file_read", 0)}
+Bytes Read      : {__format_bytes(counters.get("bytes_read", 0))}
+Errors          : {__s_get_r_dict(d, "data.errors", "N/A")}
+Unreachable     : {__s_get_r_dict(d, "data.unreachable", 0)}
+
+{"INSERT THROUGHPUT":^{width}}
+
+"""
+
+    for table_name, table in tables.items():
+        res += f"{table_name:<22}: {table.get('rows', 0):>7} rows, {__rows_per_second(table)}\n"
+
+    slowest = sorted(folders, key=lambda f: f.get("duration", 0.0), reverse=True)
+    res += f"""
+{f"TOP {top_n} SLOWEST FOLDERS":^{width}}
+
+"""
+
+    for folder in slowest[:top_n]:
+        folder_phases = folder.get("phases", {})
+        res += (
+            f"{__format_seconds(folder.get('duration')):>10}  {folder.get('folder')}\n"
+            f"{'':>10}  listing {__format_seconds(folder_phases.get('listing', 0.0))}"
+            f", stat {__format_seconds(folder_phases.get('stat', 0.0))}"
+            f", json {__format_seconds(folder_phases.get('json_parsing', 0.0))}"
+            f", errors {folder.get('errors', 0)}\n"
+        )
+
+    unreachable = __s_get_dict(d, "unreachable", [])
+    if unreachable:
+        res += f"""
+{"UNREACHABLE FOLDERS (retried later)":^{width}}
+
+"""
+        for folder in unreachable:
+            res += f"{folder}\n"
+
+    return res + "\n"
+
+
+def __parse_data(
+    data: list[dict], DB: DB, top_n: int = 10, sep: str = "=", width: int = 40
+) -> str:
     separator = sep * width
 
     now = datetime.datetime.now()
@@ -151,14 +274,23 @@ Found HD        : {__s_get_r_dict(d, "data.found_hd", "N/A")}
 Found EF        : {__s_get_r_dict(d, "data.found_ef", "N/A")}
 Found Preview   : {__s_get_r_dict(d, "data.found_preview", "N/A")}
 
-{separator}
-
 """
+        res += __get_performance(d, top_n, width)
+        res += f"{separator}\n\n"
 
     res += __get_global_footers(DB, sep, width)
     return res
 
 
+def __get_json_report(data: list[dict], DB: DB) -> dict:
+    return {
+        "app_version": get_app_version(),
+        "db_path": __resolve_path(DB.DB_PATH),
+        "report_date": datetime.datetime.now(),
+        "scans": data,
+    }
+
+
 def __get_report_path() -> Path:
     tmp_config = ConfigManager.get("FINDER.REPORT_PATH") or ""
 
@@ -181,14 +313,33 @@ def __get_report_path() -> Path:
 # └───────────────────────────────────┘
 
 
-def generate_report(data: list[dict], DB: DB, report_path: Path | None = None) -> None:
+# At the root of the app, whichever the working directory (task scheduler)
+_VERSION_PATH = Path(__file__).resolve().parents[2] / "version.txt"
+
+
+def get_app_version() -> str | None:
+    """Returns the version of the app, None if version.txt cannot be read"""
+    try:
+        with open(_VERSION_PATH, "r") as version_file:
+            return version_file.read().strip()
+    except OSError as e:
+        Logger.warn(f"Could not read the app version: {e}", "REPORT")
+        return None
+
+
+def generate_report(
+    data: list[dict], DB: DB, report_path: Path | None = None
+) -> Path | None:
     """
-    Generates a simple text report from the provided data dictionary
-    and saves it to the specified report path.
+    Generates a text report from the provided data dictionaries and saves it
+    to the specified report path, along with a JSON version of the same data.
 
     Args:
-        data (dict): A dictionary containing report data.
-        report_path (Path): The file path where the report will be saved.
+        data (list[dict]): The report data of each scanned root.
+        report_path (Path): The folder where the reports will be saved.
+
+    Returns:
+        Path | None: The path of the JSON report, None if it failed.
     """
 
     # TODO: think about the possibility of exporting a pdf report with reportlab
@@ -196,16 +347,31 @@ def generate_report(data: list[dict], DB: DB, report_path: Path | None = None) -
     if report_path is None:
         report_path = __get_report_path()
     else:
+        report_path = Path(report_path)
         os.makedirs(report_path, exist_ok=True)
 
-    report_path = (
-        report_path / f"report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-    )
+    report_name = f"report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    top_n = ConfigManager.get("FINDER.REPORT_TOP_N", 10)
+
+    report_path = report_path / f"{report_name}.txt"
+    json_report_path = report_path.with_suffix(".json")
 
     try:
         with open(report_path, "w") as report_file:
-            report_file.write(__parse_data(data, DB) + "\n")
+            report_file.write(__parse_data(data, DB, top_n) + "\n")
 
         Logger.info(f"Report generated successfully at {report_path}", "REPORT")
     except Exception as e:
         Logger.error(f"Failed to generate report at {report_path}: {e}", "REPORT")
+
+    try:
+        with open(json_report_path, "w") as report_file:
+            json.dump(__get_json_report(data, DB), report_file, indent=4, default=str)
+
+        Logger.info(f"JSON report generated at {json_report_path}", "REPORT")
+        return json_report_path
+    except Exception as e:
+        Logger.error(
+            f"Failed to generate JSON report at {json_report_path}: {e}", "REPORT"
+        )
+        return None
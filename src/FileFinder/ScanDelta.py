@@ -0,0 +1,296 @@
+import datetime
+import json
+import os
+import shutil
+import socket
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.Logger.LoggerClass import Logger
+from src.FileFinder.ReportGen import get_app_version
+
+# A scan delta holds the results of a scan run by the agent next to the data
+# (`scanner.py --agent-output`), to be imported by the app (`--import-deltas`).
+#
+# It is a single zstd-compressed Parquet file with one row per found entity
+# (see DELTA_SCHEMA), and a JSON manifest in the file metadata:
+# {
+#       "format_version": int,
+#       "root"          : str,    # The root, as seen by the app
+#       "agent_root"    : str,    # The root, as scanned by the agent
+#       "host"          : str,
+#       "app_version"   : str | None,
+#       "scan_date"     : str,    # ISO format
+#       "folders"       : [dict], # The statistics of each scanned folder
+#       "unreachable"   : [str],
+# }
+#
+# The paths are rewritten from the agent root to the published root, so
+# "D:\data\240101\..." scanned on the file server becomes "Y:\240101\...".
+
+DELTA_FORMAT_VERSION = 1
+DELTA_METADATA_KEY = b"dopplermanager.scan_delta"
+DELTA_PREFIX = "scan_delta_"
+
+DELTA_SCHEMA = pa.schema(
+    [
+        ("kind", pa.string()),  # holo, preview, hd or ef
+        ("folder", pa.string()),  # The scanned date folder
+        ("temp_id", pa.string()),  # Links the rows inside the delta
+        ("parent_id", pa.string()),
+        ("path", pa.string()),
+        ("tag", pa.string()),
+        ("created_at", pa.date32()),
+        ("render_number", pa.int64()),
+        ("rendering_parameters", pa.string()),
+        ("raw_h5_path", pa.string()),
+        ("version", pa.string()),
+        ("input_parameters", pa.string()),
+        ("report_path", pa.string()),
+        ("error_log_path", pa.string()),
+        ("h5_output", pa.string()),
+        ("updated_at", pa.timestamp("us")),
+    ]
+)
+
+
+def _publish_path(path, agent_root: str, root: str) -> str | None:
+    """Rewrites a path under `agent_root` to the same path under `root`"""
+    if path is None:
+        return None
+
+    if agent_root == root:
+        return str(path)
+
+    relative = os.path.relpath(str(path), agent_root)
+    sep = "\\" if "\\" in root else "/"
+    if relative == ".":
+        return root
+
+    return root.rstrip("\\/") + sep + relative.replace(os.sep, sep)
+
+
+def _result_rows(result: tuple, agent_root: str, root: str) -> list[dict]:
+    holo_list, hd_list, ef_list, preview_list, folder_stats = result
+    folder = _publish_path(folder_stats["folder"], agent_root, root)
+
+    def publish(path):
+        return _publish_path(path, agent_root, root)
+
+    rows = []
+    for temp_holo_id, holo in holo_list:
+        rows.append(
+            {
+                "kind": "holo",
+                "folder": folder,
+                "temp_id": temp_holo_id,
+                "path": publish(holo["path"]),
+                "tag": holo["tag"],
+                "created_at": holo["created_at"],
+            }
+        )
+
+    for preview in preview_list:
+        rows.append(
+            {
+                "kind": "preview",
+                "folder": folder,
+                "parent_id": preview["holo_id"],
+                "path": publish(preview["path"]),
+            }
+        )
+
+    for temp_hd_id, hd in hd_list:
+        rows.append(
+            {
+                "kind": "hd",
+                "folder": folder,
+                "temp_id": temp_hd_id,
+                "parent_id": hd["holo_id"],
+                "path": publish(hd["path"]),
+                "render_number": hd["render_number"],
+                "rendering_parameters": hd["rendering_parameters"],
+                "raw_h5_path": publish(hd["raw_h5_path"]),
+                "version": hd["version"],
+                "updated_at": hd["updated_at"],
+            }
+        )
+
+    for ef in ef_list:
+        rows.append(
+            {
+                "kind": "ef",
+                "folder": folder,
+                "parent_id": ef["hd_id"],
+                "path": publish(ef["path"]),
+                "render_number": ef["render_number"],
+                "input_parameters": ef["input_parameters"],
+                "version": ef["version"],
+                "report_path": publish(ef["report_path"]),
+                "error_log_path": publish(ef["error_log_path"]),
+                "h5_output": publish(ef["h5_output"]),
+                "updated_at": ef["updated_at"],
+            }
+        )
+
+    return rows
+
+
+def write_delta(
+    agent_root: str,
+    results: list[tuple],
+    unreachable: list[str],
+    scan_date: datetime.datetime,
+    output_dir: Path,
+    root: str | None = None,
+) -> Path:
+    """Writes the results of a scan to a delta file in `output_dir`
+
+    Args:
+        agent_root (str): The scanned root
+        results (list[tuple]): The results of `FinderUtils.process_date_folder`
+        unreachable (list[str]): The folders abandoned after their timeout
+        scan_date (datetime.datetime): The start of the scan
+        output_dir (Path): The folder shared with the app
+        root (str | None, optional): The root as seen by the app.
+                                     Defaults to `agent_root`.
+
+    Returns:
+        Path: The path of the delta file
+    """
+    agent_root = str(agent_root)
+    root = str(root or agent_root)
+
+    rows = []
+    folders = []
+    for result in results:
+        rows.extend(_result_rows(result, agent_root, root))
+        folders.append(
+            {
+                **result[4],
+                "folder": _publish_path(result[4]["folder"], agent_root, root),
+            }
+        )
+
+    manifest = {
+        "format_version": DELTA_FORMAT_VERSION,
+        "root": root,
+        "agent_root": agent_root,
+        "host": socket.gethostname(),
+        "app_version": get_app_version(),
+        "scan_date": scan_date.isoformat(),
+        "folders": folders,
+        "unreachable": [_publish_path(f, agent_root, root) for f in unreachable],
+    }
+
+    table = pa.Table.from_pylist(rows, schema=DELTA_SCHEMA).replace_schema_metadata(
+        {DELTA_METADATA_KEY: json.dumps(manifest, default=str)}
+    )
+
+    os.makedirs(output_dir, exist_ok=True)
+    delta_name = (
+        f"{DELTA_PREFIX}{scan_date.strftime('%Y%m%d_%H%M%S')}_{manifest['host']}"
+    )
+    delta_path = Path(output_dir) / f"{delta_name}.parquet"
+
+    # Written under another name first, so the app never imports a partial file
+    tmp_path = delta_path.with_suffix(".tmp")
+    pq.write_table(table, str(tmp_path), compression="zstd")
+    os.replace(tmp_path, delta_path)
+
+    Logger.info(
+        f"Scan delta written ({len(rows)} rows, {os.path.getsize(delta_path)} bytes): {delta_path}",
+        "FILESYSTEM",
+    )
+    return delta_path
+
+
+def read_delta(delta_path: Path) -> tuple[dict, list[tuple]] | None:
+    """Reads a delta file back to the results format of `process_date_folder`
+
+    Returns:
+        tuple[dict, list[tuple]] | None: The manifest and the results of each
+                                         folder, None if the file is invalid
+    """
+    try:
+        table = pq.read_table(str(delta_path))
+        manifest = json.loads(table.schema.metadata[DELTA_METADATA_KEY])
+    except (OSError, KeyError, ValueError, pa.ArrowInvalid) as e:
+        Logger.error(f"Invalid scan delta {delta_path}: {e}", "DATABASE")
+        return None
+
+    if manifest.get("format_version", 0) > DELTA_FORMAT_VERSION:
+        Logger.error(
+            f"Scan delta {delta_path} has format version {manifest['format_version']}, "
+            f"this app only reads up to {DELTA_FORMAT_VERSION}. Please update it.",
+            "DATABASE",
+        )
+        return None
+
+    results = {
+        folder_stats["folder"]: ([], [], [], [], folder_stats)
+        for folder_stats in manifest["folders"]
+    }
+
+    for row in table.to_pylist():
+        holo_list, hd_list, ef_list, preview_list, _ = results[row["folder"]]
+        kind = row["kind"]
+
+        if kind == "holo":
+            holo_list.append(
+                (
+                    row["temp_id"],
+                    {
+                        "path": row["path"],
+                        "tag": row["tag"],
+                        "created_at": row["created_at"],
+                    },
+                )
+            )
+        elif kind == "preview":
+            preview_list.append({"holo_id": row["parent_id"], "path": row["path"]})
+        elif kind == "hd":
+            hd_list.append(
+                (
+                    row["temp_id"],
+                    {
+                        "holo_id": row["parent_id"],
+                        "path": row["path"],
+                        "render_number": row["render_number"],
+                        "rendering_parameters": row["rendering_parameters"],
+                        "raw_h5_path": row["raw_h5_path"],
+                        "version": row["version"],
+                        "updated_at": row["updated_at"],
+                    },
+                )
+            )
+        elif kind == "ef":
+            ef_list.append(
+                {
+                    "hd_id": row["parent_id"],
+                    "render_number": row["render_number"],
+                    "path": row["path"],
+                    "input_parameters": row["input_parameters"],
+                    "version": row["version"],
+                    "report_path": row["report_path"],
+                    "error_log_path": row["error_log_path"],
+                    "h5_output": row["h5_output"],
+                    "updated_at": row["updated_at"],
+                }
+            )
+
+    return manifest, list(results.values())
+
+
+def get_pending_deltas(delta_dir: Path) -> list[Path]:
+    """Returns the delta files waiting in `delta_dir`, oldest first"""
+    return sorted(Path(delta_dir).glob(f"{DELTA_PREFIX}*.parquet"))
+
+
+def archive_delta(delta_path: Path) -> None:
+    """Moves an imported delta to the `imported` sub-folder"""
+    archive_dir = Path(delta_path).parent / "imported"
+    os.makedirs(archive_dir, exist_ok=True)
+    shutil.move(str(delta_path), str(archive_dir / Path(delta_path).name))
@@ -0,0 +1,209 @@
+import datetime
+import time
+from pathlib import Path
+
+import src.FileFinder.FinderUtils as FinderUtils
+from src.Logger.LoggerClass import Logger
+from src.Database.Catalog import refresh_catalog
+from src.Database.CatalogShards import check_shard_roots
+from src.Database.CatalogSnapshot import write_snapshot
+from src.Database.Directories import remove_unused_directories
+from src.Database.Maintenance import maintain_if_due
+from src.Database.ScanState import (
+    add_new_folders,
+    get_due_folders,
+    get_folder_states,
+    get_io_ops,
+    record_folder_scan,
+    record_unreachable_folder,
+    remove_folder_states,
+)
+from src.FileFinder.FileFinderClass import FileFinder
+from src.Utils.ParamsLoader import ConfigManager
+
+
+class ScanScheduler:
+    """Keeps the DB up to date with the roots by rescanning each date folder
+    when it is due (see ScanState): the recent folders every few minutes, the
+    old ones weekly.
+
+    Each tick scans the most overdue folders until FINDER.SCHEDULER.IO_BUDGET
+    I/O operations (directory listings, stats and file reads) are spent, and
+    only writes the folders whose content changed.
+    """
+
+    def __init__(self, ff: FileFinder, roots: list[str]):
+        self.ff = ff
+        self.DB = ff.DB
+        self.roots = [str(root) for root in roots]
+        check_shard_roots(self.DB, self.roots)
+
+    def _discover(self, now: datetime.datetime) -> int:
+        """Adds the new date folders of the roots (due immediately) and removes
+        the data of the deleted ones, without committing. A root that cannot
+        be listed in FINDER.FOLDER_TIMEOUT is skipped, its folders are kept.
+
+        Returns:
+            int: The number of removed folders
+        """
+        timeout = ConfigManager.get("FINDER.FOLDER_TIMEOUT", 0)
+        removed = 0
+        for root in self.roots:
+            try:
+                folders = FinderUtils.run_with_deadline(
+                    self.ff.GetSearchFolders, timeout, root, True
+                )
+            except (OSError, FinderUtils.DeadlineExceeded) as e:
+                # An offline share is not an empty one
+                Logger.error(
+                    f"Root unreachable, its folders are kept: {root} ({e})",
+                    "FILESYSTEM",
+                )
+                continue
+
+            folder_paths = {str(folder) for folder in folders}
+
+            removed_paths = [
+                path for path in get_folder_states(self.DB, root) if path not in folder_paths
+            ]
+            for path in removed_paths:
+                Logger.info(f"Folder removed from {root}: {path}", "FILESYSTEM")
+                self.ff.DeleteRootData(path)
+            remove_folder_states(self.DB, removed_paths)
+            removed += len(removed_paths)
+            if removed_paths:
+                remove_unused_directories(self.DB)
+
+            added = add_new_folders(self.DB, root, folders, now)
+            if added:
+                Logger.info(f"{added} new folders found in {root}", "FILESYSTEM")
+
+        return removed
+
+    def _commit(self, data_changed: bool) -> None:
+        if data_changed:
+            self.DB.commit()
+        else:
+            # Only the scan state changed, the data generation is kept so the
+            # app caches stay valid
+            self.DB.SQLconnect.commit()
+
+    def run_once(self) -> list[dict]:
+        """Runs one tick of the scheduler
+
+        Returns:
+            list[dict]: The report of each root with scanned folders (see ReportGen)
+        """
+        with self.DB.writing():
+            started_at = datetime.datetime.now()
+            io_budget = ConfigManager.get("FINDER.SCHEDULER.IO_BUDGET", 20000)
+
+            try:
+                removed = self._discover(started_at)
+            except Exception:
+                self.DB.SQLconnect.rollback()
+                raise
+            self._commit(data_changed=removed > 0)
+
+            # --- Scan Phase ---
+            scanned = {}  # root -> [(state, result)]
+            unreachable = {}  # root -> [path]
+            io_spent = 0
+            timeout = ConfigManager.get("FINDER.FOLDER_TIMEOUT", 0)
+            for state in get_due_folders(self.DB, self.roots, started_at):
+                if io_spent >= io_budget:
+                    Logger.info(
+                        f"I/O budget spent ({io_spent} operations), the other due folders wait for the next tick",
+                        "FILESYSTEM",
+                    )
+                    break
+
+                result = FinderUtils.process_date_folder_with_timeout(
+                    Path(state["path"]), timeout
+                )
+                if result is None:
+                    unreachable.setdefault(state["root"], []).append(state["path"])
+                    continue
+
+                io_spent += get_io_ops(result[4])
+                scanned.setdefault(state["root"], []).append((state, result))
+
+            # --- Data Insertion Phase ---
+            reports = []
+            changed = 0
+            try:
+                for root, paths in unreachable.items():
+                    for path in paths:
+                        record_unreachable_folder(self.DB, root, path, started_at)
+
+                for root, root_scanned in scanned.items():
+                    start_insert_date = datetime.datetime.now()
+
+                    changed_results = []
+                    for state, result in root_scanned:
+                        if record_folder_scan(self.DB, root, result[4], started_at, state):
+                            changed_results.append(result)
+
+                    # Unchanged folders are not rewritten
+                    for result in changed_results:
+                        self.ff.DeleteRootData(result[4]["folder"])
+                    table_stats = self.ff.InsertResults(changed_results)
+                    changed += len(changed_results)
+
+                    reports.append(
+                        self.ff.BuildReport(
+                            root,
+                            [result for _, result in root_scanned],
+                            started_at,
+                            start_insert_date,
+                            table_stats,
+                            0.0,
+                            unreachable.get(root, []),
+                        )
+                    )
+
+                self._commit(data_changed=changed > 0)
+            except Exception as e:
+                self.DB.SQLconnect.rollback()
+                Logger.fatal(
+                    f"An error occurred during database insertion. Transaction rolled back. Error: {e}",
+                    "DATABASE",
+                )
+
+            folders_scanned = sum(len(root_scanned) for root_scanned in scanned.values())
+            Logger.info(
+                f"Scheduled scan: {folders_scanned} folders scanned ({io_spent} I/O operations), "
+                f"{changed} changed, {removed} removed, "
+                f"{sum(len(paths) for paths in unreachable.values())} unreachable",
+                "FILESYSTEM",
+            )
+
+            if changed or removed:
+                refresh_catalog(self.DB)
+                self.ff.InsertScanRun(self.roots, "success", started_at, reports, None)
+                write_snapshot(self.DB)
+            else:
+                # An idle tick, the time to maintain the DB if it is due
+                maintain_if_due(self.DB)
+
+            return reports
+
+    def run_forever(self, tick_seconds: float | None = None) -> None:
+        """Runs a tick every `tick_seconds` (FINDER.SCHEDULER.TICK_SECONDS by
+        default), until interrupted. A failed tick is logged and rolled back,
+        its folders are retried at the next ticks."""
+        tick_seconds = tick_seconds or ConfigManager.get(
+            "FINDER.SCHEDULER.TICK_SECONDS", 60
+        )
+
+        while True:
+            start = time.perf_counter()
+            try:
+                self.run_once()
+            except Exception as e:
+                # e.g. a locked DB or a full disk, not a reason to stop watching
+                with self.DB.writing():
+                    if self.DB.SQLconnect.in_transaction:
+                        self.DB.SQLconnect.rollback()
+                Logger.error(f"Scheduled scan tick failed: {e}", "FILESYSTEM")
+            time.sleep(max(0.0, tick_seconds - (time.perf_counter() - start)))
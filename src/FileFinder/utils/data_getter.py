@@ -1,8 +1,17 @@
+import fnmatch
 import os
 import re
 from pathlib import Path
 
+from src.Utils import io_stats
+from src.Utils.ParamsLoader import ConfigManager
 from src.Utils.fs_utils import (
+    counted_io,
+    fs_exists,
+    fs_isdir,
+    fs_isfile,
+    fs_listdir,
+    fs_scandir,
     safe_scandir,
     safe_json_load,
     get_all_files_by_extension,
@@ -12,18 +21,69 @@ from src.Utils.fs_utils import (
 from src.FileFinder.utils.path_parser import is_ef_folder
 
 
+def _is_pruned(dir_name: str, prune_globs: list[str]) -> bool:
+    return any(fnmatch.fnmatch(dir_name, pattern) for pattern in prune_globs)
+
+
+def _find_holo_files_strict(date_folder: Path) -> list[Path]:
+    """
+    Strict layout: the .holo files sit directly in the date folder (next to
+    their `_HD_` folders), so only the date folder itself is listed.
+    """
+    found_files = []
+    pruned = 0
+
+    for entry in safe_scandir(date_folder):
+        if entry.is_dir():
+            pruned += 1
+        elif entry.name.endswith(".holo"):
+            found_files.append(Path(entry.path))
+
+    io_stats.count("dirs_visited")
+    io_stats.count("dirs_pruned", pruned)
+
+    return found_files
+
+
 def find_all_holo_files(root_folder: Path) -> list[Path]:
     """
     Searches for all .holo files recursively from the root_path.
     Returns a list of unique, absolute file paths.
+
+    The walk skips the folders matching FINDER.DISCOVERY.PRUNE_GLOBS and does
+    not list deeper than FINDER.DISCOVERY.MAX_DEPTH levels below the root
+    (0 for no limit). With FINDER.DISCOVERY.STRICT_LAYOUT, only the root is
+    listed (see `_find_holo_files_strict`).
     """
+    if ConfigManager.get("FINDER.DISCOVERY.STRICT_LAYOUT"):
+        return _find_holo_files_strict(root_folder)
+
+    prune_globs = ConfigManager.get("FINDER.DISCOVERY.PRUNE_GLOBS", ["*_HD_*"])
+    max_depth = ConfigManager.get("FINDER.DISCOVERY.MAX_DEPTH", 0)
+
     found_files = []
     search_paths = [root_folder]
 
     for path in search_paths:
-        for dirpath, dirnames, filenames in os.walk(path):
-            # Only keeps the folders that does not contain "_HD_"
-            dirnames[:] = [d for d in dirnames if "_HD_" not in d]
+        root_depth = len(Path(path).parts)
+        walker = os.walk(path)
+        while True:
+            # Each step of the walk lists one directory
+            with counted_io("listing"):
+                step = next(walker, None)
+            if step is None:
+                break
+
+            dirpath, dirnames, filenames = step
+            io_stats.count("scandir")
+            io_stats.count("dirs_visited")
+
+            # Only keeps the folders that are not pruned (e.g. "_HD_" folders)
+            kept = [d for d in dirnames if not _is_pruned(d, prune_globs)]
+            if max_depth and len(Path(dirpath).parts) - root_depth >= max_depth:
+                kept = []
+            io_stats.count("dirs_pruned", len(dirnames) - len(kept))
+            dirnames[:] = kept
 
             for filename in filenames:
                 if filename.endswith(".holo"):
@@ -41,7 +101,7 @@ def find_preview_video(holo_file_path: Path) -> Path | None:
     preview_video_name = f"R_{holo_base_name}_p.avi"
     avi_path = holo_file_path.parent / preview_video_name
 
-    if avi_path.exists() and avi_path.is_file():
+    if fs_isfile(avi_path):
         return avi_path
 
     return None
@@ -55,7 +115,7 @@ def gather_all_hd_folders_data_from_holo(holo_file_path: Path) -> dict[int, dict
     hd_folders = {}
 
     parent_dir = os.path.dirname(holo_file_path)
-    for entry in os.scandir(parent_dir):
+    for entry in fs_scandir(parent_dir):
         if not entry.is_dir():
             continue
 
@@ -69,15 +129,15 @@ def gather_all_hd_folders_data_from_holo(holo_file_path: Path) -> dict[int, dict
                 hd_folder / f"{hd_folder.name}_RenderingParameters.json"
             )
 
-            if not rendering_params_json.exists():
+            if not fs_exists(rendering_params_json):
                 rendering_params_json = (
                     hd_folder / f"{hd_folder.name}_input_HD_params.json"
                 )
+                if not fs_exists(rendering_params_json):
+                    rendering_params_json = None
 
             rendering_params = (
-                safe_json_load(rendering_params_json)
-                if rendering_params_json.exists()
-                else None
+                safe_json_load(rendering_params_json) if rendering_params_json else None
             )
             version_text = safe_file_read(hd_folder / "version.txt")
 
@@ -107,10 +167,10 @@ def gather_ef_folders_data(
         ef_folder = Path(ef_folder.path)
 
         json_folder = ef_folder / "json"
-        if json_folder.is_dir():
+        if fs_isdir(json_folder):
             if get_input_params:
                 input_param = json_folder / "InputEyeFlowParams.json"
-                if input_param.exists():
+                if fs_exists(input_param):
                     content = safe_json_load(input_param)
 
                     if content:
@@ -131,7 +191,7 @@ def gather_ef_folders_data(
                 "InputEyeFlowParams": InputEyeFlowParams,
                 "h5_output": h5_output,
                 "report_path": _get_report_pdf(ef_folder),
-                "error_log_path": error_log_path if error_log_path.exists() else None,
+                "error_log_path": error_log_path if fs_exists(error_log_path) else None,
             }
         )
 
@@ -142,10 +202,10 @@ def _get_report_pdf(ef_folder: Path) -> Path | None:
     ef_folder = Path(ef_folder)
     pdf_folder = ef_folder / "pdf"
 
-    if not os.path.isdir(pdf_folder):
+    if not fs_isdir(pdf_folder):
         return None
 
-    pdfs = os.listdir(pdf_folder)
+    pdfs = fs_listdir(pdf_folder)
     if not pdfs or len(pdfs) == 0:
         return None
 
@@ -158,7 +218,7 @@ def _get_raw_h5_file(hd_folder: Path) -> Path | None:
     hd_folder = Path(hd_folder)
     raw_folder = hd_folder / "raw"
 
-    if not raw_folder.is_dir():
+    if not fs_isdir(raw_folder):
         return None
 
     raw_file = get_all_files_by_extension(raw_folder, "h5")
@@ -2,6 +2,7 @@
 from src.Logger.ColorClass import col
 import sys
 import os
+import threading
 
 # ┌───────────────────────────────────┐
 # │            TAGS_COLORS            │
@@ -89,6 +90,22 @@ def log_t(msg: str, tags: list[str] | str) -> None:
 # @param    msg     The message to be printed
 # @param    tags    Take the tag (or list of tags) to be printed before
 class Logger:
+    # Number of errors (and fatals) logged by this process
+    error_count = 0
+    # The same per thread, used by the scan report to count errors per folder
+    # (a folder abandoned in a background thread keeps logging)
+    _thread_errors = threading.local()
+
+    @staticmethod
+    def _count_error() -> None:
+        Logger.error_count += 1
+        Logger._thread_errors.count = Logger.thread_error_count() + 1
+
+    @staticmethod
+    def thread_error_count() -> int:
+        """Returns the number of errors (and fatals) logged by the current thread"""
+        return getattr(Logger._thread_errors, "count", 0)
+
     @staticmethod
     def info(msg: str, tags: list[str] | str = []) -> None:
         if isinstance(tags, str):
@@ -105,6 +122,7 @@ class Logger:
     def error(msg: str, tags: list[str] | str = []) -> None:
         if isinstance(tags, str):
             tags = [tags]
+        Logger._count_error()
         log_t(msg, ["ERROR"] + tags)
 
     @staticmethod
@@ -117,6 +135,7 @@ class Logger:
     def fatal(msg: str, tags: list[str] | str = [], raiseExeption: bool = True) -> None:
         if isinstance(tags, str):
             tags = [tags]
+        Logger._count_error()
         log_t(msg, ["FATAL"] + tags)
 
         if raiseExeption:
@@ -0,0 +1,52 @@
+import os
+import datetime
+from pathlib import Path
+
+from src.Utils.ParamsLoader import ConfigManager
+
+
+def get_appdata_db_path() -> Path:
+    """
+    Constructs the database path in the user's AppData/Roaming folder
+    and ensures the directory exists.
+    """
+
+    config_path = ConfigManager.get("DB.DB_PATH") or ""
+
+    if config_path != "":
+        return Path(config_path)
+
+    # Get AppData\Roaming folder
+    appdata_path = os.getenv("APPDATA")
+
+    # If not set, default to the local dir
+    if not appdata_path:
+        return Path("renders.db")
+
+    app_dir = Path(appdata_path) / "DopplerManager"
+    os.makedirs(app_dir, exist_ok=True)
+
+    return app_dir / "renders.db"
+
+
+def get_log_path() -> Path:
+    """
+    Constructs the log file path in the user's AppData/Roaming folder
+    and ensures the directory exists.
+    """
+
+    config_path = ConfigManager.get("LOG.LOG_PATH") or ""
+
+    if config_path != "":
+        return Path(config_path)
+
+    appdata_path = os.getenv("APPDATA")
+
+    # If not set, default to the local dir
+    if not appdata_path:
+        return Path("logs")
+
+    log_dir = Path(appdata_path) / "DopplerManager" / "logs"
+    os.makedirs(log_dir, exist_ok=True)
+
+    return log_dir / f"log_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
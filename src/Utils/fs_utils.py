@@ -1,9 +1,11 @@
 import json
 import os
 import datetime
+from contextlib import contextmanager
 
 from pathlib import Path
 from src.Logger.LoggerClass import Logger
+from src.Utils import io_governor, io_stats
 
 # ┌───────────────────────────────────┐
 # │          SAFE IO FUNCTIONS        │
@@ -12,8 +14,12 @@ from src.Logger.LoggerClass import Logger
 
 def safe_json_load(file_path: Path | str):
     try:
-        with open(file_path, "r") as f:
-            return json.load(f)
+        with counted_io("json_parsing", "file_read"), open(file_path, "r") as f:
+            content = json.load(f)
+            n_bytes = f.tell()
+        io_stats.count("bytes_read", n_bytes)
+        io_governor.consume(n_bytes)
+        return content
     except Exception as e:
         Logger.error(f"{e}", tags="FILESYSTEM")
         return None
@@ -21,8 +27,12 @@ def safe_json_load(file_path: Path | str):
 
 def safe_file_read(file_path: Path | str) -> str | None:
     try:
-        with open(file_path, "r") as f:
-            return f.read()
+        with counted_io("file_reading", "file_read"), open(file_path, "r") as f:
+            content = f.read()
+            n_bytes = f.tell()
+        io_stats.count("bytes_read", n_bytes)
+        io_governor.consume(n_bytes)
+        return content
     except Exception as e:
         Logger.error(f"{e}", tags="FILESYSTEM")
         return None
@@ -30,8 +40,7 @@ def safe_file_read(file_path: Path | str) -> str | None:
 
 def safe_isdir(path: Path | str) -> bool:
     try:
-        path = Path(path)
-        return path.is_dir()
+        return fs_isdir(path)
     except (PermissionError, OSError) as e:
         Logger.error(
             f"Access denied or error reading directory: {path} – {e}", tags="FILESYSTEM"
@@ -43,7 +52,8 @@ def safe_iterdir(path: Path | str) -> list[Path]:
     try:
         path = Path(path)
         if safe_isdir(path):
-            return list(path.iterdir())
+            with counted_io("listing", "scandir"):
+                return list(path.iterdir())
         else:
             return []
     except (PermissionError, OSError) as e:
@@ -57,7 +67,7 @@ def safe_scandir(path: Path | str) -> list[os.DirEntry]:
     try:
         path = Path(path)
         if safe_isdir(path):
-            return list(os.scandir(path))
+            return fs_scandir(path)
         else:
             return []
     except (PermissionError, OSError) as e:
@@ -67,17 +77,59 @@ def safe_scandir(path: Path | str) -> list[os.DirEntry]:
         return []
 
 
+# ┌───────────────────────────────────┐
+# │         COUNTED IO FUNCTIONS      │
+# └───────────────────────────────────┘
+# Thin wrappers used by the scanner so every filesystem access is counted and
+# timed in `io_stats` (see the scan report), and throttled by `io_governor`.
+
+
+@contextmanager
+def counted_io(phase: str, op: str | None = None):
+    """Wraps a filesystem access, see `io_stats.timed` and `io_governor.governed`"""
+    with io_governor.governed(), io_stats.timed(phase, op):
+        yield
+
+
+def fs_exists(path: Path | str) -> bool:
+    with counted_io("stat", "stat"):
+        return os.path.exists(path)
+
+
+def fs_isdir(path: Path | str) -> bool:
+    with counted_io("stat", "stat"):
+        return os.path.isdir(path)
+
+
+def fs_isfile(path: Path | str) -> bool:
+    with counted_io("stat", "stat"):
+        return os.path.isfile(path)
+
+
+def fs_listdir(path: Path | str) -> list[str]:
+    with counted_io("listing", "scandir"):
+        return os.listdir(path)
+
+
+def fs_scandir(path: Path | str) -> list[os.DirEntry]:
+    with counted_io("listing", "scandir"):
+        return list(os.scandir(path))
+
+
 # ┌───────────────────────────────────┐
 # │             IO UTILS              │
 # └───────────────────────────────────┘
 
 
 def get_last_update(path: Path) -> datetime.datetime | None:
-    if not path.exists():
+    try:
+        with counted_io("stat", "stat"):
+            mtime = os.path.getmtime(path)
+    except OSError:
         Logger.error(f"Path does not exists to get its update: {path}")
         return None
 
-    return datetime.datetime.fromtimestamp(os.path.getmtime(path))
+    return datetime.datetime.fromtimestamp(mtime)
 
 
 def get_all_files_by_extension(folder: Path, extension: str) -> list[Path]:
@@ -91,7 +143,8 @@ def get_all_files_by_extension(folder: Path, extension: str) -> list[Path]:
     Returns:
         list[Path]: A list of Path objects for all files that match the given extension.
     """
-    return list(folder.glob(f"*.{extension}"))
+    with counted_io("listing", "scandir"):
+        return list(folder.glob(f"*.{extension}"))
 
 
 def json_dump_nullable(text: str | None):
@@ -0,0 +1,229 @@
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from src.Utils import io_stats
+from src.Utils.ParamsLoader import ConfigManager
+
+# Throttles the filesystem accesses of the scanner, so a scan does not saturate
+# the file server the render machines are writing to (settings in FINDER.IO):
+#
+#   MAX_CONCURRENT_OPS    : directory/stat/read operations running at the same
+#                           time, shared by all the scan processes (0 = no cap)
+#   MAX_BYTES_PER_SECOND  : bytes of metadata files (json, txt, logs) read per
+#                           second, split between the scan processes (0 = no cap)
+#   TARGET_LATENCY        : seconds, above this average latency of the
+#                           operations the process waits before each new one
+#   MAX_DELAY             : seconds, the longest wait between two operations
+#
+# The state is kept per process, like `io_stats`. The time spent waiting is
+# added to the "throttling" phase of the scan report. A process blocked on a
+# free slot tells its `slot_listener`, so the wait (which can last as long as
+# another folder hangs on a stuck share) is not charged to the folder deadline.
+#
+# A thread abandoned after its deadline (see FinderUtils.run_with_deadline) is
+# `abandon`ed: the slots it holds are given back, its latencies no longer
+# move the backoff, and its next operation raises `Abandoned`. A scan process
+# terminated after its deadline has its slots given back by the parent, from
+# the `held_slots` counter it keeps up to date.
+
+_LATENCY_SMOOTHING = 0.2  # Weight of the last operation in the average latency
+_MIN_DELAY = 0.001
+
+_configured = False
+_semaphore = None
+_slot_listener = None
+_bytes_per_second = 0.0
+_tokens = 0.0
+_last_refill = 0.0
+_target_latency = 0.0
+_max_delay = 0.0
+_latency = 0.0
+_delay = 0.0
+_held_slots = None
+
+# The slots held by each thread, and whether it was abandoned
+_threads: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_threads_lock = threading.Lock()
+
+
+class Abandoned(BaseException):
+    """Raised by the operations of an abandoned thread, so it stops touching
+    the filesystem. Not an Exception, the error handlers of the scan must not
+    catch it."""
+
+
+class _ThreadState:
+    def __init__(self):
+        self.held = 0
+        self.abandoned = False
+        self.lock = threading.Lock()
+
+
+def _thread_state(thread: threading.Thread | None = None) -> _ThreadState:
+    thread = thread or threading.current_thread()
+    with _threads_lock:
+        state = _threads.get(thread)
+        if state is None:
+            state = _threads[thread] = _ThreadState()
+    return state
+
+
+def create_semaphore(context=None):
+    """Creates the semaphore capping the concurrent operations of all the
+    scan processes, None if there is no cap. Pass it to `configure` in each
+    process (e.g. as a scan worker argument)."""
+    max_ops = ConfigManager.get("FINDER.IO.MAX_CONCURRENT_OPS", 0)
+    if not max_ops:
+        return None
+
+    if context is None:
+        return threading.BoundedSemaphore(max_ops)
+    return context.BoundedSemaphore(max_ops)
+
+
+def configure(
+    semaphore=None, processes: int = 1, slot_listener=None, held_slots=None
+) -> None:
+    """Sets up the governor of the current process
+
+    Args:
+        semaphore (optional): The semaphore shared by the scan processes (or
+                              threads, see `create_semaphore`).
+        processes (int, optional): The number of scan processes sharing the
+                                   bytes per second budget. Defaults to 1.
+        slot_listener (optional): Called with True when an operation starts
+                                  waiting for a free slot, and with False
+                                  once it got one.
+        held_slots (optional): A shared integer (`multiprocessing.Value`)
+                               kept to the number of slots this process
+                               holds, to give them back if it is terminated.
+    """
+    global _configured, _semaphore, _slot_listener, _bytes_per_second, _tokens
+    global _last_refill, _target_latency, _max_delay, _latency, _delay
+    global _held_slots
+
+    _semaphore = semaphore
+    _slot_listener = slot_listener
+    _held_slots = held_slots
+    _bytes_per_second = (
+        ConfigManager.get("FINDER.IO.MAX_BYTES_PER_SECOND", 0) or 0
+    ) / max(processes, 1)
+    _tokens = _bytes_per_second
+    _last_refill = time.perf_counter()
+    _target_latency = ConfigManager.get("FINDER.IO.TARGET_LATENCY", 0) or 0
+    _max_delay = ConfigManager.get("FINDER.IO.MAX_DELAY", 1.0)
+    _latency = 0.0
+    _delay = 0.0
+    _configured = True
+
+
+def abandon(thread: threading.Thread) -> None:
+    """Gives back the slots held by a thread abandoned after its deadline
+    (its operation is hung), and makes its next operations raise `Abandoned`"""
+    state = _thread_state(thread)
+    with state.lock:
+        state.abandoned = True
+        for _ in range(state.held):
+            _semaphore.release()
+        _count_held(-state.held)
+        state.held = 0
+
+
+def _count_held(n: int) -> None:
+    if _held_slots is not None:
+        _held_slots.value += n
+
+
+def _wait(seconds: float) -> None:
+    with io_stats.timed("throttling"):
+        time.sleep(seconds)
+
+
+def _record_latency(latency: float) -> None:
+    """Adapts the delay between operations to the observed latency: doubled
+    while the server is slower than the target, halved once it recovers"""
+    global _latency, _delay
+
+    if not _target_latency:
+        return
+
+    _latency += _LATENCY_SMOOTHING * (latency - _latency)
+
+    if _latency > _target_latency:
+        _delay = min(_max_delay, max(_delay * 2, _MIN_DELAY))
+    elif _delay:
+        _delay = _delay / 2 if _delay > _MIN_DELAY else 0.0
+
+
+@contextmanager
+def governed():
+    """Wraps a filesystem operation: waits for the backoff delay and a free
+    slot, then records the latency of the operation.
+
+    Raises:
+        Abandoned: If the thread was abandoned (see `abandon`)
+    """
+    if not _configured:
+        configure(create_semaphore())
+
+    state = _thread_state()
+    if state.abandoned:
+        raise Abandoned()
+
+    if _delay:
+        _wait(_delay)
+
+    if _semaphore is not None:
+        if not _semaphore.acquire(False):
+            with io_stats.timed("throttling"):
+                if _slot_listener is not None:
+                    _slot_listener(True)
+                try:
+                    _semaphore.acquire()
+                finally:
+                    if _slot_listener is not None:
+                        _slot_listener(False)
+
+        with state.lock:
+            if state.abandoned:  # While waiting for the slot
+                _semaphore.release()
+                raise Abandoned()
+            state.held += 1
+            _count_held(1)
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        latency = time.perf_counter() - start
+        with state.lock:
+            # Already given back if the thread was abandoned meanwhile
+            if state.held:
+                state.held -= 1
+                _count_held(-1)
+                _semaphore.release()
+        if not state.abandoned:
+            _record_latency(latency)
+
+
+def consume(n_bytes: int) -> None:
+    """Takes `n_bytes` read from the bytes per second budget, waiting if the
+    budget is exceeded (token bucket)"""
+    global _tokens, _last_refill
+
+    if not _bytes_per_second:
+        return
+    if _thread_state().abandoned:
+        raise Abandoned()
+
+    now = time.perf_counter()
+    _tokens = min(
+        _bytes_per_second, _tokens + (now - _last_refill) * _bytes_per_second
+    )
+    _last_refill = now
+    _tokens -= n_bytes
+
+    if _tokens < 0:
+        _wait(-_tokens / _bytes_per_second)
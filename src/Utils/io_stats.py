@@ -0,0 +1,84 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Counters are kept per thread (so per process for the pool workers): a scan
+# worker resets them before processing a folder and sends a snapshot back
+# alongside its results. A folder abandoned after FINDER.FOLDER_TIMEOUT keeps
+# running in its own thread without adding to the counters of the next ones.
+#
+# Snapshot format:
+# {
+#       "counters": {
+#           "scandir"       : int,  # directory listings
+#           "dirs_visited"  : int,  # listed by the .holo discovery
+#           "dirs_pruned"   : int,  # skipped by the .holo discovery
+#           "stat"          : int,  # exists / is_dir / is_file / mtime
+#           "file_read"     : int,  # files opened and read
+#           "bytes_read"    : int,
+#       },
+#       "phases": {
+#           "listing"       : float,  # seconds
+#           "stat"          : float,
+#           "json_parsing"  : float,
+#           "file_reading"  : float,
+#           "throttling"    : float,  # waiting for the I/O governor
+#       }
+# }
+
+_local = threading.local()
+
+
+def _stats() -> tuple[dict[str, int], dict[str, float]]:
+    """Returns the counters and phases of the current thread"""
+    if not hasattr(_local, "counters"):
+        _local.counters = {}
+        _local.phases = {}
+    return _local.counters, _local.phases
+
+
+def reset() -> None:
+    """Clears the counters of the current thread."""
+    counters, phases = _stats()
+    counters.clear()
+    phases.clear()
+
+
+def count(op: str, n: int = 1) -> None:
+    """Increments the `op` counter by `n`."""
+    counters, _ = _stats()
+    counters[op] = counters.get(op, 0) + n
+
+
+@contextmanager
+def timed(phase: str, op: str | None = None):
+    """Accumulates the time spent inside the block into `phase`.
+
+    Args:
+        phase (str): The phase the time is added to (e.g. "listing").
+        op (str | None, optional): If given, the `op` counter is incremented once.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _, phases = _stats()
+        phases[phase] = phases.get(phase, 0.0) + (time.perf_counter() - start)
+        if op:
+            count(op)
+
+
+def snapshot() -> dict:
+    """Returns a copy of the counters of the current thread."""
+    counters, phases = _stats()
+    return {"counters": dict(counters), "phases": dict(phases)}
+
+
+def merge(total: dict, part: dict) -> dict:
+    """Adds the counters and phases of `part` into `total` (in place)."""
+    for section in ("counters", "phases"):
+        dest = total.setdefault(section, {})
+        for key, value in part.get(section, {}).items():
+            dest[key] = dest.get(key, 0) + value
+
+    return total
@@ -1,147 +1,214 @@
 import streamlit as st
-import pandas as pd
+import json
+
+from src.Database.Catalog import CATALOG_TABLE, catalog_membership_clause
+from src.FileFinder.FileFinderClass import FileFinder
+from src.ui.paged_table import render_catalog_table
+from src.ui.parameter_filters import render_parameter_filters
+from src.ui.query_cache import count_catalog_rows, load_catalog_values
+
+HD_COLUMNS = ["hd_folder", "measure_tag", "hd_version"]
+EF_COLUMNS = [
+    "ef_folder",
+    "measure_tag",
+    "ef_version",
+    "ef_report_path",
+    "ef_h5_output",
+]
+ERRORED_COLUMNS = ["ef_folder", "measure_tag", "ef_version", "error_log_path"]
+
+
+def _render_hd_without_ef(
+    ff: FileFinder,
+    generation: int,
+    key: str,
+    title: str,
+    warning: str,
+    hd_clauses: list[tuple[str, tuple]],
+    ef_clauses: list[tuple[str, tuple]],
+    source: str,
+) -> None:
+    """Renders the HD folders of the HoloDoppler selection with no EF render
+    in the EyeFlow selection, if any, and the export of their paths"""
+    clauses = [
+        *hd_clauses,
+        catalog_membership_clause("hd_id", ef_clauses, source, negate=True),
+    ]
+    count = count_catalog_rows(
+        ff, generation, [*HD_COLUMNS, "hd_id"], "hd_folder", clauses, source
+    )
+    if count == 0:
+        return
+
+    with st.expander(title.format(count=count)):
+        st.warning(warning)
+        render_catalog_table(
+            ff,
+            generation,
+            key,
+            HD_COLUMNS,
+            "hd_folder",
+            "hd_id",
+            clauses,
+            source,
+        )
+    st.download_button(
+        label="Export paths to .txt",
+        data="\n".join(
+            load_catalog_values(ff, generation, "hd_folder", clauses, source)
+        ),
+        file_name="ef_batch_input.txt",
+        mime="text/plain",
+    )
 
 
-def render_ef_section(filtered_hd_df: pd.DataFrame) -> pd.DataFrame:
+def render_ef_section(
+    ff: FileFinder,
+    generation: int,
+    hd_clauses: list[tuple[str, tuple]],
+    source: str = CATALOG_TABLE,
+) -> list[tuple[str, tuple]]:
     """
-    Renders the EyeFlow section of the dashboard.
+    Renders the EyeFlow filters and the tables of their selection, within
+    the HoloDoppler selection, counted and paged in SQL.
 
     Args:
-        filtered_hd_df (pd.DataFrame): DataFrame filtered by HoloDoppler selections.
+        ff (FileFinder): The FileFinder holding the database connection.
+        generation (int): The data generation of the DB (the cache key).
+        hd_clauses (list[tuple[str, tuple]]): The Holo and HoloDoppler
+                                              selections as SQL terms and
+                                              their parameters.
+        source (str, optional): The catalog table, or a query of some shards.
 
     Returns:
-        pd.DataFrame: DataFrame filtered by EyeFlow selections.
+        list[tuple[str, tuple]]: All the selections as SQL terms and their
+            parameters.
     """
     st.header("EyeFlow Data")
 
     # A render is valid if it has its output files and NO error log.
-    ef_base_df = filtered_hd_df[
-        filtered_hd_df["ef_folder"].notna()
-        & filtered_hd_df["ef_report_path"].notna()
-        & filtered_hd_df["ef_h5_output"].notna()
-        & filtered_hd_df["error_log_path"].isna()
-    ].copy()
-
-    if ef_base_df.empty:
+    clauses = [*hd_clauses, ("ef_valid = 1", ())]
+
+    if count_catalog_rows(ff, generation, ["ef_folder"], "ef_folder", clauses, source) == 0:
         st.info(
             "No valid EyeFlow data (with both a report and .h5 output) matches the current HoloDoppler filters."
         )
-        with st.expander(
-            f"Show {filtered_hd_df['hd_folder'].nunique()} HoloDoppler folders with no valid EyeFlow renders"
-        ):
-            st.warning(
-                "The following HoloDoppler folders do not have any associated EyeFlow renders with both a report and .h5 output file."
-            )
-            st.dataframe(
-                filtered_hd_df[["hd_folder", "measure_tag", "hd_version"]]
-                .drop_duplicates()
-                .reset_index(drop=True),
-                width="stretch",
-            )
-        st.download_button(
-            label="Export paths to .txt",
-            data="\n".join(filtered_hd_df["hd_folder"].unique()),
-            file_name="ef_batch_input.txt",
-            mime="text/plain",
+        _render_hd_without_ef(
+            ff,
+            generation,
+            "ef_no_valid_table",
+            "Show {count} HoloDoppler folders with no valid EyeFlow renders",
+            "The following HoloDoppler folders do not have any associated EyeFlow renders with both a report and .h5 output file.",
+            hd_clauses,
+            clauses,
+            source,
         )
-        return ef_base_df
+        return clauses
 
     if st.checkbox("Latest EF render only", value=True):
-        latest_indices = ef_base_df.loc[
-            ef_base_df.groupby("hd_folder")["ef_render_number"].idxmax()
-        ]
-        ef_base_df = latest_indices
+        clauses.append(("is_latest_ef = 1", ()))
+    base_clauses = list(clauses)
 
-    unique_ef_versions = sorted(ef_base_df["ef_version"].dropna().unique())
+    unique_ef_versions = load_catalog_values(
+        ff, generation, "ef_version", base_clauses, source
+    )
     selected_ef_versions = st.multiselect(
         "Filter by EyeFlow version", options=unique_ef_versions
     )
 
-    filtered_ef_df = ef_base_df
     if selected_ef_versions:
-        filtered_ef_df = filtered_ef_df[
-            filtered_ef_df["ef_version"].isin(selected_ef_versions)
-        ]
+        clauses.append(
+            (
+                f"ef_version IN ({', '.join('?' for _ in selected_ef_versions)})",
+                tuple(selected_ef_versions),
+            )
+        )
 
-    total_ef_in_selection = ef_base_df["ef_folder"].nunique()
-    shown_ef_folders = filtered_ef_df["ef_folder"].nunique()
+    # Filtered in SQL on the generated parameter columns
+    matching_ids = render_parameter_filters(ff, "EF", "ef_parameters")
+    if matching_ids is not None:
+        clauses.append(
+            (
+                "ef_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(sorted(int(i) for i in matching_ids)),),
+            )
+        )
 
-    ef_display_df = (
-        filtered_ef_df[
-            [
-                "ef_folder",
-                "measure_tag",
-                "ef_version",
-                "ef_report_path",
-                "ef_h5_output",
-            ]
-        ]
-        .drop_duplicates()
-        .reset_index(drop=True)
+    # The EF folders of the filtered selection, not a total of the catalog
+    total_ef_in_selection = count_catalog_rows(
+        ff, generation, ["ef_folder"], "ef_folder", base_clauses, source
+    )
+    shown_ef_folders = count_catalog_rows(
+        ff, generation, [*EF_COLUMNS, "ef_id"], "ef_folder", clauses, source
     )
 
     with st.expander(
         f"**Show {shown_ef_folders} of {total_ef_in_selection} valid EyeFlow folders from the selection above.**"
     ):
-        st.dataframe(ef_display_df, width="stretch")
+        render_catalog_table(
+            ff,
+            generation,
+            "ef_table",
+            EF_COLUMNS,
+            "ef_folder",
+            "ef_id",
+            clauses,
+            source,
+        )
     st.download_button(
         label="Export paths to .txt",
-        data="\n".join(ef_display_df["ef_folder"].unique()),
+        data="\n".join(
+            load_catalog_values(ff, generation, "ef_folder", clauses, source)
+        ),
         file_name="ef_folder_paths.txt",
         mime="text/plain",
     )
 
-    hd_folders_with_matching_renders = filtered_ef_df["hd_folder"].unique()
-    hd_with_no_matching_ef = filtered_hd_df[
-        ~filtered_hd_df["hd_folder"].isin(hd_folders_with_matching_renders)
-    ]
-
-    if not hd_with_no_matching_ef.empty:
-        with st.expander(
-            f"**Show {hd_with_no_matching_ef['hd_folder'].nunique()} HoloDoppler folders with no matching EyeFlow renders**"
-        ):
-            st.warning(
-                "The following HoloDoppler folders do not have any EyeFlow renders that match the filter above, have no renders at all, are missing the report/.h5 file, or have only failed renders."
-            )
-            st.dataframe(
-                hd_with_no_matching_ef[["hd_folder", "measure_tag", "hd_version"]]
-                .drop_duplicates()
-                .reset_index(drop=True),
-                width="stretch",
-            )
-
-        st.download_button(
-            label="Export paths to .txt",
-            data="\n".join(hd_with_no_matching_ef["hd_folder"].unique()),
-            file_name="ef_batch_input.txt",
-            mime="text/plain",
-        )
+    _render_hd_without_ef(
+        ff,
+        generation,
+        "ef_no_match_table",
+        "**Show {count} HoloDoppler folders with no matching EyeFlow renders**",
+        "The following HoloDoppler folders do not have any EyeFlow renders that match the filter above, have no renders at all, are missing the report/.h5 file, or have only failed renders.",
+        hd_clauses,
+        clauses,
+        source,
+    )
 
     # Separate renders with errors from valid ones.
-    errored_ef_df = filtered_hd_df[filtered_hd_df["error_log_path"].notna()].copy()
+    errored_clauses = [*hd_clauses, ("error_log_path IS NOT NULL", ())]
+    errored_count = count_catalog_rows(
+        ff, generation, [*ERRORED_COLUMNS, "ef_id"], "ef_folder", errored_clauses, source
+    )
 
-    if not errored_ef_df.empty:
+    if errored_count:
         with st.expander(
-            f"**Show {errored_ef_df['ef_folder'].nunique()} EyeFlow folders with processing errors**"
+            f"**Show {errored_count} EyeFlow folders with processing errors**"
         ):
             st.error(
                 "The following EyeFlow renders failed. The error logs can be found at the specified paths."
             )
-            errored_display_df = (
-                errored_ef_df[
-                    ["ef_folder", "measure_tag", "ef_version", "error_log_path"]
-                ]
-                .drop_duplicates()
-                .reset_index(drop=True)
+            render_catalog_table(
+                ff,
+                generation,
+                "ef_errored_table",
+                ERRORED_COLUMNS,
+                "ef_folder",
+                "ef_id",
+                errored_clauses,
+                source,
             )
-            st.dataframe(errored_display_df, width="stretch")
 
         # Export the INPUT HoloDoppler folders for a re-run.
         st.download_button(
             label="Export HD paths for re-run (.txt)",
-            data="\n".join(errored_ef_df["hd_folder"].unique()),
+            data="\n".join(
+                load_catalog_values(
+                    ff, generation, "hd_folder", errored_clauses, source
+                )
+            ),
             file_name="ef_rerun_batch_input.txt",
             mime="text/plain",
         )
 
-    return filtered_ef_df
+    return clauses
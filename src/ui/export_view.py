@@ -6,6 +6,23 @@ import os
 import json
 from pathlib import Path
 
+from src.Database.Catalog import CATALOG_TABLE, catalog_selection_query
+from src.Database.CatalogExport import find_ef_output_json
+from src.FileFinder.FileFinderClass import FileFinder
+from src.ui.query_cache import load_data
+
+# The catalog columns read by the export
+EXPORT_COLUMNS = [
+    "ef_folder",
+    "ef_report_path",
+    "ef_h5_output",
+    "hd_folder",
+    "measure_tag",
+    "hd_version",
+    "ef_version",
+    "holo_created_at",
+]
+
 
 def _collect_pdf_reports(
     row: pd.Series, base_folder: str, files_to_zip: list, seen_paths: set
@@ -206,14 +223,7 @@ def _generate_csv_data(filtered_df: pd.DataFrame) -> bytes | None:
             continue
 
         ef_folder_path = Path(ef_folder_str)
-        json_dir = ef_folder_path / "json"
-
-        # Find the JSON file containing "output"
-        json_file_path = None
-        if json_dir.exists() and json_dir.is_dir():
-            matching_files = list(json_dir.glob("*output*.json"))
-            if matching_files:
-                json_file_path = matching_files[0]  # Take the first match
+        json_file_path = find_ef_output_json(ef_folder_path)
 
         if json_file_path and json_file_path.is_file():
             try:
@@ -247,16 +257,31 @@ def _generate_csv_data(filtered_df: pd.DataFrame) -> bytes | None:
     return df.to_csv(index=False).encode("utf-8")
 
 
-def render_export_section(filtered_ef_df: pd.DataFrame) -> None:
+def render_export_section(
+    ff: FileFinder,
+    generation: int,
+    ef_clauses: list[tuple[str, tuple]],
+    source: str = CATALOG_TABLE,
+) -> None:
     """
     Renders the export section, allowing users to download selected files
     as a ZIP archive using a state-driven UI to prevent widget duplication.
 
     Args:
-        filtered_ef_df (pd.DataFrame): DataFrame filtered by all previous selections.
+        ff (FileFinder): The FileFinder holding the database connection.
+        generation (int): The data generation of the DB (the cache key).
+        ef_clauses (list[tuple[str, tuple]]): All the previous selections as
+                                              SQL terms and their parameters.
+        source (str, optional): The catalog table, or a query of some shards.
     """
     st.header("Export Data")
 
+    # Only the selected rows are loaded, not the catalog
+    query, params = catalog_selection_query(
+        EXPORT_COLUMNS, "ef_folder", clauses=ef_clauses, source=source
+    )
+    filtered_ef_df = load_data(query, params, generation, ff)
+
     if filtered_ef_df.empty:
         st.info("No EyeFlow data is selected to be exported.")
         return
@@ -1,111 +1,168 @@
 import streamlit as st
-import pandas as pd
+import json
 
+from src.Database.Catalog import CATALOG_TABLE, catalog_membership_clause
+from src.FileFinder.FileFinderClass import FileFinder
+from src.ui.paged_table import render_catalog_table
+from src.ui.parameter_filters import render_parameter_filters
+from src.ui.query_cache import count_catalog_rows, load_catalog_values
 
-def render_hd_section(filtered_holo_df: pd.DataFrame) -> pd.DataFrame:
+HOLO_COLUMNS = ["holo_file", "measure_tag", "holo_created_at"]
+HD_COLUMNS = ["hd_folder", "measure_tag", "hd_version", "hd_raw_h5_path"]
+
+
+def _render_holo_without_hd(
+    ff: FileFinder,
+    generation: int,
+    key: str,
+    title: str,
+    warning: str,
+    holo_clauses: list[tuple[str, tuple]],
+    hd_clauses: list[tuple[str, tuple]],
+    source: str,
+) -> None:
+    """Renders the .holo files of the Holo selection with no HD render in the
+    HoloDoppler selection, if any, and the export of their paths"""
+    clauses = [
+        *holo_clauses,
+        catalog_membership_clause("holo_id", hd_clauses, source, negate=True),
+    ]
+    count = count_catalog_rows(
+        ff, generation, [*HOLO_COLUMNS, "holo_id"], "holo_file", clauses, source
+    )
+    if count == 0:
+        return
+
+    with st.expander(title.format(count=count)):
+        st.warning(warning)
+        render_catalog_table(
+            ff,
+            generation,
+            key,
+            HOLO_COLUMNS,
+            "holo_file",
+            "holo_id",
+            clauses,
+            source,
+        )
+    st.download_button(
+        label="Export paths to .txt",
+        data="\n".join(
+            load_catalog_values(ff, generation, "holo_file", clauses, source)
+        ),
+        file_name="hd_batch_input.txt",
+        mime="text/plain",
+    )
+
+
+def render_hd_section(
+    ff: FileFinder,
+    generation: int,
+    holo_clauses: list[tuple[str, tuple]],
+    source: str = CATALOG_TABLE,
+) -> list[tuple[str, tuple]]:
     """
-    Renders the HoloDoppler and EyeFlow sections based on the
-    pre-filtered holo data.
+    Renders the HoloDoppler filters and the tables of their selection, within
+    the Holo selection, counted and paged in SQL.
 
     Args:
-        filtered_holo_df (pd.DataFrame): DataFrame filtered by Holo selections.
+        ff (FileFinder): The FileFinder holding the database connection.
+        generation (int): The data generation of the DB (the cache key).
+        holo_clauses (list[tuple[str, tuple]]): The Holo selections as SQL
+                                                terms and their parameters.
+        source (str, optional): The catalog table, or a query of some shards.
 
     Returns:
-        pd.DataFrame: DataFrame further filtered by HoloDoppler selections.
+        list[tuple[str, tuple]]: The Holo and HoloDoppler selections as SQL
+            terms and their parameters.
     """
     st.header("HoloDoppler Data")
     # Only consider HD renders that have a raw h5 file and a version.txt.
-    hd_base_df = filtered_holo_df.dropna(
-        subset=["hd_folder", "hd_raw_h5_path", "hd_version"]
-    ).copy()
+    clauses = [*holo_clauses, ("hd_valid = 1", ())]
 
-    if hd_base_df.empty:
+    if count_catalog_rows(ff, generation, ["hd_folder"], "hd_folder", clauses, source) == 0:
         st.info(
             "No HoloDoppler data with a raw .h5 file matches the current Holo filters."
         )
-        with st.expander(
-            f"Show {filtered_holo_df['holo_file'].nunique()} .holo files with no valid HoloDoppler renders"
-        ):
-            st.warning(
-                "The following .holo files do not have any associated HoloDoppler renders with a raw .h5 file."
-            )
-            st.dataframe(
-                filtered_holo_df[["holo_file", "measure_tag", "holo_created_at"]]
-                .drop_duplicates()
-                .reset_index(drop=True),
-                width="stretch",
-            )
-        st.download_button(
-            label="Export paths to .txt",
-            data="\n".join(filtered_holo_df["holo_file"].unique()),
-            file_name="hd_batch_input.txt",
-            mime="text/plain",
+        _render_holo_without_hd(
+            ff,
+            generation,
+            "hd_no_valid_table",
+            "Show {count} .holo files with no valid HoloDoppler renders",
+            "The following .holo files do not have any associated HoloDoppler renders with a raw .h5 file.",
+            holo_clauses,
+            clauses,
+            source,
         )
-        return hd_base_df
+        return clauses
 
     if st.checkbox("Latest HD render only", value=True):
-        latest_hd_render_numbers = hd_base_df.groupby("holo_file")[
-            "hd_render_number"
-        ].transform("max")
-        hd_base_df = hd_base_df[
-            hd_base_df["hd_render_number"] == latest_hd_render_numbers
-        ]
-
-    unique_hd_versions = sorted(hd_base_df["hd_version"].dropna().unique())
+        clauses.append(("is_latest_hd = 1", ()))
+    base_clauses = list(clauses)
+
+    unique_hd_versions = load_catalog_values(
+        ff, generation, "hd_version", base_clauses, source
+    )
     selected_hd_versions = st.multiselect(
         "Filter by HoloDoppler version", options=unique_hd_versions
     )
 
-    filtered_hd_df = hd_base_df
     if selected_hd_versions:
-        filtered_hd_df = filtered_hd_df[
-            filtered_hd_df["hd_version"].isin(selected_hd_versions)
-        ]
+        clauses.append(
+            (
+                f"hd_version IN ({', '.join('?' for _ in selected_hd_versions)})",
+                tuple(selected_hd_versions),
+            )
+        )
 
-    total_hd_in_selection = hd_base_df["hd_folder"].nunique()
-    shown_hd_folders = filtered_hd_df["hd_folder"].nunique()
+    # Filtered in SQL on the generated parameter columns
+    matching_ids = render_parameter_filters(ff, "HD", "hd_parameters")
+    if matching_ids is not None:
+        clauses.append(
+            (
+                "hd_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(sorted(int(i) for i in matching_ids)),),
+            )
+        )
 
-    hd_display_df = (
-        filtered_hd_df[["hd_folder", "measure_tag", "hd_version", "hd_raw_h5_path"]]
-        .drop_duplicates()
-        .reset_index(drop=True)
+    # The HD folders of the filtered selection, not a total of the catalog
+    total_hd_in_selection = count_catalog_rows(
+        ff, generation, ["hd_folder"], "hd_folder", base_clauses, source
+    )
+    shown_hd_folders = count_catalog_rows(
+        ff, generation, [*HD_COLUMNS, "hd_id"], "hd_folder", clauses, source
     )
 
     with st.expander(
         f"**Show {shown_hd_folders} of {total_hd_in_selection} valid HoloDoppler folders from the selection above.**"
     ):
-        st.dataframe(hd_display_df, width="stretch")
+        render_catalog_table(
+            ff,
+            generation,
+            "hd_table",
+            HD_COLUMNS,
+            "hd_folder",
+            "hd_id",
+            clauses,
+            source,
+        )
     st.download_button(
         label="Export paths to .txt",
-        data="\n".join(hd_display_df["hd_folder"].unique()),
+        data="\n".join(
+            load_catalog_values(ff, generation, "hd_folder", clauses, source)
+        ),
         file_name="hd_folder_paths.txt",
         mime="text/plain",
     )
 
-    holo_files_with_matching_renders = filtered_hd_df["holo_file"].unique()
-    holo_with_no_matching_hd = filtered_holo_df[
-        ~filtered_holo_df["holo_file"].isin(holo_files_with_matching_renders)
-    ]
-
-    if not holo_with_no_matching_hd.empty:
-        with st.expander(
-            f"**Show {holo_with_no_matching_hd['holo_file'].nunique()} .holo files with no matching HoloDoppler renders**"
-        ):
-            st.warning(
-                "The following .holo files do not have any HoloDoppler renders that match the filter above, have no renders at all, or are missing the raw .h5 file or the version.txt."
-            )
-            st.dataframe(
-                holo_with_no_matching_hd[
-                    ["holo_file", "measure_tag", "holo_created_at"]
-                ]
-                .drop_duplicates()
-                .reset_index(drop=True),
-                width="stretch",
-            )
-        st.download_button(
-            label="Export paths to .txt",
-            data="\n".join(holo_with_no_matching_hd["holo_file"].unique()),
-            file_name="hd_batch_input.txt",
-            mime="text/plain",
-        )
-    return filtered_hd_df
+    _render_holo_without_hd(
+        ff,
+        generation,
+        "hd_no_match_table",
+        "**Show {count} .holo files with no matching HoloDoppler renders**",
+        "The following .holo files do not have any HoloDoppler renders that match the filter above, have no renders at all, or are missing the raw .h5 file or the version.txt.",
+        holo_clauses,
+        clauses,
+        source,
+    )
+    return clauses
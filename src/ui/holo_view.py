@@ -1,6 +1,21 @@
 import streamlit as st
 import pandas as pd
 import datetime
+import json
+
+from src.Database.Catalog import (
+    CATALOG_TABLE,
+    HOLO_DATE_EXPRESSION,
+    HOLO_KEY_EXPRESSION,
+)
+from src.Database.CatalogShards import shards_query
+from src.FileFinder.FileFinderClass import FileFinder
+from src.ui.paged_table import render_catalog_table
+from src.ui.query_cache import count_catalog_rows, load_catalog_values
+from src.ui.shard_view import select_year_shards
+
+GROUP_FILE_KEY = "holo_group_file"
+DATE_RANGE_KEY = "holo_date_range"
 
 
 def parse_identifier(line: str) -> tuple[datetime.date, str] | None:
@@ -26,32 +41,45 @@ def parse_identifier(line: str) -> tuple[datetime.date, str] | None:
         return None
 
 
-def render_holo_section(combined_df: pd.DataFrame) -> pd.DataFrame:
+def render_holo_section(
+    ff: FileFinder,
+    generation: int,
+    total_holo_files: int,
+    created_at_range: tuple,
+    source: str = CATALOG_TABLE,
+) -> tuple[list[tuple[str, tuple]], str]:
     """
-    Renders the Holo Data filters and dataframe.
+    Renders the Holo Data filters and the table of their selection, counted
+    and paged in SQL. In a catalog split by year, only the shards of the
+    creation date filter are read, as soon as it changes.
 
     Args:
-        combined_df (pd.DataFrame): The full dataframe from the database.
+        ff (FileFinder): The FileFinder holding the database connection.
+        generation (int): The data generation of the DB (the cache key).
+        total_holo_files (int): The number of .holo files in the catalog.
+        created_at_range (tuple): The first and last creation dates of the
+            catalog, the bounds of the date filter (the whole catalog, even
+            if `source` only holds some years).
+        source (str, optional): The catalog table, or a query of some shards.
 
     Returns:
-        pd.DataFrame: The dataframe filtered by the user's selections.
+        tuple[list[tuple[str, tuple]], str]: The user's selections as SQL
+            terms and their parameters (see `render_catalog_table`), and the
+            catalog rows they apply to (`source`, or the year shards of the
+            date filter).
     """
     st.header("Holo Data")
 
-    filtered_holo_df = combined_df.copy()
-    if filtered_holo_df.empty:
-        return filtered_holo_df
+    clauses = []
 
     uploaded_file = st.file_uploader(
         "Import group (.txt)",
         type=["txt"],
         help="Upload a .txt file with one identifier per line (e.g., 240115_ABC)",
+        key=GROUP_FILE_KEY,
     )
 
     is_disabled = uploaded_file is not None
-    filtered_holo_df["holo_created_date"] = pd.to_datetime(
-        filtered_holo_df["holo_created_at"]
-    ).dt.date
 
     if is_disabled:
         identifiers_to_match = []
@@ -70,23 +98,24 @@ def render_holo_section(combined_df: pd.DataFrame) -> pd.DataFrame:
             st.error(f"Error reading or parsing file: {e}")
 
         if identifiers_to_match:
-            mask = pd.Series(
-                [False] * len(filtered_holo_df), index=filtered_holo_df.index
-            )
-            for date_to_match, tag_to_match in identifiers_to_match:
-                condition = (filtered_holo_df["holo_created_date"] == date_to_match) & (
-                    filtered_holo_df["measure_tag"] == tag_to_match
+            # Single hash lookup against the "YYMMDD_TAG" key
+            keys_to_match = {
+                f"{date_to_match:%y%m%d}_{tag_to_match}"
+                for date_to_match, tag_to_match in identifiers_to_match
+            }
+            clauses.append(
+                (
+                    f"{HOLO_KEY_EXPRESSION} IN (SELECT value FROM json_each(?))",
+                    (json.dumps(sorted(keys_to_match)),),
                 )
-                mask |= condition
-            filtered_holo_df = filtered_holo_df[mask]
+            )
             st.info(
                 f"Filtered by imported group ({len(identifiers_to_match)} identifiers)."
             )
 
-    base_date_col = pd.to_datetime(combined_df["holo_created_at"]).dt.date
-    min_date = base_date_col.min() if not base_date_col.empty else datetime.date.today()
-    max_date = base_date_col.max() if not base_date_col.empty else datetime.date.today()
-    unique_tags = sorted(combined_df["measure_tag"].dropna().unique())
+    min_date, max_date = pd.to_datetime(pd.Series(created_at_range), errors="coerce")
+    min_date = min_date.date() if pd.notna(min_date) else datetime.date.today()
+    max_date = max_date.date() if pd.notna(max_date) else datetime.date.today()
 
     selected_date_range = st.date_input(
         "Filter by creation date",
@@ -94,8 +123,16 @@ def render_holo_section(combined_df: pd.DataFrame) -> pd.DataFrame:
         min_value=min_date,
         max_value=max_date,
         disabled=is_disabled,
+        key=DATE_RANGE_KEY,
     )
 
+    # The group file ignores the date filter
+    shard_keys = select_year_shards(ff, None if is_disabled else selected_date_range)
+    if shard_keys is not None:
+        source = shards_query(ff.DB, shard_keys)
+
+    unique_tags = load_catalog_values(ff, generation, "measure_tag", [], source)
+
     selected_tags = st.multiselect(
         "Filter by measure tag",
         options=unique_tags,
@@ -105,31 +142,45 @@ def render_holo_section(combined_df: pd.DataFrame) -> pd.DataFrame:
     if not is_disabled:
         if len(selected_date_range) == 2:
             start_date, end_date = selected_date_range
-            filtered_holo_df = filtered_holo_df[
-                filtered_holo_df["holo_created_date"].between(start_date, end_date)
-            ]
+            clauses.append(
+                (
+                    f"{HOLO_DATE_EXPRESSION} BETWEEN ? AND ?",
+                    (start_date.isoformat(), end_date.isoformat()),
+                )
+            )
 
         if selected_tags:
-            filtered_holo_df = filtered_holo_df[
-                filtered_holo_df["measure_tag"].isin(selected_tags)
-            ]
-
-    total_holo_files = combined_df["holo_file"].nunique()
-    shown_holo_files = filtered_holo_df["holo_file"].nunique()
+            clauses.append(
+                (
+                    f"measure_tag IN ({', '.join('?' for _ in selected_tags)})",
+                    tuple(selected_tags),
+                )
+            )
 
-    holo_display_df = (
-        filtered_holo_df[["holo_file", "measure_tag", "holo_created_at"]]
-        .drop_duplicates()
-        .reset_index(drop=True)
+    holo_columns = ["holo_file", "measure_tag", "holo_created_at"]
+    # One row per .holo file
+    shown_holo_files = count_catalog_rows(
+        ff, generation, [*holo_columns, "holo_id"], "holo_file", clauses, source
     )
 
     with st.expander(f"**Show {shown_holo_files} of {total_holo_files} .holo files.**"):
-        st.dataframe(holo_display_df, width="stretch")
+        render_catalog_table(
+            ff,
+            generation,
+            "holo_table",
+            holo_columns,
+            "holo_file",
+            "holo_id",
+            clauses,
+            source,
+        )
     st.download_button(
         label="Export paths to .txt",
-        data="\n".join(holo_display_df["holo_file"].unique()),
+        data="\n".join(
+            load_catalog_values(ff, generation, "holo_file", clauses, source)
+        ),
         file_name="holo_files.txt",
         mime="text/plain",
     )
 
-    return filtered_holo_df.drop(columns=["holo_created_date"])
+    return clauses, source
@@ -0,0 +1,140 @@
+import streamlit as st
+
+from src.Database.Catalog import CATALOG_TABLE, catalog_page_query
+from src.FileFinder.FileFinderClass import FileFinder
+from src.Utils.ParamsLoader import ConfigManager
+from src.ui.query_cache import count_catalog_rows, load_data
+
+
+def _go_to_next_page(key: str, next_start_key: str) -> None:
+    st.session_state[f"{key}_previous_starts"].append(
+        st.session_state.get(f"{key}_start")
+    )
+    st.session_state[f"{key}_start"] = next_start_key
+
+
+def _go_to_previous_page(key: str) -> None:
+    previous_starts = st.session_state[f"{key}_previous_starts"]
+    st.session_state[f"{key}_start"] = (
+        previous_starts.pop() if previous_starts else None
+    )
+
+
+def _go_to_first_page(key: str) -> None:
+    st.session_state[f"{key}_previous_starts"] = []
+    st.session_state[f"{key}_start"] = None
+
+
+def _render_page_buttons(
+    key: str, is_first: bool, next_start, start: int, end: int, total: int
+) -> None:
+    col1, col2, col3, col4 = st.columns([1, 1, 1, 3])
+    with col1:
+        st.button(
+            "First",
+            key=f"{key}_first",
+            disabled=is_first,
+            on_click=_go_to_first_page,
+            args=(key,),
+        )
+    with col2:
+        st.button(
+            "Previous",
+            key=f"{key}_previous",
+            disabled=is_first,
+            on_click=_go_to_previous_page,
+            args=(key,),
+        )
+    with col3:
+        st.button(
+            "Next",
+            key=f"{key}_next",
+            disabled=next_start is None,
+            on_click=_go_to_next_page,
+            args=(key, next_start),
+        )
+    with col4:
+        st.caption(f"Rows {start + 1}-{end} of {total}")
+
+
+def render_catalog_table(
+    ff: FileFinder,
+    generation: int,
+    key: str,
+    columns: list[str],
+    key_column: str,
+    id_column: str,
+    clauses: list[tuple[str, tuple]],
+    source: str = CATALOG_TABLE,
+    page_size: int | None = None,
+) -> None:
+    """
+    Renders the distinct catalog rows of a selection one page at a time, each
+    page fetched from SQL (see `catalog_page_query`) and the total counted by
+    SQL, both cached for the data generation. Pages are keyset-paginated on
+    (`key_column`, `id_column`): the session stores the key of the last row
+    of the previous page, and goes back to the first page when the selection
+    changes.
+
+    Args:
+        ff (FileFinder): The FileFinder holding the database connection.
+        generation (int): The data generation of the DB (the cache key).
+        key (str): A unique key for the widgets and session state of the table.
+        columns (list[str]): The displayed columns.
+        key_column (str): The column the rows are sorted and paginated on.
+        id_column (str): The id ordering the rows sharing a key (not displayed).
+        clauses (list[tuple[str, tuple]]): The filters of the selection, as
+                                           SQL terms and their parameters.
+        source (str, optional): The catalog table, or a query of some shards.
+        page_size (int | None, optional): The number of rows per page.
+                                          Defaults to UI.PAGE_SIZE.
+    """
+    page_size = page_size or ConfigManager.get("UI.PAGE_SIZE", 100)
+
+    st.session_state.setdefault(f"{key}_start", None)
+    st.session_state.setdefault(f"{key}_previous_starts", [])
+
+    # A new selection starts on its first page
+    selection = repr((columns, key_column, clauses, source))
+    if st.session_state.get(f"{key}_selection") != selection:
+        st.session_state[f"{key}_selection"] = selection
+        _go_to_first_page(key)
+
+    total = count_catalog_rows(
+        ff, generation, [*columns, id_column], key_column, clauses, source
+    )
+
+    after = st.session_state[f"{key}_start"]
+    # One more row tells if there is a next page
+    query, params = catalog_page_query(
+        [*columns, id_column],
+        key_column,
+        after=after,
+        limit=page_size + 1,
+        tie_column=id_column,
+        clauses=clauses,
+        source=source,
+    )
+    page_df = load_data(query, params, generation, ff)
+
+    if page_df.empty and after is not None:
+        # The rows after the key are gone (new filters or a rescan)
+        _go_to_first_page(key)
+        st.rerun()
+
+    next_start = None
+    if len(page_df) > page_size:
+        page_df = page_df.iloc[:page_size]
+        last = page_df.iloc[-1]
+        next_start = (last[key_column], int(last[id_column]))
+
+    st.dataframe(page_df[columns], width="stretch", hide_index=True)
+
+    if total <= page_size and after is None:
+        return
+
+    # The position of the page is counted from the number of pages before it
+    start = page_size * len(st.session_state[f"{key}_previous_starts"])
+    _render_page_buttons(
+        key, after is None, next_start, start, start + len(page_df), total
+    )
@@ -0,0 +1,53 @@
+import streamlit as st
+import pandas as pd
+
+from src.Database.ParameterSets import (
+    get_parameter_columns,
+    parameter_filter_query,
+    parameter_values_query,
+)
+from src.FileFinder.FileFinderClass import FileFinder
+
+
+def render_parameter_filters(ff: FileFinder, kind: str, key: str) -> set[int] | None:
+    """
+    Renders a filter per parameter column of DB.PARAMETER_COLUMNS. The values
+    and the matching renders are queried on the indexed generated columns,
+    the JSON of the parameters is never parsed here.
+
+    Args:
+        ff (FileFinder): The FileFinder holding the database connection.
+        kind (str): "HD" (rendering parameters) or "EF" (input parameters).
+        key (str): A unique key for the widgets.
+
+    Returns:
+        set[int] | None: The ids of the matching renders, None if no filter
+                         is selected.
+    """
+    columns = get_parameter_columns(kind)
+    if not columns:
+        return None
+
+    filters = {}
+    with st.expander(f"Filter by {kind} parameters"):
+        widget_columns = st.columns(min(len(columns), 4))
+        for i, column in enumerate(columns):
+            values = pd.read_sql_query(
+                parameter_values_query(column), ff.DB.reader
+            )["value"].tolist()
+
+            with widget_columns[i % len(widget_columns)]:
+                selected = st.multiselect(
+                    column.removeprefix(f"{kind.lower()}_"),
+                    options=values,
+                    key=f"{key}_{column}",
+                    help=columns[column],
+                )
+            if selected:
+                filters[column] = selected
+
+    if not filters:
+        return None
+
+    query, params = parameter_filter_query(kind, filters)
+    return set(pd.read_sql_query(query, ff.DB.reader, params=params)["id"])
@@ -0,0 +1,79 @@
+import streamlit as st
+import pandas as pd
+
+from src.Database.Catalog import (
+    CATALOG_TABLE,
+    catalog_selection_query,
+    catalog_total_query,
+)
+from src.FileFinder.FileFinderClass import FileFinder
+from src.Utils.ParamsLoader import ConfigManager
+
+
+@st.cache_data(max_entries=ConfigManager.get("DB.QUERY_CACHE_SIZE", 128))
+def load_data(query: str, params: tuple, generation: int, _ff: FileFinder):
+    """
+    Loads data from the database using the provided SQL query.
+    The cache is keyed by (query, params, generation): it stays valid as long
+    as the data generation of the DB does not change, whichever process
+    wrote to it, and only the least recently used entries are evicted.
+    """
+    return pd.read_sql_query(query, _ff.DB.reader, params=params)
+
+
+def count_catalog_rows(
+    ff: FileFinder,
+    generation: int,
+    columns: list[str],
+    key_column: str,
+    clauses: list[tuple[str, tuple]],
+    source: str = CATALOG_TABLE,
+) -> int:
+    """
+    Counts the distinct catalog rows of a selection in SQL (see
+    `catalog_total_query`), cached for the data generation.
+
+    Args:
+        ff (FileFinder): The FileFinder holding the database connection.
+        generation (int): The data generation of the DB (the cache key).
+        columns (list[str]): The columns the rows are distinct on.
+        key_column (str): Only the rows with this column set are counted.
+        clauses (list[tuple[str, tuple]]): The filters of the selection, as
+                                           SQL terms and their parameters.
+        source (str, optional): The catalog table, or a query of some shards.
+
+    Returns:
+        int: The number of rows
+    """
+    query, params = catalog_total_query(
+        columns, key_column, clauses=clauses, source=source
+    )
+    return int(load_data(query, params, generation, ff)["total"].iloc[0])
+
+
+def load_catalog_values(
+    ff: FileFinder,
+    generation: int,
+    column: str,
+    clauses: list[tuple[str, tuple]],
+    source: str = CATALOG_TABLE,
+) -> list:
+    """
+    Loads the distinct values of a catalog column in a selection, sorted
+    (see `catalog_selection_query`), cached for the data generation.
+
+    Args:
+        ff (FileFinder): The FileFinder holding the database connection.
+        generation (int): The data generation of the DB (the cache key).
+        column (str): The column, e.g. a version or a path.
+        clauses (list[tuple[str, tuple]]): The filters of the selection, as
+                                           SQL terms and their parameters.
+        source (str, optional): The catalog table, or a query of some shards.
+
+    Returns:
+        list: The values, without NULL
+    """
+    query, params = catalog_selection_query(
+        [column], column, clauses=clauses, source=source
+    )
+    return load_data(query, params, generation, ff)[column].tolist()
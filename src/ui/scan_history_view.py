@@ -0,0 +1,69 @@
+import streamlit as st
+import pandas as pd
+
+from src.FileFinder.FileFinderClass import FileFinder
+
+
+def render_scan_history_section(ff: FileFinder) -> None:
+    """
+    Renders the history of the scans stored in the `scan_runs` table, to follow
+    the scan duration and throughput over time.
+
+    Args:
+        ff (FileFinder): The FileFinder holding the database connection.
+    """
+    st.header("Scan History")
+
+    history_df = pd.read_sql_query(
+        "SELECT * FROM scan_runs ORDER BY started_at", ff.DB.reader
+    )
+
+    if history_df.empty:
+        st.info("No scan has been recorded yet.")
+        return
+
+    history_df["started_at"] = pd.to_datetime(history_df["started_at"])
+    found_columns = ["found_holo", "found_hd", "found_ef", "found_preview"]
+    history_df["found_total"] = history_df[found_columns].sum(axis=1)
+
+    # Rows found per second of scan (listing + parsing), and inserted per second
+    history_df["scan_throughput"] = history_df["found_total"] / history_df[
+        "scan_duration"
+    ].where(history_df["scan_duration"] > 0)
+    history_df["insert_throughput"] = history_df["found_total"] / history_df[
+        "insert_duration"
+    ].where(history_df["insert_duration"] > 0)
+
+    successful_df = history_df[history_df["status"] == "success"].set_index(
+        "started_at"
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Duration (s)")
+        st.line_chart(
+            successful_df[["scan_duration", "insert_duration", "total_duration"]]
+        )
+    with col2:
+        st.subheader("Throughput (rows/s)")
+        st.line_chart(successful_df[["scan_throughput", "insert_throughput"]])
+
+    with st.expander(f"**Show the {len(history_df)} recorded scans.**"):
+        st.dataframe(
+            history_df[
+                [
+                    "started_at",
+                    "status",
+                    "roots",
+                    "total_duration",
+                    "scan_duration",
+                    "insert_duration",
+                    *found_columns,
+                    "errors",
+                    "app_version",
+                    "report_path",
+                ]
+            ].sort_values("started_at", ascending=False),
+            width="stretch",
+            hide_index=True,
+        )
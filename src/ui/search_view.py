@@ -0,0 +1,40 @@
+import time
+
+import streamlit as st
+import pandas as pd
+
+from src.Database.SearchIndex import search_catalog_query
+from src.FileFinder.FileFinderClass import FileFinder
+from src.Utils.ParamsLoader import ConfigManager
+
+
+def render_search_section(ff: FileFinder) -> None:
+    """
+    Renders a search box over the whole catalog, answered by the full-text
+    index (see SearchIndex): .holo paths, measure tags, HD/EF folder names,
+    versions and parameters.
+
+    Args:
+        ff (FileFinder): The FileFinder holding the database connection.
+    """
+    text = st.text_input(
+        "Search",
+        placeholder="e.g. 240101_ABC, v1.2, batch_size=64",
+        help="Every word must match the same .holo file or render, as a prefix.",
+    )
+
+    search = search_catalog_query(text, ConfigManager.get("UI.SEARCH_LIMIT", 200))
+    if search is None:
+        return
+
+    start = time.perf_counter()
+    query, params = search
+    results_df = pd.read_sql_query(query, ff.DB.reader, params=params)
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    if results_df.empty:
+        st.info(f"No match for '{text}'.")
+        return
+
+    st.caption(f"{len(results_df)} rows found in {duration_ms:.0f} ms, best matches first")
+    st.dataframe(results_df, width="stretch", hide_index=True)
@@ -0,0 +1,73 @@
+import datetime
+
+import streamlit as st
+
+from src.Database.Catalog import get_shard_mode
+from src.Database.CatalogShards import get_shards, year_shard_key
+from src.FileFinder.FileFinderClass import FileFinder
+
+
+def select_year_shards(
+    ff: FileFinder, date_range: tuple[datetime.date, ...] | None
+) -> list[str] | None:
+    """
+    Selects the year shards holding a creation date range (year mode, see
+    CatalogShards), from the value of the date filter of the Holo section.
+    The shard of a date folder holds the .holo files created that day.
+
+    Args:
+        ff (FileFinder): The FileFinder holding the database connection.
+        date_range (tuple[datetime.date, ...] | None): The dates selected in
+            the filter, None if it is not applied (e.g. a group file).
+
+    Returns:
+        list[str] | None: The keys of the selected shards, None to load the
+                          whole catalog.
+    """
+    if get_shard_mode() != "year" or not date_range or len(date_range) != 2:
+        return None
+
+    shards = get_shards(ff.DB)
+    start_date, end_date = date_range
+    # The shard of each year, or its own one until the next refresh moves it
+    keys = set()
+    for year in range(start_date.year, end_date.year + 1):
+        keys.update((str(year), year_shard_key(year)))
+    selected = [shard["key"] for shard in shards if shard["key"] in keys]
+
+    # The undated shard is only loaded with the whole catalog, the date
+    # filter leaves its rows out anyway
+    return selected if len(selected) < len(shards) else None
+
+
+def render_shard_selector(ff: FileFinder) -> list[str] | None:
+    """
+    Selects the catalog shards to load (see CatalogShards), when the catalog
+    is split by root in more than one file: the roots chosen in a
+    multiselect. The year shards follow the date filter of the Holo section
+    instead (see `select_year_shards`).
+
+    Args:
+        ff (FileFinder): The FileFinder holding the database connection.
+
+    Returns:
+        list[str] | None: The keys of the selected shards, None to load the
+                          whole catalog.
+    """
+    if get_shard_mode() != "root":
+        return None
+
+    shards = get_shards(ff.DB)
+    if len(shards) < 2:
+        return None
+
+    rows = {shard["key"]: shard["rows"] for shard in shards}
+    selected = st.multiselect(
+        "Roots",
+        options=list(rows),
+        format_func=lambda key: f"{key} ({rows[key]} rows)",
+        placeholder="All",
+        help="Only the selected shards of the catalog are loaded.",
+    )
+
+    return selected or None
@@ -3,6 +3,12 @@ import time
 import tkinter as tk
 from tkinter import filedialog
 
+from src.Database.CatalogExport import (
+    ParquetExport,
+    get_parquet_folder,
+    start_parquet_export,
+)
+from src.Database.Maintenance import get_db_stats, run_maintenance
 from src.FileFinder.FileFinderClass import FileFinder
 from src.Logger.LoggerClass import Logger
 
@@ -93,13 +99,107 @@ def render_sidebar(ff: FileFinder) -> None:
 
             time.sleep(2)  # Give user time to see the success message
             progress_bar.empty()
-            st.cache_data.clear()
             st.rerun()
 
     # --- Clear Database Button ---
     st.sidebar.markdown("---")
     if st.sidebar.button("Clear database"):
         ff.ClearDB()
-        st.cache_data.clear()
         st.sidebar.success("Database cleared.")
         st.rerun()
+
+    render_maintenance_controls(ff)
+    render_parquet_export_controls(ff)
+
+
+def render_maintenance_controls(ff: FileFinder) -> None:
+    """
+    Renders the size and fragmentation of the database, and a button running
+    its maintenance (integrity check, ANALYZE, VACUUM, WAL checkpoint).
+    """
+    st.sidebar.markdown("---")
+    with st.sidebar.expander("Database maintenance"):
+        stats = get_db_stats(ff.DB)
+        last = stats["last_maintenance"]
+        st.caption(
+            f"{stats['size_bytes'] / 1e6:.1f} MB ({stats['page_count']} pages), "
+            f"{stats['free_ratio']:.0%} free, WAL {stats['wal_bytes'] / 1e6:.1f} MB. "
+            f"Last maintenance: {f'{last:%Y-%m-%d %H:%M}' if last else 'never'}"
+        )
+
+        force_vacuum = st.checkbox(
+            "Force VACUUM",
+            help="Rebuilds the whole file, even if it is not fragmented. Scans wait meanwhile.",
+        )
+        if st.button("Run maintenance"):
+            with st.spinner("Maintaining the database..."):
+                report = run_maintenance(ff.DB, vacuum=True if force_vacuum else None)
+
+            if report["problems"]:
+                st.error(
+                    "Integrity check failed: " + "; ".join(report["problems"][:5])
+                )
+            else:
+                after = report["after"]
+                st.success(
+                    f"Done in {sum(report['durations'].values()):.1f}s: "
+                    f"{after['size_bytes'] / 1e6:.1f} MB, {after['freelist_count']} free pages."
+                )
+
+
+@st.cache_resource
+def _parquet_exports() -> dict[str, ParquetExport]:
+    """The last Parquet export of each DB, shared by the sessions of the app"""
+    return {}
+
+
+@st.fragment(run_every=1)
+def _render_export_progress(export: ParquetExport) -> None:
+    """Polls a running export, and reruns the app once it is done"""
+    if not export.running:
+        st.rerun()
+
+    if export.total:
+        st.progress(
+            export.read / export.total,
+            text=f"Reading the EyeFlow metrics ({export.read}/{export.total})",
+        )
+    else:
+        st.progress(0, text="Loading the catalog...")
+
+
+def render_parquet_export_controls(ff: FileFinder) -> None:
+    """
+    Renders a button writing the whole catalog, with the EyeFlow output
+    metrics, as a Parquet dataset partitioned by year and measure tag. The
+    export runs in the background (see `start_parquet_export`), the other
+    controls stay usable.
+    """
+    exports = _parquet_exports()
+    export = exports.get(ff.DB.DB_PATH)
+
+    with st.sidebar.expander("Parquet export"):
+        folder = st.text_input(
+            "Export folder",
+            value=str(get_parquet_folder(ff.DB)),
+            help="A new or empty folder, or a previous export (replaced). Defaults to EXPORT.PARQUET_PATH.",
+        )
+        running = export is not None and export.running
+        if st.button("Export catalog to Parquet", disabled=running):
+            export = exports[ff.DB.DB_PATH] = start_parquet_export(ff.DB, folder)
+            running = True
+
+        if export is None:
+            return
+        if running:
+            _render_export_progress(export)
+        elif export.error is not None:
+            st.error(f"Export to {export.folder} failed: {export.error}")
+        else:
+            report = export.report
+            st.success(
+                f"{report['rows']} rows in {report['files']} files, "
+                f"{report['metric_columns']} metric columns."
+            )
+            if report["skipped"]:
+                st.info(f"{report['skipped']} EyeFlow folders have no output metrics.")
@@ -0,0 +1,104 @@
+import datetime
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The modules are imported as `src.…` from the repository root, like app.py
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.Database.DBClass import DB  # noqa: E402
+from src.FileFinder.FileFinderClass import FileFinder  # noqa: E402
+from src.Utils.ParamsLoader import ConfigManager  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    """ConfigManager reads the settings.json of the current directory"""
+    monkeypatch.chdir(ROOT)
+
+
+def make_folder_result(
+    root: str, day: datetime.date, tags: list[str], hd_renders: int = 1
+) -> tuple:
+    """Builds the result of `FinderUtils.process_date_folder` for a date
+    folder of `root` holding a .holo file per tag, each with `hd_renders`
+    valid HD renders holding one valid EF render"""
+    folder = f"{root.rstrip('/')}/{day:%y%m%d}"
+    holo_list, hd_list, ef_list, preview_list = [], [], [], []
+
+    for tag in tags:
+        holo = f"{folder}/{day:%y%m%d}_{tag}.holo"
+        holo_list.append((holo, {"path": holo, "tag": tag, "created_at": day}))
+
+        for render_number in range(1, hd_renders + 1):
+            hd = f"{folder}/{day:%y%m%d}_{tag}_HD_{render_number}"
+            hd_list.append(
+                (
+                    hd,
+                    {
+                        "holo_id": holo,
+                        "path": hd,
+                        "render_number": render_number,
+                        "rendering_parameters": f'{{"batch_size": {32 * render_number}}}',
+                        "raw_h5_path": f"{hd}/raw/raw.h5",
+                        "version": f"v{render_number}.0",
+                        "updated_at": datetime.datetime(2025, 1, 1),
+                    },
+                )
+            )
+            ef = f"{hd}/eyeflow/{day:%y%m%d}_{tag}_HD_{render_number}_EF_1"
+            ef_list.append(
+                {
+                    "hd_id": hd,
+                    "render_number": 1,
+                    "path": ef,
+                    "input_parameters": None,
+                    "version": "v1.0",
+                    "report_path": f"{ef}/report.pdf",
+                    "error_log_path": None,
+                    "h5_output": f"{ef}/output.h5",
+                    "updated_at": datetime.datetime(2025, 1, 1),
+                }
+            )
+
+    found = (holo_list, hd_list, ef_list, preview_list)
+    folder_stats = {
+        "folder": folder,
+        "fingerprint": f"{folder}:{len(holo_list)}",
+        "duration": 0.0,
+        "errors": 0,
+        "found_holo": len(holo_list),
+        "found_hd": len(hd_list),
+        "found_ef": len(ef_list),
+        "found_preview": 0,
+    }
+    return (*found, folder_stats)
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """Overrides settings of settings.json: `settings["DB.SHARD_BY"] = "year"`"""
+    overrides = {}
+    get = ConfigManager.get
+
+    def get_with_overrides(key: str, default_value=None):
+        if key in overrides:
+            return overrides[key]
+        return get(key, default_value)
+
+    monkeypatch.setattr(ConfigManager, "get", staticmethod(get_with_overrides))
+    return overrides
+
+
+@pytest.fixture
+def ff(tmp_path, settings):
+    """A FileFinder on a new database file, with its tables"""
+    settings["DB.TEMP_DB"] = False
+    file_finder = FileFinder(DB(str(tmp_path / "catalog.db"), override=False))
+    file_finder.CreateDB()
+    yield file_finder
+    file_finder.DB.close()
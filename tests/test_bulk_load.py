@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+from src.Database.DBClass import DB
+
+
+@pytest.fixture
+def db(tmp_path, settings):
+    settings["DB.TEMP_DB"] = False
+    db = DB(str(tmp_path / "bulk.db"), override=False)
+    db.create_table("parents", {"id": "INTEGER PRIMARY KEY"})
+    db.create_table(
+        "children",
+        {
+            "id": "INTEGER PRIMARY KEY",
+            "parent_id": "INTEGER NOT NULL",
+            "FOREIGN KEY (parent_id)": "REFERENCES parents (id)",
+        },
+    )
+    db.create_index("idx_children_parent", "children", ["parent_id"])
+    yield db
+    db.close()
+
+
+def _indexes(db: DB) -> list[str]:
+    rows = db.SQLconnect.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+    )
+    return [row[0] for row in rows]
+
+
+def _pragma(db: DB, pragma: str):
+    return db.SQLconnect.execute(f"PRAGMA {pragma}").fetchone()[0]
+
+
+def test_indexes_are_recreated_on_commit(db):
+    synchronous = _pragma(db, "synchronous")
+
+    with db.bulk_load(["children"]):
+        assert _indexes(db) == []
+        db.SQLconnect.execute("INSERT INTO parents (id) VALUES (1)")
+        db.SQLconnect.execute("INSERT INTO children (parent_id) VALUES (1)")
+        db.commit()
+
+    assert _indexes(db) == ["idx_children_parent"]
+    assert db.count("children") == 1
+    assert _pragma(db, "foreign_keys") == 1
+    assert _pragma(db, "synchronous") == synchronous
+
+
+def test_missing_parents_fail_the_commit(db):
+    with db.bulk_load(["children"]):
+        db.SQLconnect.execute("INSERT INTO children (parent_id) VALUES (42)")
+        with pytest.raises(sqlite3.IntegrityError, match="children"):
+            db.commit()
+
+    # Rolled back, with the indexes
+    assert db.count("children") == 0
+    assert _indexes(db) == ["idx_children_parent"]
+
+
+def test_failed_load_is_rolled_back(db):
+    with pytest.raises(RuntimeError):
+        with db.bulk_load(["children"]):
+            db.SQLconnect.execute("INSERT INTO parents (id) VALUES (1)")
+            raise RuntimeError("scan failed")
+
+    assert db.count("parents") == 0
+    assert _indexes(db) == ["idx_children_parent"]
+    assert _pragma(db, "foreign_keys") == 1
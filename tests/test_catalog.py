@@ -0,0 +1,197 @@
+import datetime
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import make_folder_result
+from src.Database.Catalog import (
+    CATALOG_TABLE,
+    HOLO_DATE_EXPRESSION,
+    HOLO_KEY_EXPRESSION,
+    as_typed_catalog,
+    catalog_membership_clause,
+    catalog_page_query,
+    catalog_selection_query,
+    catalog_total_query,
+    refresh_catalog,
+)
+
+ROOT = "/data"
+
+
+@pytest.fixture
+def catalog(ff):
+    results = [
+        make_folder_result(ROOT, datetime.date(2025, 9, 10), ["ABC", "DOP"], 2),
+        make_folder_result(ROOT, datetime.date(2025, 9, 11), ["DOP"], 3),
+        make_folder_result(ROOT, datetime.date(2024, 1, 2), ["XYZ"]),
+    ]
+    ff.StoreResults(ROOT, results, [], datetime.datetime.now())
+    refresh_catalog(ff.DB)
+    return ff.DB
+
+
+def _pages(DB, columns, key_column, limit, **kwargs) -> list[list[tuple]]:
+    """Follows the pages of `catalog_page_query` to the end"""
+    tie_column = kwargs.get("tie_column")
+    pages = []
+    after = None
+    while True:
+        query, params = catalog_page_query(
+            columns, key_column, after=after, limit=limit, **kwargs
+        )
+        rows = DB.reader.execute(query, params).fetchall()
+        if not rows:
+            return pages
+        pages.append(rows)
+        last = rows[-1]
+        after = (last[0], last[-1]) if tie_column else last[0]
+
+
+def test_latest_render_flags(catalog):
+    rows = catalog.reader.execute(
+        f"""
+        SELECT hd_render_number, is_latest_hd, is_latest_ef FROM {CATALOG_TABLE}
+        WHERE holo_file = '/data/250911/250911_DOP.holo' ORDER BY hd_render_number
+        """
+    ).fetchall()
+
+    assert rows == [(1, 0, 1), (2, 0, 1), (3, 1, 1)]
+
+
+def test_latest_render_skips_the_invalid_renders(ff):
+    result = make_folder_result(ROOT, datetime.date(2025, 9, 10), ["ABC"], 3)
+    result[1][2][1]["raw_h5_path"] = None  # The last HD render has no .h5
+    result[2][0]["error_log_path"] = f"{result[2][0]['path']}/error.log"
+    ff.StoreResults(ROOT, [result], [], datetime.datetime.now())
+    refresh_catalog(ff.DB)
+
+    rows = ff.DB.reader.execute(
+        f"""
+        SELECT hd_render_number, hd_valid, is_latest_hd, ef_valid, is_latest_ef
+        FROM {CATALOG_TABLE} ORDER BY hd_render_number
+        """
+    ).fetchall()
+    assert rows == [(1, 1, 0, 0, 0), (2, 1, 1, 1, 1), (3, 0, 0, 1, 1)]
+
+
+def test_refresh_replaces_the_catalog(catalog, ff):
+    holo_only = make_folder_result(ROOT, datetime.date(2025, 9, 12), ["NEW"], 0)
+    ff.StoreResults(f"{ROOT}/250912", [holo_only], [], datetime.datetime.now())
+    count = refresh_catalog(catalog)
+
+    assert count == catalog.count(CATALOG_TABLE) == 8 + 1
+    # A .holo file without renders still has its row
+    assert catalog.reader.execute(
+        f"SELECT hd_id, hd_valid FROM {CATALOG_TABLE} WHERE measure_tag = 'NEW'"
+    ).fetchall() == [(None, 0)]
+
+
+def test_pages_go_through_all_the_rows_once(catalog):
+    pages = _pages(catalog, ["hd_folder"], "hd_folder", 2)
+
+    assert [len(page) for page in pages] == [2, 2, 2, 2]
+    folders = [row[0] for page in pages for row in page]
+    assert folders == sorted(folders)
+    assert len(set(folders)) == 8
+
+
+def test_pages_break_ties_on_the_id(catalog):
+    """More rows share a tag than fit on a page"""
+    pages = _pages(
+        catalog, ["measure_tag", "hd_id"], "measure_tag", 2, tie_column="hd_id"
+    )
+
+    rows = [row for page in pages for row in page]
+    assert [tag for tag, _ in rows] == ["ABC"] * 2 + ["DOP"] * 5 + ["XYZ"]
+    assert len({hd_id for _, hd_id in rows}) == 8
+
+
+def test_conditions_and_clauses(catalog):
+    columns = ["hd_folder", "hd_id"]
+    kwargs = {
+        "conditions": {"measure_tag": ["DOP", "XYZ"], "is_latest_hd": 1},
+        "clauses": [(f"{HOLO_DATE_EXPRESSION} BETWEEN ? AND ?", ("2025-01-01", "2025-12-31"))],
+    }
+
+    query, params = catalog_page_query(columns, "hd_folder", limit=10, **kwargs)
+    rows = catalog.reader.execute(query, params).fetchall()
+    assert [folder for folder, _ in rows] == [
+        "/data/250910/250910_DOP_HD_2",
+        "/data/250911/250911_DOP_HD_3",
+    ]
+
+    query, params = catalog_total_query(columns, "hd_folder", **kwargs)
+    assert catalog.reader.execute(query, params).fetchone()[0] == 2
+
+
+def test_typed_catalog(catalog):
+    df = as_typed_catalog(pd.read_sql_query(f"SELECT * FROM {CATALOG_TABLE}", catalog.reader))
+
+    assert df["holo_file"].dtype == "category"
+    assert df["hd_id"].dtype == "Int64"
+    assert df["is_latest_hd"].dtype == bool
+    assert df["holo_created_date"].dt.hour.eq(0).all()
+    assert set(df["holo_key"]) == {"250910_ABC", "250910_DOP", "250911_DOP", "240102_XYZ"}
+
+
+def test_holo_key_expression_matches_the_typed_catalog(catalog):
+    df = as_typed_catalog(pd.read_sql_query(f"SELECT * FROM {CATALOG_TABLE}", catalog.reader))
+    keys = ["250910_DOP", "240102_XYZ"]
+
+    query, params = catalog_page_query(
+        ["holo_file"],
+        "holo_file",
+        limit=10,
+        clauses=[(f"{HOLO_KEY_EXPRESSION} IN (SELECT value FROM json_each(?))", (json.dumps(keys),))],
+    )
+    rows = catalog.reader.execute(query, params).fetchall()
+
+    expected = sorted(df.loc[df["holo_key"].isin(keys), "holo_file"].unique())
+    assert [row[0] for row in rows] == expected == [
+        "/data/240102/240102_XYZ.holo",
+        "/data/250910/250910_DOP.holo",
+    ]
+
+
+def test_page_of_a_source_query(catalog):
+    source = f"SELECT * FROM {CATALOG_TABLE} WHERE measure_tag = 'ABC'"
+    query, params = catalog_page_query(["holo_file"], "holo_file", source=source)
+
+    assert catalog.reader.execute(query, params).fetchall() == [
+        ("/data/250910/250910_ABC.holo",)
+    ]
+
+
+def test_selection_is_every_row_of_the_pages(catalog):
+    clauses = [("is_latest_hd = 1", ())]
+    query, params = catalog_selection_query(["hd_version"], "hd_version", clauses=clauses)
+
+    assert catalog.reader.execute(query, params).fetchall() == [
+        ("v1.0",),
+        ("v2.0",),
+        ("v3.0",),
+    ]
+
+
+def test_holo_files_missing_from_the_hd_selection(catalog):
+    hd_clauses = [("hd_valid = 1", ()), ("hd_version = ?", ("v3.0",))]
+    clauses = [catalog_membership_clause("holo_id", hd_clauses, negate=True)]
+
+    query, params = catalog_selection_query(["holo_file"], "holo_file", clauses=clauses)
+    assert catalog.reader.execute(query, params).fetchall() == [
+        ("/data/240102/240102_XYZ.holo",),
+        ("/data/250910/250910_ABC.holo",),
+        ("/data/250910/250910_DOP.holo",),
+    ]
+
+    query, params = catalog_total_query(
+        ["holo_file", "holo_id"], "holo_file", clauses=clauses
+    )
+    assert catalog.reader.execute(query, params).fetchone()[0] == 3
+
+
+def test_unknown_column_is_refused():
+    with pytest.raises(Exception, match="Unknown catalog column"):
+        catalog_page_query(["holo_file; DROP TABLE catalog"], "holo_file")
@@ -0,0 +1,153 @@
+import csv
+import datetime
+import http.client
+import io
+import json
+import threading
+
+import pytest
+
+from conftest import make_folder_result
+from src.Api.CatalogApi import RESOURCES, create_api_server
+from src.Database.Catalog import refresh_catalog
+
+ROOT = "/data"
+
+
+@pytest.fixture
+def api(ff, settings):
+    settings["API.PAGE_SIZE"] = 100
+    settings["API.MAX_PAGE_SIZE"] = 1000
+    results = [
+        make_folder_result(ROOT, datetime.date(2025, 9, 10), ["ABC", "DOP"], 2),
+        make_folder_result(ROOT, datetime.date(2025, 9, 11), ["DOP"]),
+    ]
+    ff.StoreResults(ROOT, results, [], datetime.datetime.now())
+    refresh_catalog(ff.DB)
+
+    # Port 0: a free port chosen by the OS
+    server = create_api_server(ff.DB, "127.0.0.1", 0)
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server, path: str, headers: dict | None = None) -> http.client.HTTPResponse:
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+    connection.request("GET", path, headers=headers or {})
+    response = connection.getresponse()
+    response.body = response.read()
+    connection.close()
+    return response
+
+
+def test_explicit_port_zero_binds_a_free_port(api):
+    assert api.server_address[1] != 0
+
+
+def test_index_lists_the_resources(api, ff):
+    response = _get(api, "/")
+
+    assert response.status == 200
+    body = json.loads(response.body)
+    assert body["generation"] == ff.DB.get_generation()
+    assert set(body["resources"]) == set(RESOURCES)
+    assert body["resources"]["hd"]["key"] == "hd_folder"
+
+
+def test_filters_and_typed_values(api):
+    response = _get(api, "/hd?measure_tag=DOP&is_latest_hd=1")
+
+    assert response.status == 200
+    body = json.loads(response.body)
+    assert [row["hd_folder"] for row in body["rows"]] == [
+        "/data/250910/250910_DOP_HD_2",
+        "/data/250911/250911_DOP_HD_1",
+    ]
+    assert body["rows"][0]["hd_valid"] is True
+    assert body["rows"][0]["hd_render_number"] == 2
+    assert body["next"] is None
+
+
+def test_pages_follow_next(api):
+    folders = []
+    path = "/hd?limit=2"
+    while True:
+        body = json.loads(_get(api, path).body)
+        folders += [row["hd_folder"] for row in body["rows"]]
+        if body["next"] is None:
+            break
+        path = f"/hd?limit=2&after={body['next']}"
+
+    assert folders == sorted(folders)
+    assert len(folders) == 5
+
+
+def test_csv_format(api):
+    response = _get(api, "/holo", {"Accept": "text/csv"})
+
+    assert response.status == 200
+    assert response.getheader("Content-Type").startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.body.decode("utf-8"))))
+    assert rows[0] == RESOURCES["holo"][1]
+    assert [row[1] for row in rows[1:]] == [
+        "/data/250910/250910_ABC.holo",
+        "/data/250910/250910_DOP.holo",
+        "/data/250911/250911_DOP.holo",
+    ]
+
+
+def test_etag_is_the_generation(api, ff):
+    response = _get(api, "/holo")
+    etag = response.getheader("ETag")
+
+    assert etag == f'"{ff.DB.get_generation()}-json"'
+    assert response.getheader("Cache-Control") == "no-cache"
+
+    not_modified = _get(api, "/holo", {"If-None-Match": f"W/{etag}"})
+    assert not_modified.status == 304
+    assert not_modified.body == b""
+    assert not_modified.getheader("ETag") == etag
+
+    # Another format is another representation
+    assert _get(api, "/holo?format=csv", {"If-None-Match": etag}).status == 200
+
+
+def test_etag_changes_after_a_scan(api, ff):
+    etag = _get(api, "/holo").getheader("ETag")
+
+    ff.StoreResults(
+        ROOT,
+        [make_folder_result(ROOT, datetime.date(2025, 9, 12), ["NEW"])],
+        [],
+        datetime.datetime.now(),
+        replace=False,
+    )
+    refresh_catalog(ff.DB)
+
+    response = _get(api, "/holo", {"If-None-Match": etag})
+    assert response.status == 200
+    assert response.getheader("ETag") != etag
+    assert len(json.loads(response.body)["rows"]) == 4
+
+
+@pytest.mark.parametrize(
+    "path, status",
+    [
+        ("/unknown", 404),
+        ("/holo?hd_version=v1.0", 400),
+        ("/hd?hd_render_number=two", 400),
+        ("/holo?limit=0", 400),
+        ("/holo?limit=1001", 400),
+        ("/holo?format=xml", 400),
+    ],
+)
+def test_invalid_requests(api, path, status):
+    response = _get(api, path)
+
+    assert response.status == status
+    assert "error" in json.loads(response.body)
@@ -0,0 +1,95 @@
+import datetime
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import make_folder_result
+from src.Database.Catalog import refresh_catalog
+from src.Database.CatalogExport import (
+    EXPORT_MARKER,
+    export_catalog_parquet,
+    start_parquet_export,
+)
+
+
+@pytest.fixture
+def catalog(ff, tmp_path):
+    """A catalog whose EF renders of 2025 have output metrics"""
+    root = str(tmp_path / "data")
+    results = [
+        make_folder_result(root, datetime.date(2025, 9, 10), ["ABC", "DOP"]),
+        make_folder_result(root, datetime.date(2024, 1, 2), ["XYZ"]),
+    ]
+    for ef in results[0][2]:
+        json_dir = tmp_path / ef["path"] / "json"
+        json_dir.mkdir(parents=True)
+        metrics = {"heart_rate": 60.5, "arteries": {"count": 2}}
+        if "DOP" in ef["path"]:
+            metrics["heart_rate"] = [60, 61]  # Another type
+        (json_dir / "output_metrics.json").write_text(json.dumps(metrics))
+
+    ff.StoreResults(root, results, [], datetime.datetime.now())
+    refresh_catalog(ff.DB)
+    return ff.DB
+
+
+def test_export_is_partitioned_with_the_metrics(catalog, tmp_path):
+    folder = tmp_path / "parquet"
+    report = export_catalog_parquet(catalog, folder)
+
+    assert (report["rows"], report["skipped"]) == (3, 1)
+    assert (folder / EXPORT_MARKER).is_file()
+    assert sorted(path.name for path in folder.iterdir()) == [
+        EXPORT_MARKER,
+        "year=2024",
+        "year=2025",
+    ]
+
+    df = pd.read_parquet(folder, filters=[("year", "=", 2025)])
+    assert sorted(df["measure_tag"].astype(str)) == ["ABC", "DOP"]
+    assert set(df["metric.arteries.count"]) == {2}
+    # Numbers in one file and lists in another are kept as JSON text
+    assert sorted(df["metric.heart_rate"]) == ["60.5", "[60, 61]"]
+
+
+def test_previous_export_is_replaced(catalog, tmp_path):
+    folder = tmp_path / "parquet"
+    export_catalog_parquet(catalog, folder)
+    (folder / "year=2023").mkdir()  # Left by an older catalog
+
+    export_catalog_parquet(catalog, folder)
+
+    assert not (folder / "year=2023").exists()
+    assert not list(tmp_path.glob(".parquet.*"))  # No temporary folder left
+
+
+def test_folder_of_other_files_is_refused(catalog, tmp_path):
+    folder = tmp_path / "notes"
+    folder.mkdir()
+    (folder / "notes.txt").touch()
+
+    with pytest.raises(FileExistsError):
+        export_catalog_parquet(catalog, folder)
+    assert [path.name for path in folder.iterdir()] == ["notes.txt"]
+
+
+def test_background_export(catalog, tmp_path):
+    export = start_parquet_export(catalog, tmp_path / "parquet")
+    export.thread.join(30)
+
+    assert not export.running
+    assert export.error is None
+    assert export.report["rows"] == 3
+    assert export.read == export.total == 3
+
+
+def test_failed_background_export(catalog, tmp_path):
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "notes.txt").touch()
+
+    export = start_parquet_export(catalog, tmp_path / "notes")
+    export.thread.join(30)
+
+    assert isinstance(export.error, FileExistsError)
+    assert export.report is None
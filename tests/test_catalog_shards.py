@@ -0,0 +1,168 @@
+import datetime
+
+import pytest
+
+from conftest import make_folder_result
+from src.Database.Catalog import CATALOG_TABLE, refresh_catalog
+from src.Database.CatalogShards import (
+    OLDER_SHARD,
+    check_shard_roots,
+    get_shards,
+    get_shards_folder,
+    shards_query,
+    year_shard_key,
+)
+from src.Database.ScanState import get_folder_states, record_folder_scan
+
+ROOT = "/data"
+
+
+@pytest.fixture
+def ff(settings, request):
+    settings["DB.SHARD_BY"] = "year"
+    # The shard mode must be set before the tables are created
+    return request.getfixturevalue("ff")
+
+
+def _store(ff, results, replace=True):
+    ff.StoreResults(ROOT, results, [], datetime.datetime.now(), replace=replace)
+    refresh_catalog(ff.DB)
+
+
+def _rescan_folder(ff, result):
+    """Replaces the rows of one date folder, like a scheduled scan"""
+    now = datetime.datetime.now()
+    folder = result[4]["folder"]
+    record_folder_scan(
+        ff.DB, ROOT, result[4], now, get_folder_states(ff.DB, ROOT).get(folder)
+    )
+    ff.DeleteRootData(folder)
+    ff.InsertResults([result])
+    ff.DB.commit()
+    refresh_catalog(ff.DB)
+
+
+def _shards(ff) -> dict[str, dict]:
+    return {shard["key"]: shard for shard in get_shards(ff.DB)}
+
+
+def _catalog_files(ff, source=CATALOG_TABLE) -> list[str]:
+    return [
+        row[0]
+        for row in ff.DB.reader.execute(
+            f"SELECT DISTINCT holo_file FROM ({source}) ORDER BY holo_file"
+        )
+    ]
+
+
+@pytest.fixture
+def two_years():
+    return [
+        make_folder_result(ROOT, datetime.date(2024, 1, 2), ["XYZ"]),
+        make_folder_result(ROOT, datetime.date(2025, 9, 10), ["ABC", "DOP"]),
+    ]
+
+
+def test_one_shard_file_per_year(ff, two_years):
+    _store(ff, two_years)
+
+    shards = _shards(ff)
+    assert set(shards) == {"2024", "2025"}
+    assert shards["2025"]["rows"] == 2
+    folder = get_shards_folder(ff.DB)
+    assert all((folder / shard["file_name"]).exists() for shard in shards.values())
+
+    # The readers see the shards through the catalog view
+    assert _catalog_files(ff) == [
+        "/data/240102/240102_XYZ.holo",
+        "/data/250910/250910_ABC.holo",
+        "/data/250910/250910_DOP.holo",
+    ]
+    assert (
+        ff.DB.SQLconnect.execute(
+            f"SELECT COUNT(*) FROM main.{CATALOG_TABLE}"
+        ).fetchone()[0]
+        == 0
+    )
+
+
+def test_only_the_changed_shards_are_rewritten(ff, two_years):
+    _store(ff, two_years)
+    before = _shards(ff)
+    generation = ff.DB.get_generation()
+
+    _rescan_folder(
+        ff, make_folder_result(ROOT, datetime.date(2025, 9, 10), ["ABC", "DOP", "NEW"])
+    )
+    after = _shards(ff)
+
+    assert after["2024"]["refreshed_at"] == before["2024"]["refreshed_at"]
+    assert after["2025"]["refreshed_at"] != before["2025"]["refreshed_at"]
+    assert after["2025"]["rows"] == 3
+    assert ff.DB.get_generation() > generation
+
+
+def test_unchanged_refresh_rewrites_nothing(ff, two_years):
+    _store(ff, two_years)
+    before = _shards(ff)
+    generation = ff.DB.get_generation()
+
+    refresh_catalog(ff.DB)
+
+    assert _shards(ff) == before
+    assert ff.DB.get_generation() == generation
+
+
+def test_emptied_year_is_removed(ff, two_years):
+    _store(ff, two_years)
+    removed_file = get_shards_folder(ff.DB) / _shards(ff)["2024"]["file_name"]
+
+    # Rescanned without the 2024 folder
+    _store(ff, two_years[1:])
+
+    assert set(_shards(ff)) == {"2025"}
+    assert not removed_file.exists()
+    assert _catalog_files(ff) == [
+        "/data/250910/250910_ABC.holo",
+        "/data/250910/250910_DOP.holo",
+    ]
+
+
+def test_shards_query_reads_some_years_only(ff, two_years):
+    _store(ff, two_years)
+
+    assert _catalog_files(ff, shards_query(ff.DB, ["2024"])) == [
+        "/data/240102/240102_XYZ.holo"
+    ]
+    assert _catalog_files(ff, shards_query(ff.DB, ["2019"])) == []
+
+
+def test_year_shard_keys_are_bounded():
+    today = datetime.date(2026, 10, 19)
+
+    assert year_shard_key(2026, today) == "2026"
+    assert year_shard_key(2020, today) == "2020"
+    assert year_shard_key(2019, today) == OLDER_SHARD
+    assert year_shard_key(2031, today) == "2026"  # A wrong date
+
+
+def test_older_years_share_a_shard(ff):
+    this_year = datetime.date.today().year
+    results = [
+        make_folder_result(ROOT, datetime.date(year, 3, 4), ["DOP"])
+        for year in range(this_year - 15, this_year + 1)
+    ]
+    _store(ff, results)
+
+    shards = _shards(ff)
+    assert len(shards) == 8
+    assert shards[OLDER_SHARD]["rows"] == 9
+    assert len(_catalog_files(ff)) == 16
+
+
+def test_too_many_roots_are_refused(ff, settings):
+    settings["DB.SHARD_BY"] = "root"
+
+    check_shard_roots(ff.DB, [f"/root_{i}" for i in range(8)])
+    with pytest.raises(Exception, match="roots would need more catalog shards"):
+        check_shard_roots(ff.DB, [f"/root_{i}" for i in range(9)])
@@ -0,0 +1,51 @@
+import datetime
+
+import pandas as pd
+
+from conftest import make_folder_result
+from src.Database.Catalog import CATALOG_TABLE, refresh_catalog
+from src.Database.CatalogSnapshot import (
+    get_snapshot_folder,
+    read_snapshot,
+    write_snapshot,
+)
+
+
+def _store(ff, day: datetime.date) -> None:
+    result = make_folder_result("/data", day, ["ABC", "DOP"], 2)
+    ff.StoreResults(f"/data/{day:%y%m%d}", [result], [], datetime.datetime.now())
+    refresh_catalog(ff.DB)
+
+
+def test_snapshot_matches_the_catalog(ff):
+    _store(ff, datetime.date(2025, 1, 1))
+    write_snapshot(ff.DB)
+
+    snapshot = read_snapshot(ff.DB, ff.DB.get_generation())
+    catalog = pd.read_sql_query(f"SELECT * FROM {CATALOG_TABLE}", ff.DB.reader)
+
+    assert list(snapshot.columns) == list(catalog.columns)
+    assert snapshot["holo_file"].dtype == "category"
+    assert snapshot["is_latest_hd"].dtype == bool
+    assert sorted(snapshot["hd_folder"].astype(str)) == sorted(catalog["hd_folder"])
+
+
+def test_snapshot_of_another_generation_is_not_used(ff):
+    _store(ff, datetime.date(2025, 1, 1))
+    write_snapshot(ff.DB)
+    generation = ff.DB.get_generation()
+
+    _store(ff, datetime.date(2025, 1, 2))
+
+    assert read_snapshot(ff.DB, ff.DB.get_generation()) is None
+    assert read_snapshot(ff.DB, generation) is not None
+
+
+def test_new_snapshot_replaces_the_old_ones(ff):
+    _store(ff, datetime.date(2025, 1, 1))
+    write_snapshot(ff.DB)
+    _store(ff, datetime.date(2025, 1, 2))
+    path = write_snapshot(ff.DB)
+
+    assert list(get_snapshot_folder(ff.DB).glob("catalog_*.arrow")) == [path]
+    assert len(read_snapshot(ff.DB, ff.DB.get_generation())) == 8
@@ -0,0 +1,82 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.Database.DBClass import DB
+
+
+@pytest.fixture
+def db(tmp_path, settings):
+    settings["DB.TEMP_DB"] = False
+    db = DB(str(tmp_path / "connections.db"), override=False)
+    db.create_table("items", {"id": "INTEGER PRIMARY KEY", "name": "VARCHAR(255)"})
+    yield db
+    db.close()
+
+
+def _in_thread(func):
+    """Runs `func` in another thread, like an app session or an API
+    request, and returns its result"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_each_thread_has_its_reader(db):
+    reader = db.reader
+
+    assert db.reader is reader
+    assert _in_thread(lambda: db.reader) is not reader
+    assert reader is not db.SQLconnect
+
+
+def test_readers_only_see_committed_data(db):
+    db.SQLconnect.execute("INSERT INTO items (name) VALUES ('a')")  # Not committed
+
+    assert _in_thread(lambda: db.reader.execute("SELECT COUNT(*) FROM items").fetchone()) == (0,)
+
+    db.commit()
+    assert _in_thread(lambda: db.reader.execute("SELECT COUNT(*) FROM items").fetchone()) == (1,)
+
+
+def test_readers_are_read_only(db):
+    with pytest.raises(sqlite3.OperationalError, match="readonly"):
+        db.reader.execute("INSERT INTO items (name) VALUES ('a')")
+
+
+def test_writes_of_other_threads_wait(db):
+    order = []
+
+    def write(name: str, hold: float):
+        with db.writing():
+            order.append(f"{name} start")
+            time.sleep(hold)
+            order.append(f"{name} end")
+
+    first = threading.Thread(target=write, args=("first", 0.2))
+    first.start()
+    time.sleep(0.05)
+    write("second", 0)
+    first.join()
+
+    assert order == ["first start", "first end", "second start", "second end"]
+
+
+def test_writing_is_reentrant(db):
+    with db.writing():
+        with db.writing():
+            db.SQLconnect.execute("INSERT INTO items (name) VALUES ('a')")
+        db.commit()
+
+    assert db.count("items") == 1
+
+
+def test_readers_of_finished_threads_are_closed(db):
+    _in_thread(lambda: db.reader)
+    db.reader  # Opening a reader drops the ones of the finished threads
+
+    assert list(db._readers) == [threading.current_thread()]
@@ -0,0 +1,55 @@
+import pytest
+
+from src.Database.DBClass import DB
+
+
+@pytest.fixture
+def db(tmp_path, settings):
+    settings["DB.TEMP_DB"] = False
+    db = DB(str(tmp_path / "generation.db"), override=False)
+    db.create_table("items", {"id": "INTEGER PRIMARY KEY", "name": "VARCHAR(255)"})
+    yield db
+    db.close()
+
+
+def test_commit_of_a_change_increases_the_generation(db):
+    generation = db.get_generation()
+    db.SQLconnect.execute("INSERT INTO items (name) VALUES ('a')")
+    db.commit()
+
+    assert db.get_generation() == generation + 1
+
+
+def test_commit_without_change_keeps_the_generation(db):
+    generation = db.get_generation()
+    db.commit()
+
+    assert db.get_generation() == generation
+
+
+def test_plain_commit_keeps_the_generation(db):
+    """The scan state is committed without invalidating the app caches"""
+    generation = db.get_generation()
+    db.SQLconnect.execute("INSERT INTO items (name) VALUES ('a')")
+    db.SQLconnect.commit()
+
+    assert db.get_generation() == generation
+
+
+def test_generation_is_shared_with_other_processes(db, tmp_path):
+    other = DB(str(tmp_path / "generation.db"), override=False)
+    try:
+        db.SQLconnect.execute("INSERT INTO items (name) VALUES ('a')")
+        db.commit()
+
+        assert other.get_generation() == db.get_generation()
+    finally:
+        other.close()
+
+
+def test_clear_carries_the_generation_on(db):
+    """The caches of the old data are not reused for the empty DB"""
+    generation = db.get_generation()
+    db.clear_db()
+
+    assert db.get_generation() > generation
@@ -0,0 +1,123 @@
+import datetime
+
+import pytest
+
+from conftest import make_folder_result
+from src.Database.DBClass import DB
+from src.Database.Directories import (
+    DIRECTORY_PATHS_VIEW,
+    DirectoryDictionary,
+    create_directories,
+    relative_name,
+    split_path,
+)
+
+
+def test_split_path_keeps_the_separator_in_the_name():
+    assert split_path("/data/240101/240101_ABC.holo") == (
+        "/data/240101",
+        "/240101_ABC.holo",
+    )
+
+
+def test_split_path_under_the_root():
+    assert split_path("/data") == ("/", "data")
+
+
+def test_split_path_of_a_root():
+    assert split_path("/") == (None, "/")
+
+
+def test_split_path_of_a_relative_first_part():
+    assert split_path("data") == (None, "data")
+
+
+def test_relative_name():
+    assert relative_name("/data/hd/raw/file.h5", "/data/hd") == "/raw/file.h5"
+    assert relative_name("C:\\data\\hd\\raw.h5", "C:\\data\\hd") == "\\raw.h5"
+
+
+def test_relative_name_of_no_path():
+    assert relative_name(None, "/data/hd") is None
+    assert relative_name("", "/data/hd") is None
+
+
+@pytest.mark.parametrize("path", ["/data/other/file.h5", "/data/hd2/file.h5"])
+def test_relative_name_outside_the_folder(path):
+    with pytest.raises(ValueError):
+        relative_name(path, "/data/hd")
+
+
+@pytest.fixture
+def db():
+    db = DB(":memory:", override=False, in_memory=False)
+    create_directories(db)
+    yield db
+    db.close()
+
+
+def test_directory_paths_are_rebuilt_by_concatenation(db):
+    directories = DirectoryDictionary(db)
+    holo_dir_id, holo_name = directories.split("/data/240101/240101_ABC.holo")
+    hd_dir_id, hd_name = directories.split("/data/240101/240101_ABC_HD_1")
+
+    assert holo_dir_id == hd_dir_id
+    assert holo_name == "/240101_ABC.holo"
+
+    paths = dict(db.SQLconnect.execute(f"SELECT id, path FROM {DIRECTORY_PATHS_VIEW}"))
+    assert paths[holo_dir_id] + holo_name == "/data/240101/240101_ABC.holo"
+    assert paths[hd_dir_id] + hd_name == "/data/240101/240101_ABC_HD_1"
+
+
+def test_directories_are_stored_once(db):
+    directories = DirectoryDictionary(db)
+    first_id = directories.get_id("/data/240101")
+
+    # A new dictionary (next transaction) finds the stored directories
+    assert DirectoryDictionary(db).get_id("/data/240101") == first_id
+    assert db.SQLconnect.execute("SELECT COUNT(*) FROM directories").fetchone()[0] == 3
+
+
+def test_missing_directory_without_create(db):
+    assert DirectoryDictionary(db).get_id("/data/240101", create=False) is None
+
+
+def _stored_paths(ff) -> dict[str, int]:
+    rows = ff.DB.SQLconnect.execute(f"SELECT path, id FROM {DIRECTORY_PATHS_VIEW}")
+    return dict(rows)
+
+
+def test_unused_directories_are_removed(ff):
+    kept = make_folder_result("/data", datetime.date(2025, 9, 10), ["ABC"])
+    removed = make_folder_result("/data", datetime.date(2025, 9, 11), ["DOP"])
+    ff.StoreResults("/data", [kept, removed], [], datetime.datetime.now())
+    kept_id = _stored_paths(ff)["/data/250910"]
+
+    # The next scan of the root only finds the first folder
+    ff.StoreResults("/data", [kept], [], datetime.datetime.now())
+
+    paths = _stored_paths(ff)
+    assert paths["/data/250910"] == kept_id
+    assert not any(path.startswith("/data/250911") for path in paths)
+    assert "/data" in paths and "/" in paths
+
+
+def test_directory_ids_without_foreign_key_are_an_old_layout(ff):
+    ff.DB.SQLconnect.execute("DROP VIEW preview_doppler_video_paths")
+    ff.DB.SQLconnect.execute("DROP TABLE preview_doppler_video")
+    ff.DB.SQLconnect.execute(
+        """
+        CREATE TABLE preview_doppler_video (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, holo_id INTEGER NOT NULL,
+            dir_id INTEGER NOT NULL, name VARCHAR(255) NOT NULL
+        )
+        """
+    )
+    ff.DB.SQLconnect.commit()
+    assert ff._HasLegacyLayout()
+
+    ff.CreateDB()
+
+    assert not ff._HasLegacyLayout()
+    keys = ff.DB.SQLconnect.execute("PRAGMA foreign_key_list(preview_doppler_video)")
+    assert "directories" in {key[2] for key in keys}
@@ -0,0 +1,79 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.FileFinder import FinderUtils
+from src.FileFinder.FinderUtils import DeadlineExceeded, run_with_deadline
+from src.Utils import io_governor
+
+
+@pytest.fixture
+def semaphore(settings):
+    settings["FINDER.IO.MAX_BYTES_PER_SECOND"] = 0
+    settings["FINDER.IO.TARGET_LATENCY"] = 0
+    semaphore = threading.BoundedSemaphore(1)
+    io_governor.configure(semaphore)
+    yield semaphore
+    io_governor.configure()
+
+
+def test_run_with_deadline_returns_the_result():
+    assert run_with_deadline(lambda x: x * 2, 1, 21) == 42
+
+
+def test_run_with_deadline_abandons_a_hung_call():
+    with pytest.raises(DeadlineExceeded):
+        run_with_deadline(time.sleep, 0.05, 1)
+
+
+def test_abandoned_thread_gives_back_its_slot(semaphore):
+    """A folder hung while holding the only slot must not block the next ones,
+    and stops at its next operation once its hung one returns"""
+    release = threading.Event()
+    operations = []
+
+    def hung_scan():
+        with io_governor.governed():
+            release.wait(5)
+        operations.append("after the hang")
+        with io_governor.governed():
+            operations.append("next operation")
+
+    with pytest.raises(DeadlineExceeded):
+        run_with_deadline(hung_scan, 0.05)
+
+    assert semaphore.acquire(False)
+    semaphore.release()
+
+    release.set()
+    time.sleep(0.1)
+    assert operations == ["after the hang"]
+    # Not given back twice by the end of the hung operation
+    assert semaphore.acquire(False)
+    assert not semaphore.acquire(False)
+    semaphore.release()
+
+
+def test_only_the_hung_worker_is_recycled(ff, settings, monkeypatch):
+    settings["FINDER.IO.MAX_CONCURRENT_OPS"] = 1
+
+    def fake_scan(date_folder: Path):
+        with io_governor.governed():
+            if date_folder.name == "hung":
+                time.sleep(60)
+        return ([], [], [], [], {"folder": date_folder.name})
+
+    # Inherited by the forked worker processes
+    monkeypatch.setattr(FinderUtils, "process_date_folder", fake_scan)
+    folders = [Path("/data/hung")] + [Path(f"/data/{i}") for i in range(6)]
+
+    start = time.time()
+    results, unreachable = ff._scan_parallel(folders, None, 0.5)
+
+    assert unreachable == ["/data/hung"]
+    assert sorted(result[4]["folder"] for result in results) == [
+        str(i) for i in range(6)
+    ]
+    assert time.time() - start < 10
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+from src.FileFinder.utils.data_getter import find_all_holo_files
+from src.Utils import io_stats
+
+
+@pytest.fixture
+def date_folder(tmp_path) -> Path:
+    """A date folder with a .holo file, its HD render (holding a stray
+    .holo copy) and a sub-folder of older acquisitions"""
+    folder = tmp_path / "250101"
+    (folder / "250101_ABC_HD_1" / "raw").mkdir(parents=True)
+    (folder / "250101_ABC_HD_1" / "raw" / "copy.holo").touch()
+    (folder / "old" / "deeper").mkdir(parents=True)
+    (folder / "250101_ABC.holo").touch()
+    (folder / "old" / "250101_OLD.holo").touch()
+    (folder / "old" / "deeper" / "250101_DEEP.holo").touch()
+    return folder
+
+
+@pytest.fixture
+def discovery(settings):
+    settings["FINDER.DISCOVERY.STRICT_LAYOUT"] = False
+    settings["FINDER.DISCOVERY.PRUNE_GLOBS"] = ["*_HD_*"]
+    settings["FINDER.DISCOVERY.MAX_DEPTH"] = 0
+    return settings
+
+
+def _names(paths: list[Path]) -> list[str]:
+    return sorted(path.name for path in paths)
+
+
+def test_render_folders_are_pruned(date_folder, discovery):
+    io_stats.reset()
+    found = find_all_holo_files(date_folder)
+
+    assert _names(found) == ["250101_ABC.holo", "250101_DEEP.holo", "250101_OLD.holo"]
+    assert io_stats.snapshot()["counters"]["dirs_pruned"] == 1
+
+
+def test_max_depth(date_folder, discovery):
+    discovery["FINDER.DISCOVERY.MAX_DEPTH"] = 1
+
+    assert _names(find_all_holo_files(date_folder)) == [
+        "250101_ABC.holo",
+        "250101_OLD.holo",
+    ]
+
+
+def test_strict_layout_only_lists_the_date_folder(date_folder, discovery):
+    discovery["FINDER.DISCOVERY.STRICT_LAYOUT"] = True
+    io_stats.reset()
+
+    assert _names(find_all_holo_files(date_folder)) == ["250101_ABC.holo"]
+    counters = io_stats.snapshot()["counters"]
+    assert counters["dirs_visited"] == 1
+    assert counters["dirs_pruned"] == 2
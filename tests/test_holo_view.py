@@ -0,0 +1,37 @@
+import datetime
+import json
+
+import pytest
+
+from conftest import make_folder_result
+from src.Database.Catalog import CATALOG_TABLE, HOLO_KEY_EXPRESSION, refresh_catalog
+from src.ui.holo_view import parse_identifier
+
+
+def test_parse_identifier():
+    assert parse_identifier(" 250910_DOP\n") == (datetime.date(2025, 9, 10), "DOP")
+
+
+@pytest.mark.parametrize("line", ["250910", "25091_DOP", "250931_DOP", "250910_DOP_2"])
+def test_invalid_identifier(line):
+    assert parse_identifier(line) is None
+
+
+def test_group_keys_match_the_date_and_tag(ff):
+    results = [
+        make_folder_result("/data", datetime.date(2025, 9, 10), ["ABC", "DOP"]),
+        make_folder_result("/data", datetime.date(2025, 9, 11), ["DOP"]),
+    ]
+    ff.StoreResults("/data", results, [], datetime.datetime.now())
+    refresh_catalog(ff.DB)
+
+    keys = [f"{date:%y%m%d}_{tag}" for date, tag in [parse_identifier("250911_DOP")]]
+    rows = ff.DB.reader.execute(
+        f"""
+        SELECT DISTINCT holo_file FROM {CATALOG_TABLE}
+        WHERE {HOLO_KEY_EXPRESSION} IN (SELECT value FROM json_each(?))
+        """,
+        (json.dumps(keys),),
+    ).fetchall()
+
+    assert rows == [("/data/250911/250911_DOP.holo",)]
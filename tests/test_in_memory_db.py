@@ -0,0 +1,107 @@
+import sqlite3
+import threading
+
+import pytest
+
+from src.Database.DBClass import DB
+
+
+@pytest.fixture
+def memory_db(tmp_path, settings):
+    """A DB in memory mode, saved to its file on `writing()` and `close` only"""
+    settings["DB.TEMP_DB_SAVE_SECONDS"] = 0
+    db = DB(str(tmp_path / "memory.db"), override=False, in_memory=True)
+    with db.writing():
+        db.create_table("items", {"id": "INTEGER PRIMARY KEY", "name": "VARCHAR(255)"})
+    yield db
+    db.close()
+
+
+def _read_in_thread(db: DB, query: str) -> list:
+    """Runs `query` on the reader of another thread, like an app session or
+    an API request"""
+    result = []
+
+    def read():
+        try:
+            result.extend(db.reader.execute(query).fetchall())
+        except Exception as e:
+            result.append(e)
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    thread.join()
+    if result and isinstance(result[0], Exception):
+        raise result[0]
+    return result
+
+
+def test_readers_do_not_see_a_write_in_progress(memory_db):
+    with memory_db.writing():
+        memory_db.SQLconnect.execute("INSERT INTO items (name) VALUES ('a')")
+        memory_db.commit()
+        memory_db.SQLconnect.execute("DELETE FROM items")  # Not committed
+
+        assert _read_in_thread(memory_db, "SELECT name FROM items") == []
+        # The writing thread reads its own writes
+        assert memory_db.reader.execute("SELECT COUNT(*) FROM items").fetchone() == (0,)
+        memory_db.SQLconnect.rollback()
+
+    assert _read_in_thread(memory_db, "SELECT name FROM items") == [("a",)]
+
+
+def test_readers_see_a_commit_out_of_a_write_block(memory_db):
+    generation = memory_db.get_generation()
+    memory_db.SQLconnect.execute("INSERT INTO items (name) VALUES ('a')")
+    memory_db.commit()
+
+    assert _read_in_thread(memory_db, "SELECT name FROM items") == [("a",)]
+    assert _read_in_thread(
+        memory_db, "SELECT value FROM db_meta WHERE key = 'generation'"
+    ) == [(generation + 1,)]
+
+
+def test_readers_are_read_only(memory_db):
+    with pytest.raises(Exception, match="readonly"):
+        memory_db.reader.execute("INSERT INTO items (name) VALUES ('a')")
+
+
+def _count_on_disk(db: DB) -> int:
+    with sqlite3.connect(db.DB_PATH) as disk:
+        return disk.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+
+def test_writes_are_saved_to_the_file(memory_db):
+    with memory_db.writing():
+        memory_db.SQLconnect.execute("INSERT INTO items (name) VALUES ('a')")
+        memory_db.commit()
+        assert memory_db._has_unsaved_changes()
+
+    assert _count_on_disk(memory_db) == 1
+    assert not memory_db.save()  # Nothing new to save
+
+
+def test_file_is_loaded_in_memory(memory_db):
+    with memory_db.writing():
+        memory_db.SQLconnect.execute("INSERT INTO items (name) VALUES ('a')")
+        memory_db.commit()
+
+    loaded = DB(memory_db.DB_PATH, override=False, in_memory=True)
+    try:
+        assert loaded.count("items") == 1
+    finally:
+        loaded.close()
+
+
+def test_sync_loads_the_writes_of_another_process(memory_db, settings):
+    settings["DB.TEMP_DB"] = False
+    scanner = DB(memory_db.DB_PATH, override=False)
+    try:
+        scanner.SQLconnect.execute("INSERT INTO items (name) VALUES ('a')")
+        scanner.commit()
+    finally:
+        scanner.close()
+
+    memory_db.sync()
+
+    assert _read_in_thread(memory_db, "SELECT name FROM items") == [("a",)]
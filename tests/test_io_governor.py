@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from src.Utils import io_governor, io_stats
+
+
+@pytest.fixture
+def semaphore(settings):
+    settings["FINDER.IO.MAX_BYTES_PER_SECOND"] = 0
+    settings["FINDER.IO.TARGET_LATENCY"] = 0
+    semaphore = threading.BoundedSemaphore(1)
+    yield semaphore
+    io_governor.configure()
+
+
+def test_free_slot_is_not_reported(semaphore):
+    events = []
+    io_governor.configure(semaphore, 1, events.append)
+
+    with io_governor.governed():
+        pass
+
+    assert events == []
+
+
+def test_slot_wait_is_reported(semaphore):
+    """The folder deadline is paused while its operation waits for a slot
+    held by another folder"""
+    events = []
+    io_governor.configure(semaphore, 1, events.append)
+    io_stats.reset()
+
+    semaphore.acquire()
+    threading.Timer(0.1, semaphore.release).start()
+    with io_governor.governed():
+        assert events == [True, False]
+
+    assert io_stats.snapshot()["phases"]["throttling"] >= 0.05
+    # The slot was released
+    assert semaphore.acquire(False)
+
+
+
+def test_delay_follows_the_latency(settings):
+    """The delay between operations grows while the server answers slower
+    than the target latency, and goes back to 0 once it recovers"""
+    settings["FINDER.IO.MAX_BYTES_PER_SECOND"] = 0
+    settings["FINDER.IO.TARGET_LATENCY"] = 0.005
+    settings["FINDER.IO.MAX_DELAY"] = 0.01
+    io_governor.configure()
+
+    for _ in range(10):
+        with io_governor.governed():
+            time.sleep(0.02)
+    assert io_governor._delay == 0.01
+
+    for _ in range(50):
+        with io_governor.governed():
+            pass
+    assert io_governor._delay == 0.0
+    io_governor.configure()
+
+
+def test_bytes_budget_is_split_between_processes(settings):
+    settings["FINDER.IO.MAX_BYTES_PER_SECOND"] = 20_000
+    settings["FINDER.IO.TARGET_LATENCY"] = 0
+    io_governor.configure(processes=2)  # 10 kB/s each
+    io_stats.reset()
+
+    io_governor.consume(10_000)  # The initial budget
+    io_governor.consume(2_000)
+
+    assert io_stats.snapshot()["phases"]["throttling"] >= 0.15
+    io_governor.configure()
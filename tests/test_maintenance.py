@@ -0,0 +1,106 @@
+import datetime
+import time
+
+import pytest
+
+from src.Database.DBClass import DB
+from src.Database.Maintenance import (
+    LAST_MAINTENANCE_KEY,
+    get_db_stats,
+    maintain_if_due,
+    maintenance_reason,
+    run_maintenance,
+)
+
+
+@pytest.fixture
+def db(tmp_path, settings):
+    settings["DB.TEMP_DB"] = False
+    settings["DB.MAINTENANCE.ENABLED"] = True
+    settings["DB.MAINTENANCE.LARGE_SCAN_ROWS"] = 1000
+    settings["DB.MAINTENANCE.VACUUM_FREE_RATIO"] = 0.2
+    settings["DB.MAINTENANCE.WAL_CHECKPOINT_MB"] = 64
+    settings["DB.MAINTENANCE.INTERVAL_HOURS"] = 24
+    db = DB(str(tmp_path / "maintenance.db"), override=False)
+    db.create_table("items", {"id": "INTEGER PRIMARY KEY", "content": "TEXT"})
+    yield db
+    db.close()
+
+
+def _set_last_maintenance(db: DB, when: datetime.datetime) -> None:
+    db.SQLconnect.execute(
+        "INSERT OR REPLACE INTO db_meta (key, value) VALUES (?, ?)",
+        (LAST_MAINTENANCE_KEY, int(when.timestamp())),
+    )
+    db.SQLconnect.commit()
+
+
+def _fragment(db: DB) -> None:
+    """Frees most of the pages of the file"""
+    db.SQLconnect.executemany(
+        "INSERT INTO items (content) VALUES (?)", [("x" * 2000,)] * 200
+    )
+    db.commit()
+    db.SQLconnect.execute("DELETE FROM items")
+    db.commit()
+    db.SQLconnect.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def test_first_maintenance_is_due(db):
+    assert maintenance_reason(db) == "never run"
+
+
+def test_not_due_after_a_recent_maintenance(db):
+    _set_last_maintenance(db, datetime.datetime.now())
+
+    assert maintenance_reason(db) is None
+    assert maintain_if_due(db) is None
+
+
+def test_due_after_the_interval(db):
+    _set_last_maintenance(db, datetime.datetime.now() - datetime.timedelta(hours=25))
+
+    assert maintenance_reason(db).startswith("last run on")
+
+
+def test_due_after_a_large_scan(db):
+    _set_last_maintenance(db, datetime.datetime.now())
+
+    assert maintenance_reason(db, changed_rows=1000) == "large scan (1000 rows)"
+
+
+def test_due_when_fragmented(db):
+    _set_last_maintenance(db, datetime.datetime.now())
+    _fragment(db)
+
+    assert maintenance_reason(db).endswith("free pages")
+
+
+def test_disabled(db, settings):
+    settings["DB.MAINTENANCE.ENABLED"] = False
+
+    assert maintenance_reason(db, changed_rows=10**6) is None
+
+
+def test_vacuum_of_a_fragmented_file(db):
+    _fragment(db)
+    generation = db.get_generation()
+
+    report = run_maintenance(db)
+
+    assert report["problems"] == []
+    assert "vacuum" in report["durations"]
+    assert report["after"]["freelist_count"] == 0
+    assert report["after"]["size_bytes"] < report["before"]["size_bytes"]
+    # Not a data change, the app caches stay valid
+    assert db.get_generation() == generation
+    assert get_db_stats(db)["last_maintenance"] >= datetime.datetime.fromtimestamp(
+        int(time.time()) - 5
+    )
+
+
+def test_no_vacuum_of_a_compact_file(db):
+    report = run_maintenance(db)
+
+    assert "vacuum" not in report["durations"]
+    assert report["after"]["wal_bytes"] == 0
@@ -0,0 +1,63 @@
+import pytest
+
+from src.Database.DBClass import DB
+from src.Database.ParameterSets import (
+    PARAMETER_SETS_TABLE,
+    canonical_json,
+    create_parameter_sets,
+    get_parameter_columns,
+    store_parameter_set,
+)
+
+
+def test_canonical_json_ignores_key_order_and_spacing():
+    first = canonical_json('{"b": 1, "a": {"y": 2, "x": [1, 2]}}')
+    second = canonical_json('{"a":{"x":[1,2],"y":2},\n  "b":1}')
+
+    assert first == second == '{"a":{"x":[1,2],"y":2},"b":1}'
+
+
+def test_canonical_json_keeps_non_ascii_text():
+    assert canonical_json('{"name": "é"}') == '{"name":"é"}'
+
+
+@pytest.fixture
+def db():
+    db = DB(":memory:", override=False, in_memory=False)
+    create_parameter_sets(db)
+    yield db
+    db.close()
+
+
+def test_equal_parameters_are_stored_once(db):
+    first_hash = store_parameter_set(db, '{"batch_size": 64, "time_transform": {"f1": 6}}')
+    second_hash = store_parameter_set(db, '{"time_transform":{"f1":6},"batch_size":64}')
+
+    assert first_hash == second_hash
+    assert len(first_hash) == 40
+    count = db.SQLconnect.execute(f"SELECT COUNT(*) FROM {PARAMETER_SETS_TABLE}")
+    assert count.fetchone()[0] == 1
+
+
+def test_different_parameters_get_different_hashes(db):
+    assert store_parameter_set(db, '{"batch_size": 64}') != store_parameter_set(
+        db, '{"batch_size": 32}'
+    )
+
+
+@pytest.mark.parametrize("content", [None, ""])
+def test_no_parameters_have_no_hash(db, content):
+    assert store_parameter_set(db, content) is None
+
+
+def test_generated_columns_read_the_json(db):
+    content_hash = store_parameter_set(
+        db, '{"batch_size": 64, "time_transform": {"f1": 6, "f2": 30}}'
+    )
+    columns = list(get_parameter_columns("HD"))
+
+    row = db.SQLconnect.execute(
+        f"SELECT {', '.join(columns)} FROM {PARAMETER_SETS_TABLE} WHERE hash = ?",
+        (content_hash,),
+    ).fetchone()
+    assert dict(zip(columns, row)) == {"hd_batch_size": 64, "hd_f1": 6, "hd_f2": 30}
@@ -0,0 +1,169 @@
+import datetime
+import json
+
+import pyarrow.parquet as pq
+
+from src.FileFinder.FinderUtils import _folder_fingerprint
+from src.FileFinder.ScanDelta import (
+    DELTA_FORMAT_VERSION,
+    DELTA_METADATA_KEY,
+    archive_delta,
+    get_pending_deltas,
+    read_delta,
+    write_delta,
+)
+
+AGENT_ROOT = "/srv/data"
+ROOT = "Y:\\"
+SCAN_DATE = datetime.datetime(2025, 9, 10, 8, 30)
+UPDATED_AT = datetime.datetime(2025, 9, 9, 17, 0, 5)
+
+
+def _folder_result(root: str, sep: str) -> tuple:
+    """The result of `process_date_folder` for one .holo file with an HD
+    render, an EF render and a preview, under `root`"""
+    folder = root.rstrip("\\/") + sep + "250910"
+    holo = f"{folder}{sep}250910_DOP.holo"
+    hd = f"{folder}{sep}250910_DOP_HD_1"
+    ef = f"{hd}{sep}eyeflow{sep}250910_DOP_HD_1_EF_1"
+
+    found = (
+        [(holo, {"path": holo, "tag": "DOP", "created_at": datetime.date(2025, 9, 10)})],
+        [
+            (
+                hd,
+                {
+                    "holo_id": holo,
+                    "path": hd,
+                    "render_number": 1,
+                    "rendering_parameters": '{"batch_size": 64}',
+                    "raw_h5_path": f"{hd}{sep}raw{sep}250910_DOP_HD_1_raw.h5",
+                    "version": "v2.0",
+                    "updated_at": UPDATED_AT,
+                },
+            )
+        ],
+        [
+            {
+                "hd_id": hd,
+                "render_number": 1,
+                "path": ef,
+                "input_parameters": None,
+                "version": "v1.4",
+                "report_path": f"{ef}{sep}report.pdf",
+                "error_log_path": None,
+                "h5_output": f"{ef}{sep}output.h5",
+                "updated_at": UPDATED_AT,
+            }
+        ],
+        [{"holo_id": holo, "path": f"{folder}{sep}250910_DOP_preview.avi"}],
+    )
+    folder_stats = {
+        "folder": folder,
+        "fingerprint": _folder_fingerprint(folder, found),
+        "duration": 0.5,
+        "errors": 0,
+        "found_holo": 1,
+        "found_hd": 1,
+        "found_ef": 1,
+        "found_preview": 1,
+        "counters": {"scandir": 3},
+        "phases": {"listing": 0.1},
+    }
+    return (*found, folder_stats)
+
+
+def test_round_trip_rewrites_the_paths_to_the_published_root(tmp_path):
+    delta_path = write_delta(
+        AGENT_ROOT,
+        [_folder_result(AGENT_ROOT, "/")],
+        ["/srv/data/250911"],
+        SCAN_DATE,
+        tmp_path,
+        ROOT,
+    )
+    manifest, results = read_delta(delta_path)
+
+    assert manifest["format_version"] == DELTA_FORMAT_VERSION
+    assert manifest["root"] == ROOT
+    assert manifest["agent_root"] == AGENT_ROOT
+    assert manifest["scan_date"] == SCAN_DATE.isoformat()
+    assert manifest["unreachable"] == ["Y:\\250911"]
+
+    [(holo_list, hd_list, ef_list, preview_list, folder_stats)] = results
+    assert folder_stats["folder"] == "Y:\\250910"
+    assert folder_stats["counters"] == {"scandir": 3}
+
+    [(temp_holo_id, holo)] = holo_list
+    assert holo == {
+        "path": "Y:\\250910\\250910_DOP.holo",
+        "tag": "DOP",
+        "created_at": datetime.date(2025, 9, 10),
+    }
+
+    # The temporary ids still link the rows inside the delta
+    [(temp_hd_id, hd)] = hd_list
+    assert hd["holo_id"] == temp_holo_id
+    assert hd["path"] == "Y:\\250910\\250910_DOP_HD_1"
+    assert hd["raw_h5_path"] == "Y:\\250910\\250910_DOP_HD_1\\raw\\250910_DOP_HD_1_raw.h5"
+    assert hd["rendering_parameters"] == '{"batch_size": 64}'
+    assert hd["updated_at"] == UPDATED_AT
+
+    [ef] = ef_list
+    assert ef["hd_id"] == temp_hd_id
+    assert ef["path"] == "Y:\\250910\\250910_DOP_HD_1\\eyeflow\\250910_DOP_HD_1_EF_1"
+    assert ef["error_log_path"] is None
+    assert ef["version"] == "v1.4"
+
+    assert preview_list == [
+        {"holo_id": temp_holo_id, "path": "Y:\\250910\\250910_DOP_preview.avi"}
+    ]
+
+
+def test_agent_and_app_fingerprints_match():
+    """A folder imported from a delta is not seen as changed by the next
+    scan of the published root"""
+    agent_stats = _folder_result(AGENT_ROOT, "/")[4]
+    app_stats = _folder_result(ROOT, "\\")[4]
+
+    assert agent_stats["fingerprint"] == app_stats["fingerprint"]
+
+
+def test_fingerprint_changes_with_the_content():
+    result = _folder_result(AGENT_ROOT, "/")
+    result[1][0][1]["version"] = "v2.1"
+
+    assert _folder_fingerprint(result[4]["folder"], result[:4]) != result[4]["fingerprint"]
+
+
+def test_newer_format_is_not_read(tmp_path):
+    delta_path = write_delta(AGENT_ROOT, [], [], SCAN_DATE, tmp_path, ROOT)
+    table = pq.read_table(str(delta_path))
+    manifest = json.loads(table.schema.metadata[DELTA_METADATA_KEY])
+    manifest["format_version"] = DELTA_FORMAT_VERSION + 1
+    pq.write_table(
+        table.replace_schema_metadata({DELTA_METADATA_KEY: json.dumps(manifest)}),
+        str(delta_path),
+    )
+
+    assert read_delta(delta_path) is None
+
+
+def test_invalid_file_is_not_read(tmp_path):
+    delta_path = tmp_path / "scan_delta_broken.parquet"
+    delta_path.write_bytes(b"not parquet")
+
+    assert read_delta(delta_path) is None
+
+
+def test_pending_deltas_are_archived(tmp_path):
+    first = write_delta(AGENT_ROOT, [], [], SCAN_DATE, tmp_path, ROOT)
+    second = write_delta(
+        AGENT_ROOT, [], [], SCAN_DATE + datetime.timedelta(hours=1), tmp_path, ROOT
+    )
+    assert get_pending_deltas(tmp_path) == [first, second]
+
+    archive_delta(first)
+
+    assert get_pending_deltas(tmp_path) == [second]
+    assert (tmp_path / "imported" / first.name).exists()
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def root(tmp_path):
+    """A root with two date folders holding a .holo file each"""
+    root = tmp_path / "data"
+    for day in ("250101", "250102"):
+        (root / day).mkdir(parents=True)
+        (root / day / f"{day}_ABC.holo").touch()
+    return root
+
+
+def _scan_runs(ff) -> list[dict]:
+    return ff.DB.select("scan_runs")
+
+
+def test_scan_is_recorded(ff, root, tmp_path, settings):
+    settings["DB.MAINTENANCE.ENABLED"] = False
+    ff.Findfiles(str(root), report_path=tmp_path / "reports")
+
+    [run] = _scan_runs(ff)
+    assert run["status"] == "success"
+    assert json.loads(run["roots"]) == [str(root)]
+    assert run["found_holo"] == 2
+    assert run["total_duration"] >= run["scan_duration"]
+    assert "insert" in json.loads(run["phases"])
+    assert run["report_path"].endswith(".json")
+
+
+def test_failed_scan_is_recorded(ff, root, monkeypatch):
+    def fail(*args):
+        raise OSError("share offline")
+
+    monkeypatch.setattr(ff, "_run_search", fail)
+    with pytest.raises(OSError):
+        ff.Findfiles(str(root))
+
+    [run] = _scan_runs(ff)
+    assert run["status"] == "failed"
+    assert run["report_path"] is None
+
+
+def test_history_survives_a_clear(ff, root, tmp_path, settings):
+    settings["DB.MAINTENANCE.ENABLED"] = False
+    ff.Findfiles(str(root), report_path=tmp_path / "reports")
+    ff.ClearDB()
+
+    assert len(_scan_runs(ff)) == 1
+    assert ff.DB.count("holo_data") == 0
@@ -0,0 +1,78 @@
+import datetime
+import json
+import threading
+
+from conftest import make_folder_result
+from src.FileFinder.FinderUtils import process_date_folder
+from src.FileFinder.ReportGen import generate_report
+from src.Utils import io_stats
+
+
+def test_timed_phases_and_counters():
+    io_stats.reset()
+    with io_stats.timed("listing", "scandir"):
+        pass
+    with io_stats.timed("listing", "scandir"):
+        pass
+    io_stats.count("bytes_read", 10)
+
+    snapshot = io_stats.snapshot()
+    assert snapshot["counters"] == {"scandir": 2, "bytes_read": 10}
+    assert set(snapshot["phases"]) == {"listing"}
+
+
+def test_counters_are_kept_per_thread():
+    """An abandoned folder keeps running in its thread without adding to the
+    counters of the next folders"""
+    io_stats.reset()
+    thread = threading.Thread(target=io_stats.count, args=("scandir",))
+    thread.start()
+    thread.join()
+
+    assert io_stats.snapshot()["counters"] == {}
+
+
+def test_merge_sums_the_folders():
+    total = {}
+    io_stats.merge(total, {"counters": {"stat": 2}, "phases": {"stat": 0.5}})
+    io_stats.merge(total, {"counters": {"stat": 3, "scandir": 1}, "phases": {}})
+
+    assert total == {"counters": {"stat": 5, "scandir": 1}, "phases": {"stat": 0.5}}
+
+
+def test_folder_stats_of_a_scan(tmp_path):
+    date_folder = tmp_path / "250101"
+    (date_folder / "250101_ABC_HD_1").mkdir(parents=True)
+    (date_folder / "250101_ABC.holo").touch()
+
+    *found, stats = process_date_folder(date_folder)
+
+    assert stats["folder"] == str(date_folder)
+    assert stats["found_holo"] == 1
+    assert stats["duration"] > 0
+    assert stats["counters"]["dirs_visited"] >= 1
+    # The HD folder is not walked by the .holo discovery
+    assert stats["counters"]["dirs_pruned"] >= 1
+    assert "listing" in stats["phases"]
+
+
+def test_report_lists_the_slowest_folders(ff, tmp_path, settings):
+    settings["FINDER.REPORT_TOP_N"] = 2
+    day = datetime.date(2025, 1, 1)
+    results = []
+    for i, duration in enumerate([0.1, 3.0, 2.0]):
+        result = make_folder_result("/data", day + datetime.timedelta(days=i), ["A"])
+        result[4]["duration"] = duration
+        results.append(result)
+
+    now = datetime.datetime.now()
+    report = ff.BuildReport("/data", results, now, now, {}, 0.0)
+    json_path = generate_report([report], ff.DB, tmp_path)
+
+    text = json_path.with_suffix(".txt").read_text()
+    slowest = text[text.index("TOP 2 SLOWEST FOLDERS") :]
+    assert slowest.index("/data/250102") < slowest.index("/data/250103")
+    assert "/data/250101" not in slowest
+
+    scans = json.loads(json_path.read_text())["scans"]
+    assert scans[0]["data"]["found_holo"] == 3
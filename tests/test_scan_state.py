@@ -0,0 +1,95 @@
+import datetime
+
+import pytest
+
+from conftest import make_folder_result
+from src.Database.ScanState import (
+    DEFAULT_COLD_INTERVAL,
+    add_new_folders,
+    get_due_folders,
+    get_folder_states,
+    get_scan_interval,
+    get_tier_interval,
+    record_folder_scan,
+    record_unreachable_folder,
+)
+
+TODAY = datetime.date(2025, 6, 1)
+NOW = datetime.datetime(2025, 6, 1, 12)
+
+
+@pytest.fixture
+def tiers(settings):
+    settings["FINDER.SCHEDULER.TIERS"] = [[2, 300], [14, 3600], [90, 86400]]
+    settings["FINDER.SCHEDULER.COLD_INTERVAL"] = DEFAULT_COLD_INTERVAL
+    settings["FINDER.SCHEDULER.MAX_BACKOFF"] = 4
+    settings["FINDER.SCHEDULER.RETRY_INTERVAL"] = 900
+
+
+@pytest.mark.parametrize(
+    "age_days, interval",
+    [(0, 300), (2, 300), (3, 3600), (60, 86400), (365, DEFAULT_COLD_INTERVAL)],
+)
+def test_tier_of_the_folder_age(tiers, age_days, interval):
+    folder_date = TODAY - datetime.timedelta(days=age_days)
+    assert get_tier_interval(folder_date, TODAY) == interval
+
+
+def test_folder_without_date_is_cold(tiers):
+    assert get_tier_interval(None, TODAY) == DEFAULT_COLD_INTERVAL
+
+
+def test_backoff_doubles_up_to_its_cap(tiers):
+    interval = None
+    intervals = []
+    for _ in range(4):
+        interval = get_scan_interval(TODAY, NOW, interval, changed=False)
+        intervals.append(interval)
+
+    assert intervals == [300, 600, 1200, 1200]
+    assert get_scan_interval(TODAY, NOW, 1200, changed=True) == 300
+
+
+def _stats(day: datetime.date, tags: list[str]) -> dict:
+    return make_folder_result("/data", day, tags)[4]
+
+
+def test_rescan_backs_off_until_a_change(ff, tiers):
+    stats = _stats(TODAY, ["ABC"])
+
+    assert record_folder_scan(ff.DB, "/data", stats, NOW)
+    for _ in range(2):
+        state = get_folder_states(ff.DB)[stats["folder"]]
+        assert not record_folder_scan(ff.DB, "/data", stats, NOW, state)
+
+    state = get_folder_states(ff.DB)[stats["folder"]]
+    assert (state["scans"], state["changes"], state["interval"]) == (3, 1, 1200)
+
+    changed = _stats(TODAY, ["ABC", "DOP"])  # A new .holo file
+    assert record_folder_scan(ff.DB, "/data", changed, NOW, state)
+    state = get_folder_states(ff.DB)[stats["folder"]]
+    assert (state["changes"], state["interval"]) == (2, 300)
+
+
+def test_due_folders(ff, tiers):
+    old = _stats(TODAY - datetime.timedelta(days=30), ["ABC"])
+    recent = _stats(TODAY, ["ABC"])
+    record_folder_scan(ff.DB, "/data", old, NOW - datetime.timedelta(days=2))
+    record_folder_scan(ff.DB, "/data", recent, NOW - datetime.timedelta(hours=1))
+    add_new_folders(ff.DB, "/data", ["/data/250601_new"], NOW)
+    add_new_folders(ff.DB, "/other", ["/other/250601"], NOW)
+
+    due = [state["path"] for state in get_due_folders(ff.DB, ["/data"], NOW)]
+
+    # The most overdue first, the folders of other roots are left out
+    assert due == [old["folder"], recent["folder"], "/data/250601_new"]
+
+
+def test_unreachable_folder_keeps_its_last_scan(ff, tiers):
+    stats = _stats(TODAY, ["ABC"])
+    record_folder_scan(ff.DB, "/data", stats, NOW)
+    record_unreachable_folder(ff.DB, "/data", stats["folder"], NOW)
+
+    state = get_folder_states(ff.DB)[stats["folder"]]
+    assert state["fingerprint"] == stats["fingerprint"]
+    assert state["next_scan_at"] == str(NOW + datetime.timedelta(seconds=900))
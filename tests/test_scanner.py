@@ -0,0 +1,78 @@
+import sqlite3
+
+import pytest
+
+import scanner
+
+
+@pytest.fixture
+def run(tmp_path, settings, monkeypatch):
+    """Runs the scanner on a DB of `tmp_path`, returning its exit code"""
+    settings["DB.TEMP_DB"] = False
+    settings["DB.MAINTENANCE.ENABLED"] = False
+    # The output stays with pytest, not in a log file
+    monkeypatch.setattr(scanner.tee_handler, "start", lambda *args, **kwargs: None)
+
+    def run(*argv: str) -> int:
+        return scanner.main(
+            [
+                *argv,
+                "--db-path",
+                str(tmp_path / "catalog.db"),
+                "--report-path",
+                str(tmp_path / "reports"),
+            ]
+        )
+
+    return run
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "data"
+    (root / "250101").mkdir(parents=True)
+    (root / "250101" / "250101_ABC.holo").touch()
+    return root
+
+
+def _holo_count(tmp_path) -> int:
+    with sqlite3.connect(tmp_path / "catalog.db") as connection:
+        return connection.execute("SELECT COUNT(*) FROM holo_data").fetchone()[0]
+
+
+def test_scan(run, root, tmp_path):
+    assert run(str(root), "--sequential") == scanner.EXIT_SUCCESS
+    assert _holo_count(tmp_path) == 1
+
+
+def test_missing_root(run, tmp_path):
+    assert run(str(tmp_path / "missing")) == scanner.EXIT_USAGE
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--publish-root", "Y:\\", "--publish-root", "Z:\\"],  # Once per root
+        ["--watch", "--export-parquet"],
+        ["--parallel", "--sequential"],
+        ["--unknown"],
+    ],
+)
+def test_invalid_arguments(run, root, argv):
+    assert run(str(root), *argv) == scanner.EXIT_USAGE
+
+
+def test_scan_with_export(run, root, tmp_path):
+    folder = tmp_path / "parquet"
+    assert run(str(root), "--export-parquet", str(folder)) == scanner.EXIT_SUCCESS
+    assert any(folder.glob("year=2025/*/*.parquet"))
+
+
+def test_failed_export_keeps_the_scan(run, root, tmp_path):
+    folder = tmp_path / "other"
+    folder.mkdir()
+    (folder / "notes.txt").touch()  # Not a previous export, never replaced
+
+    assert run(str(root), "--export-parquet", str(folder)) == scanner.EXIT_EXPORT_FAILED
+    assert _holo_count(tmp_path) == 1
+    assert (folder / "notes.txt").exists()
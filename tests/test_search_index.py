@@ -0,0 +1,75 @@
+import datetime
+
+import pytest
+
+from conftest import make_folder_result
+from src.Database.Catalog import refresh_catalog
+from src.Database.SearchIndex import (
+    SEARCH_TABLE,
+    rebuild_search_index,
+    search_catalog_query,
+    to_match_expression,
+)
+
+
+@pytest.fixture
+def indexed(ff):
+    results = [
+        make_folder_result("/data", datetime.date(2025, 9, 10), ["ABC", "DOP"]),
+        make_folder_result("/data", datetime.date(2025, 9, 11), ["XYZ"]),
+    ]
+    ff.StoreResults("/data", results, [], datetime.datetime.now())
+    refresh_catalog(ff.DB)
+    return ff
+
+
+def _search(ff, text: str) -> list[str]:
+    query, params = search_catalog_query(text, 100)
+    return sorted({row[0] for row in ff.DB.reader.execute(query, params)})
+
+
+def _entries(ff) -> int:
+    return ff.DB.count(SEARCH_TABLE)
+
+
+def test_match_expression():
+    assert to_match_expression(' 2509 "DOP ') == '"2509"* """DOP"*'
+    assert to_match_expression("  ") is None
+
+
+def test_search_by_tag_and_path_prefix(indexed):
+    assert _search(indexed, "DOP") == ["/data/250910/250910_DOP.holo"]
+    assert _search(indexed, "25091") == [
+        "/data/250910/250910_ABC.holo",
+        "/data/250910/250910_DOP.holo",
+        "/data/250911/250911_XYZ.holo",
+    ]
+    assert _search(indexed, "250910 XYZ") == []
+
+
+def test_deleted_rows_leave_the_index(indexed):
+    """The delete triggers also run on the cascade deletes of the renders"""
+    entries = _entries(indexed)
+    indexed.DeleteRootData("/data/250911")
+    indexed.DB.commit()
+    refresh_catalog(indexed.DB)
+
+    # The .holo file, its HD and its EF render
+    assert _entries(indexed) == entries - 3
+    assert _search(indexed, "XYZ") == []
+
+
+def test_rescan_does_not_duplicate_the_entries(indexed):
+    entries = _entries(indexed)
+    result = make_folder_result("/data", datetime.date(2025, 9, 11), ["XYZ"])
+    indexed.StoreResults("/data/250911", [result], [], datetime.datetime.now())
+
+    assert _entries(indexed) == entries
+
+
+def test_rebuild(indexed):
+    entries = _entries(indexed)
+    indexed.DB.SQLconnect.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    assert rebuild_search_index(indexed.DB) == entries
+    assert _search(indexed, "ABC") == ["/data/250910/250910_ABC.holo"]